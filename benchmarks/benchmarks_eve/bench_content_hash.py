@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the cached structural hashing of Eve trees."""
+
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import eve
+from eve.utils import shash
+
+from .common import BenchLiteral, BenchNaryOp, count_nodes, make_balanced_tree, measure, report
+
+
+def leftmost_path(tree: BenchNaryOp) -> List[eve.Node]:
+    path: List[eve.Node] = [tree]
+    while isinstance(path[-1], BenchNaryOp):
+        path.append(path[-1].operands[0])
+    return path
+
+
+def clear_content_hashes(tree: eve.Node) -> None:
+    for node in eve.iter_tree(tree).if_isinstance(eve.Node):
+        node.invalidate_content_hash()
+
+
+def main() -> None:
+    for n_nodes in (10_000, 100_000):
+        tree = make_balanced_tree(n_nodes)
+        path = leftmost_path(tree)
+        leaf = path[-1]
+        assert isinstance(leaf, BenchLiteral)
+
+        def local_edit() -> str:
+            leaf.value += 1  # invalidates the cached hashes of all the trees
+            return tree.content_hash()
+
+        def cold_content_hash() -> str:
+            clear_content_hashes(tree)
+            return tree.content_hash()
+
+        results: Dict[str, float] = {
+            "shash (pickle)": measure(lambda: shash(tree), repeat=3),
+            "content_hash (cold cache + clearing)": measure(cold_content_hash, repeat=3),
+            "content_hash (cached)": measure(tree.content_hash),
+            "content_hash (after a leaf edit)": measure(local_edit),
+        }
+        report(
+            f"Hashing a balanced tree ({count_nodes(tree)} nodes)",
+            results,
+            baseline="shash (pickle)",
+        )
+
+
+if __name__ == "__main__":
+    main()
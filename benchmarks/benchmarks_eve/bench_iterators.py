@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for :mod:`eve.iterators`."""
+
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import eve
+from eve import utils
+from eve.iterators import generic_iter_children
+
+from .common import BenchLiteral, BenchNaryOp, make_balanced_tree, measure, report
+
+
+# -- Previous (recursive) implementations --
+@utils.as_xiter
+def legacy_iter_tree_pre(node: Any, *, with_keys: bool = False, __key__: Any = None) -> Any:
+    if with_keys:
+        yield __key__, node
+        for key, child in generic_iter_children(node, with_keys=True):
+            yield from legacy_iter_tree_pre(child, with_keys=True, __key__=key)
+    else:
+        yield node
+        for child in generic_iter_children(node, with_keys=False):
+            yield from legacy_iter_tree_pre(child, with_keys=False)
+
+
+@utils.as_xiter
+def legacy_iter_tree_post(node: Any, *, with_keys: bool = False, __key__: Any = None) -> Any:
+    if with_keys:
+        for key, child in generic_iter_children(node, with_keys=True):
+            yield from legacy_iter_tree_post(child, with_keys=True, __key__=key)
+        yield __key__, node
+    else:
+        for child in generic_iter_children(node, with_keys=False):
+            yield from legacy_iter_tree_post(child, with_keys=False)
+        yield node
+
+
+@utils.as_xiter
+def legacy_iter_tree_levels(
+    node: Any, *, with_keys: bool = False, __key__: Any = None, __queue__: Optional[List] = None
+) -> Any:
+    __queue__ = __queue__ or []
+    if with_keys:
+        yield __key__, node
+        __queue__.extend(generic_iter_children(node, with_keys=True))
+        if __queue__:
+            key, child = __queue__.pop(0)
+            yield from legacy_iter_tree_levels(
+                child, with_keys=True, __key__=key, __queue__=__queue__
+            )
+    else:
+        yield node
+        __queue__.extend(generic_iter_children(node, with_keys=False))
+        if __queue__:
+            child = __queue__.pop(0)
+            yield from legacy_iter_tree_levels(child, with_keys=False, __queue__=__queue__)
+
+
+# -- Trees --
+def make_deep_tree(depth: int) -> BenchNaryOp:
+    tree = BenchNaryOp(op="+", operands=[BenchLiteral(value=0)])
+    for i in range(1, depth):
+        tree = BenchNaryOp(op="+", operands=[BenchLiteral(value=i), tree])
+    return tree
+
+
+def make_wide_tree(width: int) -> BenchNaryOp:
+    return BenchNaryOp(op="+", operands=[BenchLiteral(value=i) for i in range(width)])
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    try:
+        return measure(func, repeat=3)
+    except RecursionError:
+        return float("nan")
+
+
+def main() -> None:
+    trees = {
+        "balanced (10k nodes)": make_balanced_tree(10_000),
+        "deep (depth 2000)": make_deep_tree(2000),
+        "wide (100k siblings)": make_wide_tree(100_000),
+    }
+    orders = {
+        "pre": (legacy_iter_tree_pre, eve.iterators.iter_tree_pre),
+        "post": (legacy_iter_tree_post, eve.iterators.iter_tree_post),
+        "levels": (legacy_iter_tree_levels, eve.iterators.iter_tree_levels),
+    }
+
+    for tree_name, tree in trees.items():
+        for order_name, (legacy_func, func) in orders.items():
+            results: Dict[str, float] = {}
+            for with_keys in (False, True):
+                suffix = " (with keys)" if with_keys else ""
+                results[f"recursive{suffix}"] = _timed(
+                    lambda: legacy_func(tree, with_keys=with_keys).if_isinstance(eve.Node).to_list()
+                )
+                results[f"explicit stack{suffix}"] = _timed(
+                    lambda: func(tree, with_keys=with_keys).if_isinstance(eve.Node).to_list()
+                )
+            report(f"{tree_name}: {order_name}-order traversal (nan = RecursionError)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmarks for the change detection of :class:`eve.NodeMutator`."""
+
+
+from __future__ import annotations
+
+import collections.abc
+from typing import Any
+
+import pydantic
+
+import eve
+from eve import concepts, utils
+
+from .common import count_nodes, make_balanced_tree, measure, report
+
+
+def legacy_ne(new_value: Any, value: Any) -> bool:
+    # Plain pydantic comparison (without the identity shortcut of `BaseNode.__eq__`)
+    if isinstance(value, pydantic.BaseModel):
+        return not pydantic.BaseModel.__eq__(new_value, value)
+    return bool(new_value != value)
+
+
+class LegacyNoOpMutator(eve.NodeMutator):
+    """Previous implementation (without the removal of items) using structural comparisons."""
+
+    def generic_visit(self, node: Any, **kwargs: Any) -> Any:
+        if isinstance(node, (concepts.Node, collections.abc.Collection)) and utils.is_collection(
+            node
+        ):
+            if isinstance(node, concepts.Node):
+                items = list(node.iter_children())
+                set_op = setattr
+            elif isinstance(node, collections.abc.MutableSequence):
+                items = list(enumerate(node))
+                set_op = type(node).__setitem__
+
+            for key, value in items:
+                new_value = self.visit(value, **kwargs)
+                if legacy_ne(new_value, value):
+                    set_op(node, key, new_value)
+                    concepts.invalidate_node_indices()
+
+        return node
+
+
+class NoOpMutator(eve.NodeMutator):
+    pass
+
+
+class StructuralNoOpMutator(eve.NodeMutator):
+    structural_equality = True
+
+
+def main(n_nodes: int = 50000) -> None:
+    for fanout in (4, 2):
+        tree = make_balanced_tree(n_nodes, fanout=fanout)
+        results = {
+            "previous implementation": measure(lambda: LegacyNoOpMutator().visit(tree), repeat=1),
+            "equality checks (!=)": measure(lambda: StructuralNoOpMutator().visit(tree)),
+            "identity checks (is)": measure(lambda: NoOpMutator().visit(tree)),
+        }
+        report(
+            f"No-op NodeMutator ({count_nodes(tree)} nodes, fanout {fanout})",
+            results,
+            baseline="previous implementation",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the node-type index used by :meth:`eve.Node.find_all`."""
+
+
+from __future__ import annotations
+
+from typing import Dict
+
+import eve
+
+from .common import BenchLiteral, BenchNaryOp, make_balanced_tree, measure, report
+
+
+def scan_queries(root: eve.Node, n_queries: int) -> None:
+    for _ in range(n_queries):
+        eve.iter_tree(root).if_isinstance(BenchLiteral).to_list()
+        eve.iter_tree(root).if_isinstance(BenchNaryOp).to_list()
+
+
+def index_queries(root: eve.Node, n_queries: int) -> None:
+    eve.invalidate_node_indices()  # include the construction of the index
+    for _ in range(n_queries):
+        root.find_all(BenchLiteral)
+        root.find_all(BenchNaryOp)
+
+
+def main(n_nodes: int = 10_000) -> None:
+    tree = make_balanced_tree(n_nodes)
+    print(f"Balanced tree with {n_nodes} nodes (2 queries per pass)")
+
+    for n_queries in (1, 5, 20):
+        results: Dict[str, float] = {
+            "iter_tree().if_isinstance()": measure(lambda: scan_queries(tree, n_queries)),
+            "find_all()": measure(lambda: index_queries(tree, n_queries)),
+        }
+        report(f"{n_queries} passes", results, baseline="iter_tree().if_isinstance()")
+
+
+if __name__ == "__main__":
+    main()
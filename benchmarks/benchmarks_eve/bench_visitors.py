@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmarks for :mod:`eve.visitors`."""
+
+
+from __future__ import annotations
+
+from typing import Any
+
+import eve
+import eve.codegen
+
+from .common import BenchExpr, count_nodes, make_balanced_tree, measure, report
+
+
+class _LegacyDispatchMixin:
+    """Visitor dispatch looking up the visitor method in every call (without cache)."""
+
+    def visit(self, node: Any, **kwargs: Any) -> Any:
+        visitor = self.generic_visit
+
+        method_name = "visit_" + node.__class__.__name__
+        if hasattr(self, method_name):
+            visitor = getattr(self, method_name)
+        elif isinstance(node, eve.Node):
+            for node_class in node.__class__.__mro__[1:]:
+                method_name = "visit_" + node_class.__name__
+                if hasattr(self, method_name):
+                    visitor = getattr(self, method_name)
+                    break
+
+                if node_class is eve.Node:
+                    break
+
+        return visitor(node, **kwargs)
+
+
+class CountingVisitor(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def visit_BenchExpr(self, node: BenchExpr, **kwargs: Any) -> None:
+        self.count += 1
+        self.generic_visit(node, **kwargs)
+
+
+class LegacyCountingVisitor(_LegacyDispatchMixin, CountingVisitor):
+    pass
+
+
+class DispatchOnlyVisitor(eve.NodeVisitor):
+    def visit_BenchExpr(self, node: BenchExpr, **kwargs: Any) -> None:
+        pass
+
+
+class LegacyDispatchOnlyVisitor(_LegacyDispatchMixin, DispatchOnlyVisitor):
+    pass
+
+
+class BenchGenerator(eve.codegen.TemplatedGenerator):
+    BenchExpr = eve.codegen.FormatTemplate("expr")
+
+
+class LegacyBenchGenerator(BenchGenerator):
+    def get_template(self, node: Any) -> Any:
+        template = None
+        template_key = None
+        if isinstance(node, eve.Node):
+            for node_class in node.__class__.__mro__:
+                template_key = node_class.__name__
+                template = self.__templates__.get(template_key, None)
+                if template is not None or node_class is eve.Node:
+                    break
+
+        return template, None if template is None else template_key
+
+
+def main(n_nodes: int = 10000) -> None:
+    tree = make_balanced_tree(n_nodes)
+    print(f"Synthetic tree with {count_nodes(tree)} nodes")
+
+    def run(visitor_class: type) -> None:
+        visitor = visitor_class()
+        visitor.visit(tree)
+        assert visitor.count > 0
+
+    results = {
+        "uncached dispatch (per-call MRO walk)": measure(lambda: run(LegacyCountingVisitor)),
+        "cached dispatch": measure(lambda: run(CountingVisitor)),
+    }
+    report("Full tree traversal", results, baseline="uncached dispatch (per-call MRO walk)")
+
+    nodes = eve.iter_tree(tree).to_list()
+
+    def dispatch_all(visitor: eve.NodeVisitor) -> None:
+        for node in nodes:
+            visitor.visit(node)
+
+    results = {
+        "uncached dispatch (per-call MRO walk)": measure(
+            lambda: dispatch_all(LegacyDispatchOnlyVisitor())
+        ),
+        "cached dispatch": measure(lambda: dispatch_all(DispatchOnlyVisitor())),
+    }
+    report(
+        "NodeVisitor.visit() dispatch only",
+        results,
+        baseline="uncached dispatch (per-call MRO walk)",
+    )
+
+    def get_all_templates(generator: eve.codegen.TemplatedGenerator) -> None:
+        for node in nodes:
+            generator.get_template(node)
+
+    results = {
+        "uncached lookup (per-call MRO walk)": measure(
+            lambda: get_all_templates(LegacyBenchGenerator())
+        ),
+        "cached lookup": measure(lambda: get_all_templates(BenchGenerator())),
+    }
+    report(
+        "TemplatedGenerator.get_template()", results, baseline="uncached lookup (per-call MRO walk)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Synthetic trees and timing helpers shared by the Eve benchmarks."""
+
+
+from __future__ import annotations
+
+import timeit
+from typing import Any, Callable, List, Union
+
+import eve
+
+
+class BenchExpr(eve.Node):
+    pass
+
+
+class BenchLiteral(BenchExpr):
+    value: eve.Int
+
+
+class BenchNaryOp(BenchExpr):
+    op: eve.Str
+    operands: List[Union[BenchNaryOp, BenchLiteral]]
+
+
+BenchNaryOp.update_forward_refs()
+
+
+def make_balanced_tree(n_nodes: int, fanout: int = 4) -> BenchNaryOp:
+    """Create a balanced tree with (approximately) ``n_nodes`` nodes."""
+
+    # Build level by level from the leaves to the root
+    n_leaves = max(fanout, (n_nodes * (fanout - 1)) // fanout)
+    level: List[BenchExpr] = [BenchLiteral(value=i) for i in range(n_leaves)]
+    while len(level) > 1:
+        level = [
+            BenchNaryOp(op="+", operands=level[i : i + fanout])
+            for i in range(0, len(level), fanout)
+        ]
+
+    root = level[0]
+    assert isinstance(root, BenchNaryOp)
+    return root
+
+
+def count_nodes(root: eve.Node) -> int:
+    return eve.iter_tree(root).if_isinstance(eve.Node).reduce(lambda count, _: count + 1, init=0)
+
+
+def measure(func: Callable[[], Any], *, repeat: int = 5, number: int = 1) -> float:
+    """Return the best time (in seconds) of ``repeat`` runs of ``number`` calls."""
+
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def report(title: str, results: dict, *, baseline: Union[str, None] = None) -> None:
+    print(f"\n{title}")
+    print("-" * len(title))
+    base_time = results[baseline] if baseline else None
+    for name, value in results.items():
+        line = f"  {name:<40} {value * 1e3:10.3f} ms"
+        if base_time and name != baseline:
+            line += f"   (x{base_time / value:.2f})"
+        print(line)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the on-disk compilation cache of the frontend."""
+
+
+import contextlib
+import io
+import tempfile
+
+from gt_frontend.compilation_cache import CompilationCache
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from .common import measure, report
+
+
+def generate_all(cache=None):
+    for name in stencil_definitions.valid_stencils:
+        GTScriptCompilationTask(getattr(stencil_definitions, name)).generate(cache=cache)
+
+
+def main() -> None:
+    print(f"Code generation of {len(stencil_definitions.valid_stencils)} stencils")
+    with tempfile.TemporaryDirectory() as cache_dir, contextlib.redirect_stdout(
+        io.StringIO()
+    ), contextlib.redirect_stderr(io.StringIO()):
+        cache = CompilationCache(cache_dir)
+        irs_cache = CompilationCache(cache_dir + "/irs", store_irs=True)
+        generate_all(cache)
+        generate_all(irs_cache)
+        results = {
+            "no cache": measure(generate_all, repeat=3),
+            "cache hits": measure(lambda: generate_all(cache)),
+            "cache hits (with IRs)": measure(lambda: generate_all(irs_cache)),
+        }
+
+    report("Time: generate()", results, baseline="no cache")
+    print(f"\n  {cache.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the trusted (validation-free) construction of nodes in the compilation pipeline."""
+
+
+import contextlib
+import io
+from typing import Callable, Dict
+
+import eve
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from .common import measure, report
+
+
+@contextlib.contextmanager
+def validated_construction():
+    """Make the lowering passes validate all the new nodes (as before trusted construction)."""
+    trusted_construction = eve.trusted_construction
+    eve.trusted_construction = lambda: trusted_construction(False)
+    try:
+        yield
+    finally:
+        eve.trusted_construction = trusted_construction
+
+
+def generate(definition: Callable, *, validate: bool = False) -> str:
+    task = GTScriptCompilationTask(definition)
+    cpp_code = task.generate(format_code=False)
+    if validate:
+        # Same validation as with `generate(debug=True)`, without the dumps
+        eve.validate_tree(task.nir)
+        eve.validate_tree(task.usid)
+    return cpp_code
+
+
+def measure_pipeline(definitions: Dict[str, Callable]) -> Dict[str, float]:
+    def generate_all(**kwargs):
+        return [generate(definition, **kwargs) for definition in definitions.values()]
+
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        with validated_construction():
+            validated_time = measure(generate_all, repeat=10)
+        return {
+            "validated construction": validated_time,
+            "trusted construction + validate_tree": measure(
+                lambda: generate_all(validate=True), repeat=10
+            ),
+            "trusted construction (default)": measure(generate_all, repeat=10),
+        }
+
+
+def main() -> None:
+    valid_stencils = {
+        name: getattr(stencil_definitions, name) for name in stencil_definitions.valid_stencils
+    }
+    for title, definitions in (
+        ("fvm_nabla", {"fvm_nabla": stencil_definitions.fvm_nabla}),
+        (f"all the valid test stencils ({len(valid_stencils)})", valid_stencils),
+    ):
+        report(
+            f"Time: GTScriptCompilationTask.generate() of {title}",
+            measure_pipeline(definitions),
+            baseline="validated construction",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the parallel compilation of many stencils."""
+
+
+import contextlib
+import io
+import os
+
+from gt_frontend.frontend import GTScriptCompilationTask, compile_many
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from .common import measure, report
+
+
+def compile_serial(definitions):
+    return [GTScriptCompilationTask(definition).generate() for definition in definitions]
+
+
+def main(copies: int = 8) -> None:
+    definitions = [
+        getattr(stencil_definitions, name) for name in stencil_definitions.valid_stencils
+    ] * copies
+    n_workers = os.cpu_count() or 1
+    print(f"Compilation of {len(definitions)} stencils ({n_workers} CPUs)")
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        results = {"serial (in process)": measure(lambda: compile_serial(definitions), repeat=3)}
+        for max_workers in sorted({1, 2, n_workers}):
+            results[f"compile_many(max_workers={max_workers})"] = measure(
+                lambda: compile_many(definitions, max_workers=max_workers), repeat=3
+            )
+        stage_results = compile_many(definitions[: len(stencil_definitions.valid_stencils)])
+
+    report("Time: code generation", results, baseline="serial (in process)", unit="s")
+    for result in stage_results:
+        timings = ", ".join(f"{stage}={t * 1e3:.1f} ms" for stage, t in result.timings.items())
+        print(f"\n  {result.name}: {timings}", end="")
+    print()
+
+
+if __name__ == "__main__":
+    main()
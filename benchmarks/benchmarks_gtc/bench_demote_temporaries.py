@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Temporary storages and bytes moved before and after demoting temporaries to local variables."""
+
+
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from gtc.unstructured.nir_passes.demote_temporaries import demote_temporaries
+from gtc.unstructured.nir_passes.fuse_horizontal_loops import fuse_horizontal_loops
+
+from .bench_loop_fusion import computation_cost
+from .common import make_irs, measure, report
+
+
+def main() -> None:
+    print(
+        f"\n{'stencil':<20} {'pass':<24} {'temporaries':>12} {'kernels':>8} {'bytes/element':>14}"
+    )
+    for name in stencil_definitions.valid_stencils:
+        fused_comp = fuse_horizontal_loops(make_irs(name)["nir"])
+        for title, comp in [
+            ("fused", fused_comp),
+            ("demoted temporaries", demote_temporaries(fused_comp)),
+        ]:
+            cost = computation_cost(comp)
+            print(
+                f"{name:<20} {title:<24} {len(comp.declarations):>12} "
+                f"{cost.kernels:>8} {cost.bytes_moved:>14}"
+            )
+
+    fused_comp = fuse_horizontal_loops(make_irs("fvm_nabla", scale=50)["nir"])
+    report(
+        "Time: demote_temporaries (fvm_nabla x50)",
+        {"demote_temporaries": measure(lambda: demote_temporaries(fused_comp))},
+        unit="ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the field dependency graph of long sequences of horizontal loops."""
+
+
+import networkx as nx
+from tests.tests_gtc.nir_utils import make_chain
+
+from eve import NodeVisitor
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.field_dependency_graph import generate_dependency_graph
+
+from .common import measure, measure_memory, report
+
+
+class NetworkxFieldWriteDependencyGraph(NodeVisitor):
+    """Previous implementation building a `networkx.DiGraph` keyed by `id_`."""
+
+    def __init__(self):
+        self.graph = nx.DiGraph()
+        self.last_write_access = {}
+
+    @classmethod
+    def generate(cls, loops):
+        instance = cls()
+        for loop in loops:
+            instance.visit(loop)
+        return instance.graph
+
+    def visit_FieldAccess(self, node: nir.FieldAccess, **kwargs):
+        if node.name in self.last_write_access:
+            source = self.last_write_access[node.name]
+            self.graph.add_edge(source, kwargs["current_write"].id_, extent=node.extent)
+
+    def visit_AssignStmt(self, node: nir.AssignStmt, **kwargs):
+        self.graph.add_node(node.left.id_)
+        self.visit(node.right, current_write=node.left)
+        self.last_write_access[node.left.name] = node.left.id_
+
+
+def main(n_loops: int = 5000) -> None:
+    loops = make_chain(n_loops, offset_every=10).horizontal_loops
+
+    def networkx_queries():
+        graph = NetworkxFieldWriteDependencyGraph.generate(loops)
+        return (
+            any(extent for _, _, extent in graph.edges(data="extent")),
+            list(nx.topological_sort(graph)),
+            nx.descendants(graph, loops[0].stmt.statements[0].left.id_),
+        )
+
+    def compact_queries():
+        graph = generate_dependency_graph(loops)
+        return (
+            graph.has_read_with_offset_after_write,
+            graph.topological_order(),
+            graph.reachable(0),
+        )
+
+    networkx_graph = NetworkxFieldWriteDependencyGraph.generate(loops)
+    compact_graph = generate_dependency_graph(loops)
+    assert networkx_graph.number_of_edges() == compact_graph.num_edges == n_loops - 1
+    assert nx.is_isomorphic(networkx_graph, compact_graph.to_networkx())
+
+    report(
+        f"Time: dependency graph of {n_loops} horizontal loops (build)",
+        {
+            "networkx.DiGraph": measure(
+                lambda: NetworkxFieldWriteDependencyGraph.generate(loops), repeat=3
+            ),
+            "FieldDependencyGraph": measure(lambda: generate_dependency_graph(loops), repeat=3),
+        },
+        baseline="networkx.DiGraph",
+        unit="ms",
+    )
+    report(
+        f"Time: dependency graph of {n_loops} horizontal loops (build + queries)",
+        {
+            "networkx.DiGraph": measure(networkx_queries, repeat=3),
+            "FieldDependencyGraph": measure(compact_queries, repeat=3),
+        },
+        baseline="networkx.DiGraph",
+        unit="ms",
+    )
+    # Only the graph itself (the visited loops are shared)
+    report(
+        f"Memory: dependency graph of {n_loops} horizontal loops (allocated)",
+        {
+            "networkx.DiGraph": measure_memory(
+                lambda: NetworkxFieldWriteDependencyGraph.generate(loops)
+            )[0],
+            "FieldDependencyGraph": measure_memory(lambda: generate_dependency_graph(loops))[0],
+        },
+        baseline="networkx.DiGraph",
+        unit="KiB",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the formatting of the generated C++ code."""
+
+
+import contextlib
+import io
+
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from eve import codegen
+
+from .common import measure, report
+
+
+def generate_sources(copies: int):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        sources = [
+            GTScriptCompilationTask(getattr(stencil_definitions, name)).generate(format_code=False)
+            for name in stencil_definitions.valid_stencils
+        ]
+    # Make every copy different to avoid hitting the formatting cache
+    return [f"// copy {i}\n{source}" for i in range(copies) for source in sources]
+
+
+def format_one_by_one(sources):
+    codegen._cpp_format_cache.clear()
+    return [codegen.format_source("cpp", source, style="LLVM") for source in sources]
+
+
+def format_batch(sources):
+    codegen._cpp_format_cache.clear()
+    return codegen.format_sources("cpp", sources, style="LLVM")
+
+
+def main(copies: int = 20) -> None:
+    sources = generate_sources(copies)
+    print(f"Formatting of {len(sources)} generated sources")
+    assert format_one_by_one(sources) == format_batch(sources)
+
+    times = {
+        "one process per source": measure(lambda: format_one_by_one(sources), repeat=3),
+        "batched": measure(lambda: format_batch(sources), repeat=3),
+    }
+    format_batch(sources)
+    times["cached"] = measure(lambda: codegen.format_sources("cpp", sources, style="LLVM"))
+    with codegen.source_formatting(False):
+        times["skipped"] = measure(lambda: codegen.format_sources("cpp", sources, style="LLVM"))
+
+    report("Time: formatting", times, baseline="one process per source", unit="ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the import time of eve and the gtc modules."""
+
+
+from tests.tests_gtc.unit_tests.test_import_time import import_times
+
+from .common import report
+
+
+MODULES = (
+    "eve",
+    "eve.codegen",
+    "gtc.unstructured.nir",
+    "gtc.unstructured.usid_codegen",
+    "gt_frontend.frontend",
+)
+
+
+def main(repeat: int = 5) -> None:
+    times = {
+        module_name: min(import_times(module_name)[module_name] for _ in range(repeat)) * 1e-6
+        for module_name in MODULES
+    }
+    report("Time: import in a new interpreter (-X importtime)", times, unit="ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the interning of immutable nodes in the lowered IRs."""
+
+
+import eve
+
+from gtc.unstructured import nir, usid
+
+from .common import make_irs, measure, measure_memory, report
+
+
+INTERNED_CLASSES = (
+    nir.NeighborChain,
+    usid.NeighborChain,
+    usid.Connectivity,
+    usid.SidCompositeEntry,
+    usid.SidCompositeNeighborTableEntry,
+)
+
+
+def lower(scale: int):
+    irs = make_irs("fvm_nabla", scale=scale)
+    return irs["merged_nir"], irs["usid"]
+
+
+def count_instances(trees):
+    nodes = [
+        node
+        for tree in trees
+        for node in tree.iter_tree().if_isinstance(*INTERNED_CLASSES).to_list()
+    ]
+    return len(nodes), len({id(node) for node in nodes})
+
+
+def main(scale: int = 100) -> None:
+    print(f"Lowering of fvm_nabla (replicated x{scale})")
+
+    memory, times = {}, {}
+    for name, enabled in (("no interning", False), ("interning", True)):
+        with eve.node_interning(enabled):
+            n_nodes, n_instances = count_instances(lower(scale))
+            print(f"  {name}: {n_instances} instances for {n_nodes} interned-class nodes")
+            memory[name], _ = measure_memory(lambda: lower(scale))
+            times[name] = measure(lambda: lower(scale), repeat=3)
+
+    report("Retained memory: merged NIR + USID", memory, baseline="no interning", unit="KiB")
+    report("Time: lowering", times, baseline="no interning", unit="s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Kernel counts and bytes moved with the fusion of adjacent and reordered horizontal loops."""
+
+
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from gtc import common
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.fuse_horizontal_loops import fuse_horizontal_loops, fusion_cost
+from gtc.unstructured.nir_passes.merge_horizontal_loops import find_and_merge_horizontal_loops
+
+from .common import make_irs, measure, report
+
+
+def computation_cost(computation: nir.Computation):
+    field_sizes = {
+        field.name: common.DATA_TYPE_SIZES[field.vtype]
+        for field in computation.params + computation.declarations
+    }
+    groups = [
+        [loop]
+        for stencil in computation.stencils
+        for vertical_loop in stencil.vertical_loops
+        for loop in vertical_loop.horizontal_loops
+    ]
+    return fusion_cost(groups, field_sizes)
+
+
+def main(stencil_names=("fvm_nabla", "nested")) -> None:
+    print(f"\n{'stencil':<20} {'pass':<36} {'kernels':>8} {'bytes/element':>14}")
+    for name in stencil_definitions.valid_stencils:
+        nir_comp = make_irs(name)["nir"]
+        for title, func in [
+            ("unfused", lambda comp: comp),
+            ("find_and_merge_horizontal_loops", find_and_merge_horizontal_loops),
+            ("fuse_horizontal_loops", fuse_horizontal_loops),
+        ]:
+            cost = computation_cost(func(nir_comp))
+            print(f"{name:<20} {title:<36} {cost.kernels:>8} {cost.bytes_moved:>14}")
+
+    for name in stencil_names:
+        nir_comp = make_irs(name, scale=50)["nir"]
+        report(
+            f"Time: {name} (x50)",
+            {
+                "find_and_merge_horizontal_loops": measure(
+                    lambda: find_and_merge_horizontal_loops(nir_comp)
+                ),
+                "fuse_horizontal_loops": measure(lambda: fuse_horizontal_loops(nir_comp)),
+            },
+            baseline="find_and_merge_horizontal_loops",
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
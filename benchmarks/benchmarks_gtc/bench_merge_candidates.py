@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the search of horizontal loop merge candidates in long vertical loops."""
+
+
+from tests.tests_gtc.nir_utils import make_chain
+
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.field_dependency_graph import generate_dependency_graph
+from gtc.unstructured.nir_passes.merge_horizontal_loops import _FindMergeCandidatesAnalysis
+
+from .common import measure, report
+
+
+class RebuildingMergeCandidatesAnalysis(_FindMergeCandidatesAnalysis):
+    """Previous implementation rebuilding the dependency graph for every new loop."""
+
+    def visit_HorizontalLoop(self, node: nir.HorizontalLoop, **kwargs):
+        if self.candidate and self.candidate[-1].location_type == node.location_type:
+            dependencies = generate_dependency_graph(self.candidate + [node])
+            if not dependencies.has_read_with_offset_after_write:
+                self.candidate.append(node)
+                return
+        if len(self.candidate) > 1:
+            self.candidates.append(self.candidate)
+        self.candidate = [node]
+
+
+def main(n_loops: int = 500) -> None:
+    for offset_every in (0, 50):
+        vertical_loop = make_chain(n_loops, offset_every)
+        assert RebuildingMergeCandidatesAnalysis.find(
+            vertical_loop
+        ) == _FindMergeCandidatesAnalysis.find(vertical_loop)
+
+        description = f"reads with offset every {offset_every} loops" if offset_every else "fusable"
+        report(
+            f"Time: merge candidates of {n_loops} horizontal loops ({description})",
+            {
+                "rebuilt dependency graph": measure(
+                    lambda: RebuildingMergeCandidatesAnalysis.find(vertical_loop), repeat=3
+                ),
+                "incremental dependency graph": measure(
+                    lambda: _FindMergeCandidatesAnalysis.find(vertical_loop), repeat=3
+                ),
+            },
+            baseline="rebuilt dependency graph",
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
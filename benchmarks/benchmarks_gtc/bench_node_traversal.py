@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the per-node cost of tree traversals over a large GTIR tree."""
+
+
+import contextlib
+from typing import Any, Dict, Iterator, Tuple
+
+import eve
+from eve.concepts import _EVE_NODE_IMPL_SUFFIX, _EVE_NODE_INTERNAL_SUFFIX, BaseNode
+
+from gtc.unstructured import gtir
+
+from .common import make_task, measure, report
+
+
+# -- Previous implementations (scanning `__fields__` on every call) --
+def legacy_iter_impl_fields(self: eve.Node) -> Iterator[Tuple[str, Any]]:
+    for name, _ in self.__fields__.items():
+        if name.endswith(_EVE_NODE_IMPL_SUFFIX) and not name.endswith(_EVE_NODE_INTERNAL_SUFFIX):
+            yield name, getattr(self, name)
+
+
+def legacy_iter_children(self: eve.Node) -> Iterator[Tuple[str, Any]]:
+    for name, _ in self.__fields__.items():
+        if not (name.endswith(_EVE_NODE_IMPL_SUFFIX) or name.endswith(_EVE_NODE_INTERNAL_SUFFIX)):
+            yield name, getattr(self, name)
+
+
+def legacy_iter_children_values(self: eve.Node) -> Iterator[Any]:
+    for _, node in self.iter_children():
+        yield node
+
+
+@contextlib.contextmanager
+def legacy_accessors():
+    methods = {
+        "iter_impl_fields": legacy_iter_impl_fields,
+        "iter_children": legacy_iter_children,
+        "iter_children_values": legacy_iter_children_values,
+    }
+    saved = {name: getattr(BaseNode, name) for name in methods}
+    try:
+        for name, method in methods.items():
+            setattr(BaseNode, name, method)
+        yield
+    finally:
+        for name, method in saved.items():
+            setattr(BaseNode, name, method)
+
+
+def make_gtir(scale: int) -> gtir.Computation:
+    gtir_comp = make_task("fvm_nabla").gtir
+    return gtir.Computation(
+        name=gtir_comp.name,
+        params=gtir_comp.params,
+        declarations=gtir_comp.declarations,
+        stencils=[s.copy(deep=True) for _ in range(scale) for s in gtir_comp.stencils],
+    )
+
+
+class CopyingTranslator(eve.NodeTranslator):
+    pass
+
+
+def main(scale: int = 200) -> None:
+    tree = make_gtir(scale)
+    n_nodes = len(tree.iter_tree().if_isinstance(eve.Node).to_list())
+    print(f"fvm_nabla GTIR (replicated x{scale}): {n_nodes} nodes")
+
+    traversals = {
+        "iter_tree_pre": lambda: eve.iterators.iter_tree_pre(tree).to_list(),
+        "iter_tree_pre (with keys)": lambda: eve.iterators.iter_tree_pre(
+            tree, with_keys=True
+        ).to_list(),
+        "NodeVisitor": lambda: eve.NodeVisitor().visit(tree),
+        "NodeTranslator (copy)": lambda: CopyingTranslator().visit(tree),
+    }
+
+    for name, func in traversals.items():
+        results: Dict[str, float] = {}
+        with legacy_accessors():
+            results["__fields__ scan (per node)"] = measure(func, repeat=3) / n_nodes
+        results["precomputed accessors (per node)"] = measure(func, repeat=3) / n_nodes
+        report(name, results, baseline="__fields__ scan (per node)", unit="us")
+
+
+if __name__ == "__main__":
+    main()
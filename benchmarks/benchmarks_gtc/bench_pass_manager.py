@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Per-pass timings of the frontend pipeline using the eve :class:`PassManager`."""
+
+
+import contextlib
+import io
+
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+
+def main() -> None:
+    for name in stencil_definitions.valid_stencils:
+        task = GTScriptCompilationTask(getattr(stencil_definitions, name))
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            task.generate()
+        time_report = task.pass_manager.report(task.pass_stats)
+
+        task = GTScriptCompilationTask(getattr(stencil_definitions, name))
+        task.pass_manager.trace_memory = True
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            task.generate()
+        memory_report = task.pass_manager.report(task.pass_stats)
+
+        print(f"\n{name}\n{'-' * len(name)}")
+        print(time_report)
+        print(f"\n{name} (tracing memory)")
+        print(memory_report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the type-directed pruning of targeted traversals of a large NIR tree."""
+
+
+import contextlib
+from typing import Dict
+
+import eve
+
+from gtc.unstructured import nir, usid
+from gtc.unstructured.nir_passes.field_dependency_graph import _FieldWriteDependencyGraph
+from gtc.unstructured.nir_passes.merge_horizontal_loops import _FindMergeCandidatesAnalysis
+from gtc.unstructured.nir_to_usid import NeighborLoopCollector
+
+from .common import make_irs, measure, report
+
+
+@contextlib.contextmanager
+def unpruned_visitors():
+    visitor_classes = [
+        _FieldWriteDependencyGraph,
+        _FindMergeCandidatesAnalysis,
+        NeighborLoopCollector,
+    ]
+    saved = {cls: cls.visited_node_types for cls in visitor_classes}
+    try:
+        for cls in visitor_classes:
+            cls.visited_node_types = None
+        yield
+    finally:
+        for cls, node_types in saved.items():
+            cls.visited_node_types = node_types
+
+
+def main(scale: int = 50) -> None:
+    tree = make_irs("fvm_nabla", scale=scale)["merged_nir"]
+    loops = tree.iter_tree().if_isinstance(nir.HorizontalLoop).to_list()
+    n_nodes = len(tree.iter_tree().if_isinstance(eve.Node).to_list())
+    print(f"fvm_nabla merged NIR (replicated x{scale}): {n_nodes} nodes, {len(loops)} loops")
+
+    analyses = {
+        "FieldAccess scans (per loop)": (
+            lambda: [
+                tuple(eve.iter_tree(loop.stmt).if_isinstance(nir.FieldAccess)) for loop in loops
+            ],
+            lambda: [tuple(eve.iter_tree_instances(loop.stmt, nir.FieldAccess)) for loop in loops],
+        ),
+        "field dependency graph (per loop)": (
+            lambda: [_FieldWriteDependencyGraph.generate([loop]) for loop in loops],
+            None,
+        ),
+        "merge candidates": (lambda: _FindMergeCandidatesAnalysis.find(tree), None),
+        "neighbor loops (per loop)": (
+            lambda: [
+                NeighborLoopCollector.apply(
+                    loop.stmt, chain=usid.NeighborChain(elements=(loop.location_type,))
+                )
+                for loop in loops
+            ],
+            None,
+        ),
+    }
+
+    for name, (func, pruned_func) in analyses.items():
+        results: Dict[str, float] = {}
+        with unpruned_visitors():
+            results["full traversal"] = measure(func, repeat=3)
+        results["pruned traversal"] = measure(pruned_func or func, repeat=3)
+        report(name, results, baseline="full traversal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the memoized rendering of templates in the USID code generator."""
+
+
+from types import MappingProxyType
+
+from gtc.unstructured.usid_codegen import SymbolTblHelper, UsidNaiveCodeGenerator
+
+from .common import make_irs, measure, report
+
+
+class UncachedGenerator(UsidNaiveCodeGenerator):
+    memoized_templates = MappingProxyType({})
+
+
+def main(scale: int = 50) -> None:
+    usid = SymbolTblHelper().visit(make_irs("fvm_nabla", scale=scale)["usid"])
+    print(f"Rendering of fvm_nabla (replicated x{scale}), without formatting")
+
+    def render_cold():
+        UsidNaiveCodeGenerator.clear_render_cache()
+        return UsidNaiveCodeGenerator().visit(usid)
+
+    assert render_cold() == UncachedGenerator().visit(usid)
+
+    times = {
+        "no render cache": measure(lambda: UncachedGenerator().visit(usid), repeat=3),
+        "render cache (cold)": measure(render_cold, repeat=3),
+        "render cache (warm)": measure(lambda: UsidNaiveCodeGenerator().visit(usid), repeat=3),
+    }
+    report("Time: rendering", times, baseline="no render cache", unit="ms")
+
+    render_cold()
+    print(f"  {UsidNaiveCodeGenerator.render_cache_stats}")
+
+
+if __name__ == "__main__":
+    main()
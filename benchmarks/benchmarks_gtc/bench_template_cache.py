@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Benchmarks for the import of the USID code generators and the compilation of their templates."""
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from typing import Callable, Tuple
+
+from .common import report
+
+
+SCRIPT = textwrap.dedent(
+    """
+    import time
+    start = time.perf_counter()
+    import gtc.unstructured.usid_codegen as m
+    imported = time.perf_counter()
+    for gen in (m.UsidNaiveCodeGenerator, m.UsidGpuCodeGenerator):
+        for template in gen.__templates__.values():
+            getattr(template, "compile", lambda: None)()
+    print(imported - start, time.perf_counter() - imported)
+    """
+)
+
+
+def run(cache_dir: str) -> Tuple[float, float]:
+    """Return the times (in seconds) of the import and the template compilation."""
+
+    env = dict(os.environ, EVE_TEMPLATE_CACHE_DIR=cache_dir)
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    import_time, compile_time = output.split()[-2:]
+
+    return float(import_time), float(compile_time)
+
+
+def best_of(func: Callable[[], Tuple[float, float]], repeat: int = 5) -> Tuple[float, float]:
+    import_times, compile_times = zip(*(func() for _ in range(repeat)))
+    return min(import_times), min(compile_times)
+
+
+def run_cold() -> Tuple[float, float]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        return run(cache_dir)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        run(cache_dir)
+        results = {
+            "no disk cache": best_of(lambda: run("")),
+            "cold disk cache": best_of(run_cold),
+            "warm disk cache": best_of(lambda: run(cache_dir)),
+        }
+
+    report(
+        "Time: import gtc.unstructured.usid_codegen (templates are compiled lazily)",
+        {name: import_time for name, (import_time, _) in results.items()},
+        baseline="no disk cache",
+        unit="ms",
+    )
+    report(
+        "Time: compilation of all the USID templates",
+        {name: compile_time for name, (_, compile_time) in results.items()},
+        baseline="no disk cache",
+        unit="ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Peak memory of the temporaries of the test stencils with and without storage sharing."""
+
+
+import contextlib
+import io
+
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from gtc import common
+from gtc.unstructured.usid_passes.share_temporary_storage import (
+    share_temporary_storage,
+    temporary_memory,
+)
+
+from .common import measure, report
+
+
+#: Sizes of a triangular mesh with 10^6 vertices
+MESH_SIZES = {
+    common.LocationType.Vertex: 1_000_000,
+    common.LocationType.Edge: 3_000_000,
+    common.LocationType.Cell: 2_000_000,
+}
+K_SIZE = 80
+
+
+def make_usid(stencil_name: str):
+    task = GTScriptCompilationTask(getattr(stencil_definitions, stencil_name))
+    task.pass_manager.skip("share_temporary_storage")
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        task.generate()
+    return task.usid
+
+
+def main() -> None:
+    print(
+        f"\nPeak temporary memory (MiB) for {MESH_SIZES[common.LocationType.Vertex]} vertices "
+        f"and {K_SIZE} levels"
+    )
+    print(f"{'computation':<20} {'temporaries':>12} {'storages':>9} {'before':>10} {'after':>10}")
+    for name in stencil_definitions.valid_stencils:
+        usid_comp = make_usid(name)
+        shared_comp = share_temporary_storage(usid_comp)
+        memory = temporary_memory(usid_comp, MESH_SIZES, K_SIZE)
+        n_storages = sum(temporary.storage is None for temporary in shared_comp.temporaries)
+        print(
+            f"{name:<20} {len(usid_comp.temporaries):>12} {n_storages:>9} "
+            f"{memory.unshared / 2**20:>10.1f} {memory.shared / 2**20:>10.1f}"
+        )
+
+    usid_comp = make_usid("temporary_chain")
+    report(
+        "Time: share_temporary_storage (temporary_chain)",
+        {"share_temporary_storage": measure(lambda: share_temporary_storage(usid_comp))},
+        unit="us",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmarks for structural sharing in light translation passes."""
+
+
+from gtc.unstructured.nir_passes.merge_horizontal_loops import find_and_merge_horizontal_loops
+from gtc.unstructured.usid_codegen import SymbolTblHelper
+
+from .common import make_irs, measure, measure_memory, report
+
+
+class CopyingSymbolTblHelper(SymbolTblHelper):
+    structural_sharing = False
+
+
+def copying_find_and_merge_horizontal_loops(root):
+    # Emulate the previous implementation copying the whole tree before merging
+    return find_and_merge_horizontal_loops(root.copy(deep=True))
+
+
+def main(scale: int = 20) -> None:
+    irs = make_irs("fvm_nabla", scale=scale)
+    usid_comp = irs["usid"]
+    nir_comp = irs["nir"]
+    print(f"fvm_nabla stencil (replicated x{scale})")
+
+    passes = {
+        "SymbolTblHelper (copying)": lambda: CopyingSymbolTblHelper().visit(usid_comp),
+        "SymbolTblHelper (structural sharing)": lambda: SymbolTblHelper().visit(usid_comp),
+        "find_and_merge_horizontal_loops (copying)": lambda: copying_find_and_merge_horizontal_loops(
+            nir_comp
+        ),
+        "find_and_merge_horizontal_loops (sharing)": lambda: find_and_merge_horizontal_loops(
+            nir_comp
+        ),
+    }
+
+    names = list(passes.keys())
+    for i in range(0, len(names), 2):
+        baseline, sharing = names[i], names[i + 1]
+        report(
+            f"Time: {baseline.split(' ')[0]}",
+            {name: measure(passes[name]) for name in (baseline, sharing)},
+            baseline=baseline,
+        )
+        report(
+            f"Allocated memory: {baseline.split(' ')[0]}",
+            {name: measure_memory(passes[name])[0] for name in (baseline, sharing)},
+            baseline=baseline,
+            unit="KiB",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Helpers to build the IRs of the test stencils for benchmarking."""
+
+
+import contextlib
+import io
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from gt_frontend.frontend import GTScriptCompilationTask
+from tests.tests_gtc.unit_tests import stencil_definitions
+
+from gtc.unstructured import nir
+from gtc.unstructured.gtir_to_nir import GtirToNir
+from gtc.unstructured.nir_passes.merge_horizontal_loops import find_and_merge_horizontal_loops
+from gtc.unstructured.nir_to_usid import NirToUsid
+
+
+def make_task(stencil_name: str = "fvm_nabla") -> GTScriptCompilationTask:
+    task = GTScriptCompilationTask(getattr(stencil_definitions, stencil_name))
+    task._generate_gtscript_ast()
+    task._generate_gtir()
+    return task
+
+
+def make_irs(stencil_name: str = "fvm_nabla", *, scale: int = 1) -> Dict[str, Any]:
+    """Lower a test stencil and return its IRs.
+
+    The stencils of the NIR computation are replicated ``scale`` times
+    to emulate bigger stencils.
+    """
+
+    task = make_task(stencil_name)
+    nir_comp = GtirToNir.apply(task.gtir)
+    if scale > 1:
+        nir_comp = nir.Computation(
+            name=nir_comp.name,
+            params=nir_comp.params,
+            declarations=nir_comp.declarations,
+            stencils=[s.copy(deep=True) for _ in range(scale) for s in nir_comp.stencils],
+        )
+    merged_nir_comp = find_and_merge_horizontal_loops(nir_comp)
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        usid_comp = NirToUsid.apply(merged_nir_comp)
+
+    return {"gtir": task.gtir, "nir": nir_comp, "merged_nir": merged_nir_comp, "usid": usid_comp}
+
+
+def measure(func: Callable[[], Any], *, repeat: int = 5, number: int = 1) -> float:
+    """Return the best time (in seconds) of ``repeat`` runs of ``number`` calls."""
+
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def measure_memory(func: Callable[[], Any]) -> Tuple[int, int]:
+    """Return the (allocated, peak) memory in bytes while running ``func``."""
+
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        result = func()
+        end, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return end - start, peak - start
+
+
+def report(
+    title: str, results: Dict[str, float], *, baseline: Optional[str] = None, unit: str = "ms"
+) -> None:
+    print(f"\n{title}")
+    print("-" * len(title))
+    base_value = results[baseline] if baseline else None
+    scale = {"us": 1e6, "ms": 1e3, "s": 1.0, "KiB": 1 / 1024}[unit]
+    for name, value in results.items():
+        line = f"  {name:<44} {value * scale:12.3f} {unit}"
+        if base_value and name != baseline and value:
+            line += f"   (x{base_value / value:.2f})"
+        print(line)
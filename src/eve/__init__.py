@@ -18,7 +18,8 @@
 
 
 # flake8: noqa  # disable flake8 because of non-used imports warnings
-from .version import __version__, __versioninfo__  # isort:skip
+from . import version  # isort:skip
+from .version import __version__  # isort:skip
 
 # Internal dependencies between modules (each line depends on some of the previous ones):
 #
@@ -28,6 +29,7 @@ from .version import __version__, __versioninfo__  # isort:skip
 #   - concepts <-> iterators  (circular dependency only inside methods, it should be safe)
 #   - traits, visitors
 #   - codegen
+#   - passes
 #
 
 from .concepts import (
@@ -35,14 +37,21 @@ from .concepts import (
     FrozenModel,
     FrozenNode,
     GenericNode,
+    InternedNodeConfig,
     Model,
     Node,
     VType,
     field,
     in_field,
+    invalidate_node_indices,
+    node_id_scope,
+    node_interning,
     out_field,
+    trusted_construction,
+    validate_tree,
 )
-from .iterators import iter_tree
+from .iterators import iter_tree, iter_tree_instances
+from .passes import Pass, PassManager, PassStats
 from .traits import SymbolTableTrait
 from .type_definitions import (
     NOTHING,
@@ -67,3 +76,6 @@ from .type_definitions import (
     SymbolRef,
 )
 from .visitors import NodeMutator, NodeTranslator, NodeVisitor
+
+
+__getattr__ = version.versioninfo_getattr(__name__)
@@ -16,33 +16,37 @@
 
 """Tools for source code generation."""
 
-
 from __future__ import annotations
 
 import abc
 import collections.abc
 import contextlib
+import contextvars
+import importlib.util
 import inspect
+import os
 import re
 import string
+import subprocess
 import sys
+import tempfile
 import textwrap
 import types
 import typing
 from subprocess import PIPE, Popen
 
-import black
-import jinja2
-from mako import template as mako_tpl
+import mako
+import xxhash
 
 from . import exceptions, utils
-from .concepts import Node, TreeNode
+from .concepts import Node, NodeMetaclass, TreeNode
 from .typingx import (
     Any,
     Callable,
     ClassVar,
     Collection,
     Dict,
+    Hashable,
     Iterator,
     List,
     Mapping,
@@ -51,6 +55,7 @@ from .typingx import (
     Sequence,
     Set,
     Tuple,
+    Type,
     TypeVar,
     Union,
     cast,
@@ -58,20 +63,26 @@ from .typingx import (
 from .visitors import NodeVisitor
 
 
-try:
-    import clang_format
+# Template engines are only loaded when templates are compiled
+jinja2 = utils.lazy_import("jinja2")
+mako_tpl = utils.lazy_import("mako.template")
 
-    _CLANG_FORMAT_AVAILABLE = True
-    del clang_format
-except ImportError:
-    _CLANG_FORMAT_AVAILABLE = False
+_CLANG_FORMAT_AVAILABLE = importlib.util.find_spec("clang_format") is not None
 
 
 SourceFormatter = Callable[[str], str]
+SourceBatchFormatter = Callable[[Sequence[str]], List[str]]
 
 #: Global dict storing registered formatters.
 SOURCE_FORMATTERS: Dict[str, SourceFormatter] = {}
 
+#: Global dict storing registered formatters of several sources at once.
+SOURCE_BATCH_FORMATTERS: Dict[str, SourceBatchFormatter] = {}
+
+_SOURCE_FORMATTING: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_SOURCE_FORMATTING", default=True
+)
+
 
 class FormatterNameError(exceptions.EveRuntimeError):
     """Run-time error registering a new source code formatter."""
@@ -97,15 +108,21 @@ class TemplateRenderingError(exceptions.EveRuntimeError):
     ...
 
 
-def register_formatter(language: str) -> Callable[[SourceFormatter], SourceFormatter]:
-    """Decorator to register source code formatters for specific languages."""
+def register_formatter(language: str, *, batch: bool = False) -> Callable[[Any], Any]:
+    """Decorator to register source code formatters for specific languages.
+
+    Formatters registered with ``batch=True`` receive a sequence of sources
+    and are used by :func:`format_sources`.
+    """
+
+    registry: Dict[str, Any] = SOURCE_BATCH_FORMATTERS if batch else SOURCE_FORMATTERS
 
-    def _decorator(formatter: SourceFormatter) -> SourceFormatter:
-        if language in SOURCE_FORMATTERS:
+    def _decorator(formatter: Any) -> Any:
+        if language in registry:
             raise FormatterNameError(f"Another formatter for language '{language}' already exists")
 
         assert callable(formatter)
-        SOURCE_FORMATTERS[language] = formatter
+        registry[language] = formatter
 
         return formatter
 
@@ -122,6 +139,8 @@ def format_python_source(
 ) -> str:
     """Format Python source code using black formatter."""
 
+    import black
+
     target_versions = target_versions or f"{sys.version_info.major}{sys.version_info.minor}"
     target_versions = set(black.TargetVersion[f"PY{v.replace('.', '')}"] for v in target_versions)
 
@@ -138,6 +157,39 @@ def format_python_source(
     return formatted_source
 
 
+def _clang_format_args(
+    style: Optional[str], fallback_style: Optional[str], sort_includes: bool
+) -> Tuple[str, ...]:
+    args = ["clang-format"]
+    if style:
+        args.append(f"--style={style}")
+    if fallback_style:
+        args.append(f"--fallback-style={fallback_style}")
+    if sort_includes:
+        args.append("--sort-includes")
+
+    return tuple(args)
+
+
+#: Maximum number of entries in the cache of formatted C++ sources
+CPP_FORMAT_CACHE_SIZE = 256
+
+#: Maximum number of files formatted by a single clang-format process
+CPP_FORMAT_BATCH_SIZE = 128
+
+_cpp_format_cache: collections.OrderedDict = collections.OrderedDict()
+
+
+def _cpp_format_cache_key(source: str, args: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+    return xxhash.xxh64(source.encode()).hexdigest(), args
+
+
+def _store_formatted_cpp_source(key: Tuple[str, Tuple[str, ...]], formatted_source: str) -> None:
+    _cpp_format_cache[key] = formatted_source
+    if len(_cpp_format_cache) > CPP_FORMAT_CACHE_SIZE:
+        _cpp_format_cache.popitem(last=False)
+
+
 if _CLANG_FORMAT_AVAILABLE:
 
     @register_formatter("cpp")
@@ -148,26 +200,108 @@ if _CLANG_FORMAT_AVAILABLE:
         fallback_style: Optional[str] = None,
         sort_includes: bool = False,
     ) -> str:
-        """Format C++ source code using clang-format."""
+        """Format C++ source code using clang-format.
+
+        Results are cached by the source hash and the formatting options.
+        """
 
-        args = ["clang-format"]
-        if style:
-            args.append(f"--style={style}")
-        if fallback_style:
-            args.append(f"--fallback-style={style}")
-        if sort_includes:
-            args.append("--sort-includes")
+        args = _clang_format_args(style, fallback_style, sort_includes)
+        key = _cpp_format_cache_key(source, args)
+        formatted_source = _cpp_format_cache.get(key, None)
+        if formatted_source is not None:
+            _cpp_format_cache.move_to_end(key)
+            return formatted_source
 
         p = Popen(args, stdout=PIPE, stdin=PIPE, encoding="utf8")
         formatted_source, _ = p.communicate(input=source)
         assert isinstance(formatted_source, str)
+        _store_formatted_cpp_source(key, formatted_source)
 
         return formatted_source
 
+    @register_formatter("cpp", batch=True)
+    def format_cpp_sources(
+        sources: Sequence[str],
+        *,
+        style: Optional[str] = None,
+        fallback_style: Optional[str] = None,
+        sort_includes: bool = False,
+    ) -> List[str]:
+        """Format several C++ sources using a single clang-format process per batch.
+
+        Sources are formatted in place in temporary files (up to
+        :data:`CPP_FORMAT_BATCH_SIZE` files per process). Without an explicit
+        `style`, the style is resolved from the current directory as in
+        :func:`format_cpp_source`. Results are cached as in :func:`format_cpp_source`.
+        """
+
+        args = _clang_format_args(style, fallback_style, sort_includes)
+        keys = [_cpp_format_cache_key(source, args) for source in sources]
+        formatted_sources = {key: _cpp_format_cache.get(key, None) for key in keys}
+        pending = {
+            key: source for key, source in zip(keys, sources) if formatted_sources[key] is None
+        }
+
+        if pending:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                format_args = args
+                if style is None:
+                    # clang-format looks for the style file in the directories of the
+                    # formatted files, so the style resolved from the current directory
+                    # (as for sources read from stdin) is stored in the temporary one
+                    style_config = subprocess.run(
+                        [*args, "--dump-config"], check=True, capture_output=True, text=True
+                    ).stdout
+                    with open(os.path.join(tmp_dir, ".clang-format"), "w", encoding="utf-8") as f:
+                        f.write(style_config)
+                    format_args = (*args, "--style=file")
+
+                paths = {}
+                for i, (key, source) in enumerate(pending.items()):
+                    paths[key] = os.path.join(tmp_dir, f"source_{i}.cpp")
+                    with open(paths[key], "w", encoding="utf-8") as f:
+                        f.write(source)
+
+                all_paths = list(paths.values())
+                for start in range(0, len(all_paths), CPP_FORMAT_BATCH_SIZE):
+                    subprocess.run(
+                        [*format_args, "-i", *all_paths[start : start + CPP_FORMAT_BATCH_SIZE]],
+                        check=True,
+                    )
+
+                for key, path in paths.items():
+                    with open(path, encoding="utf-8") as f:
+                        formatted_sources[key] = f.read()
+                    _store_formatted_cpp_source(key, formatted_sources[key])
+
+        return [formatted_sources[key] for key in keys]  # type: ignore  # all keys are set
+
+
+@contextlib.contextmanager
+def source_formatting(enabled: bool = True) -> Iterator[None]:
+    """Context manager to enable or disable the formatting of source code.
+
+    When disabled, :func:`format_source` and :func:`format_sources` return the
+    sources unchanged, which is a fast path for generated code that will not be
+    read by humans.
+
+    Args:
+        enabled: Enable (default) or disable source formatting inside the context.
+
+    """
+    token = _SOURCE_FORMATTING.set(enabled)
+    try:
+        yield
+    finally:
+        _SOURCE_FORMATTING.reset(token)
+
 
 def format_source(language: str, source: str, *, skip_errors: bool = True, **kwargs: Any) -> str:
     """Format source code if a formatter exists for the specific language."""
 
+    if not _SOURCE_FORMATTING.get():
+        return source
+
     formatter = SOURCE_FORMATTERS.get(language, None)
     try:
         if formatter:
@@ -183,6 +317,35 @@ def format_source(language: str, source: str, *, skip_errors: bool = True, **kwa
             ) from e
 
 
+def format_sources(
+    language: str, sources: Sequence[str], *, skip_errors: bool = True, **kwargs: Any
+) -> List[str]:
+    """Format several sources at once (see :func:`format_source`).
+
+    The batch formatter registered for the language is used if available,
+    otherwise every source is formatted independently.
+    """
+
+    if not _SOURCE_FORMATTING.get():
+        return list(sources)
+
+    batch_formatter = SOURCE_BATCH_FORMATTERS.get(language, None)
+    if batch_formatter is None:
+        return [
+            format_source(language, source, skip_errors=skip_errors, **kwargs) for source in sources
+        ]
+
+    try:
+        return batch_formatter(sources, **kwargs)  # type: ignore # Callable does not support **kwargs
+    except Exception as e:
+        if skip_errors:
+            return list(sources)
+        else:
+            raise FormattingError(
+                f"Something went wrong when trying to format '{language}' source code"
+            ) from e
+
+
 class Name:
     """Text formatter with different case styles for symbol names in source code."""
 
@@ -408,8 +571,10 @@ class BaseTemplate(Template):
         frame = inspect.currentframe()
         try:
             if frame is not None:
-                (filename, lineno, _, _, _) = inspect.getframeinfo(frame.f_back.f_back)
-                self.definition_loc = (filename, lineno)
+                # Not using `inspect.getframeinfo()`, which reads the source file and
+                # scans all the loaded modules (forcing the load of lazy ones)
+                caller = frame.f_back.f_back
+                self.definition_loc = (caller.f_code.co_filename, caller.f_lineno)
         except Exception:
             self.definition_loc = None
         finally:
@@ -473,20 +638,73 @@ class StringTemplate(BaseTemplate):
             raise TemplateRenderingError(message, template=self) from e
 
 
+def _template_cache_dir() -> Optional[str]:
+    # The on-disk cache of compiled templates is only used if EVE_TEMPLATE_CACHE_DIR is set
+    path = os.environ.get("EVE_TEMPLATE_CACHE_DIR", "")
+    if not path:
+        return None
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def _write_template_source(cache_dir: str, file_name: str, source: str) -> str:
+    # Sources are content-addressed, so existing files are never rewritten.
+    # New files are written atomically since the cache could be shared by
+    # concurrent processes.
+    path = os.path.join(cache_dir, file_name)
+    if not os.path.exists(path):
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(source)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return path
+
+
 class JinjaTemplate(BaseTemplate):
-    """Template adapter for `jinja2.Template`."""
+    """Template adapter for `jinja2.Template`.
 
-    definition: jinja2.Template
+    Template strings are compiled on the first rendering (or :meth:`compile` call)
+    and, if the ``EVE_TEMPLATE_CACHE_DIR`` environment variable is set, the
+    compiled code is cached on disk in that directory, keyed by the source hash.
+    """
+
+    source: Optional[str]
 
-    __jinja_env__ = jinja2.Environment(undefined=jinja2.StrictUndefined)
+    __jinja_sources__: ClassVar[Dict[str, str]] = {}
+    __jinja_envs__: ClassVar[Dict[Optional[str], jinja2.Environment]] = {}
 
     def __init__(self, definition: Union[str, jinja2.Template], **kwargs: Any) -> None:
         super().__init__()
+        self.source = definition if isinstance(definition, str) else None
+        self._definition: Optional[jinja2.Template] = None
+        if self.source is None:
+            self._load(definition)
+
+    @property
+    def definition(self) -> jinja2.Template:
+        if self._definition is None:
+            self.compile()
+        assert self._definition is not None
+        return self._definition
+
+    def compile(self) -> None:
+        """Compile the template source (if it has not been compiled yet)."""
+        if self._definition is None:
+            self._load(self.source)
+
+    def _load(self, definition: Any) -> None:
         try:
             if isinstance(definition, str):
-                definition = self.__jinja_env__.from_string(definition)
+                definition = self._compile_source(definition)
             assert isinstance(definition, jinja2.Template)
-            self.definition = definition
+            self._definition = definition
         except Exception as e:
             message = "Error in JinjaTemplate"
             if self.definition_loc:
@@ -499,9 +717,32 @@ class JinjaTemplate(BaseTemplate):
 
             raise TemplateDefinitionError(message, definition=definition) from e
 
+    @classmethod
+    def _compile_source(cls, source: str) -> jinja2.Template:
+        cache_dir = _template_cache_dir()
+        env = cls.__jinja_envs__.get(cache_dir, None)
+        if env is None:
+            if cache_dir is None:
+                env = jinja2.Environment(undefined=jinja2.StrictUndefined)
+            else:
+                env = jinja2.Environment(
+                    undefined=jinja2.StrictUndefined,
+                    loader=jinja2.FunctionLoader(cls.__jinja_sources__.get),
+                    bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+                )
+            cls.__jinja_envs__[cache_dir] = env
+        if cache_dir is None:
+            return env.from_string(source)
+
+        name = f"jinja_{utils.shash(jinja2.__version__, source)}"
+        cls.__jinja_sources__[name] = source
+
+        return env.get_template(name)
+
     def render_values(self, **kwargs: Any) -> str:
+        definition = self.definition
         try:
-            return self.definition.render(**kwargs)
+            return definition.render(**kwargs)
         except Exception as e:
             message = f"<{type(self).__name__}>"
             if self.definition_loc:
@@ -515,17 +756,39 @@ class JinjaTemplate(BaseTemplate):
 
 
 class MakoTemplate(BaseTemplate):
-    """Template adapter for `mako.template.Template`."""
+    """Template adapter for `mako.template.Template`.
+
+    Template strings are compiled on the first rendering (or :meth:`compile` call)
+    and the generated Python modules can be cached on disk (see :class:`JinjaTemplate`).
+    """
 
-    definition: mako_tpl.Template
+    source: Optional[str]
 
-    def __init__(self, definition: mako_tpl.Template, **kwargs: Any) -> None:
+    def __init__(self, definition: Union[str, mako_tpl.Template], **kwargs: Any) -> None:
         super().__init__()
+        self.source = definition if isinstance(definition, str) else None
+        self._definition: Optional[mako_tpl.Template] = None
+        if self.source is None:
+            self._load(definition)
+
+    @property
+    def definition(self) -> mako_tpl.Template:
+        if self._definition is None:
+            self.compile()
+        assert self._definition is not None
+        return self._definition
+
+    def compile(self) -> None:
+        """Compile the template source (if it has not been compiled yet)."""
+        if self._definition is None:
+            self._load(self.source)
+
+    def _load(self, definition: Any) -> None:
         try:
             if isinstance(definition, str):
-                definition = mako_tpl.Template(definition)
+                definition = self._compile_source(definition)
             assert isinstance(definition, mako_tpl.Template)
-            self.definition = definition
+            self._definition = definition
         except Exception as e:
             message = "Error in MakoTemplate"
             if self.definition_loc:
@@ -537,9 +800,27 @@ class MakoTemplate(BaseTemplate):
 
             raise TemplateDefinitionError(message, definition=definition) from e
 
+    @staticmethod
+    def _compile_source(source: str) -> mako_tpl.Template:
+        cache_dir = _template_cache_dir()
+        if cache_dir is None:
+            return mako_tpl.Template(source)
+
+        # Mako only caches the modules of file-based templates
+        uri = f"mako_{utils.shash(mako.__version__, source)}.mako"
+        try:
+            file_name = _write_template_source(cache_dir, uri, source)
+        except OSError:
+            return mako_tpl.Template(source)
+
+        return mako_tpl.Template(
+            filename=file_name, uri=uri, module_directory=cache_dir, input_encoding="utf-8"
+        )
+
     def render_values(self, **kwargs: Any) -> str:
+        definition = self.definition
         try:
-            result = self.definition.render(**kwargs)
+            result = definition.render(**kwargs)
             assert isinstance(result, str)
             return result
         except Exception as e:
@@ -554,6 +835,48 @@ class MakoTemplate(BaseTemplate):
             raise TemplateRenderingError(message, template=self) from e
 
 
+class RenderCacheStats:
+    """Statistics of the render cache of a :class:`TemplatedGenerator` class."""
+
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions})"
+        )
+
+
+def _render_key_value(value: Any) -> Hashable:
+    # Nodes are represented by their structural hash (which does not include
+    # the implementation fields) and the values of their implementation
+    # fields other than `id_`, which is unique for every node instance
+    if isinstance(type(value), NodeMetaclass):
+        impl_values = tuple(
+            (name, _render_key_value(getattr(value, name)))
+            for name in value.__node_impl_field_names__
+            if name != "id_"
+        )
+        return (value.content_hash(), impl_values) if impl_values else value.content_hash()
+    if isinstance(value, (list, tuple)):
+        return (value.__class__, tuple(_render_key_value(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return (value.__class__, frozenset(_render_key_value(item) for item in value))
+    if isinstance(value, dict):
+        return (dict, tuple((key, _render_key_value(item)) for key, item in value.items()))
+    return (value.__class__, value)
+
+
 class TemplatedGenerator(NodeVisitor):
     """A code generator visitor using :class:`TextTemplate`.
 
@@ -581,6 +904,9 @@ class TemplatedGenerator(NodeVisitor):
         steps 3 and 4 will be substituted by a call to the :meth:`self.generic_dump()`
         method.
 
+    The template found for each node class is cached at the generator class level,
+    so the search through the class' ``__mro__`` is only performed once.
+
     The following keys are passed to template instances at rendering:
 
         * ``**node_fields``: all the node children and implementation fields by name.
@@ -601,9 +927,31 @@ class TemplatedGenerator(NodeVisitor):
     :meth:`generic_visit()` at the end with additional keyword arguments which will
     be forwarded to the node template.
 
+    Rendering of templates can be memoized by listing the template keys in
+    :attr:`memoized_templates`, together with the names of the keyword arguments
+    which affect the rendering of the node and its descendants. Rendered results
+    are stored in a LRU cache (shared by all the instances of the generator class
+    and bounded to :attr:`render_cache_size` entries) keyed on the
+    :meth:`eve.Node.content_hash` of the node, the values of its implementation
+    fields and the values of the listed keyword arguments, so memoized templates
+    should not depend on anything else (in particular, not on the `id_` field).
+    Modified nodes get a new content hash (see :meth:`eve.Node.content_hash`),
+    so their stale renderings are never reused, but in-place modifications of
+    node collections should be followed by a call to
+    :func:`eve.invalidate_node_indices`. Cache statistics are collected in
+    :attr:`render_cache_stats`.
+
     """
 
     __templates__: ClassVar[Mapping[str, Template]]
+    __templates_cache__: ClassVar[Dict[Type[Node], Tuple[Optional[Template], Optional[str]]]]
+    __render_cache__: ClassVar[collections.OrderedDict]
+
+    #: Memoized template keys mapped to the names of the kwargs their rendering depends on
+    memoized_templates: ClassVar[Mapping[str, Collection[str]]] = types.MappingProxyType({})
+    #: Maximum number of entries in the render cache
+    render_cache_size: ClassVar[int] = 1024
+    render_cache_stats: ClassVar[RenderCacheStats]
 
     @classmethod
     def __init_subclass__(cls, *, inherit_templates: bool = True, **kwargs: Any) -> None:
@@ -629,6 +977,9 @@ class TemplatedGenerator(NodeVisitor):
         )
 
         cls.__templates__ = types.MappingProxyType(templates)
+        cls.__templates_cache__ = {}
+        cls.__render_cache__ = collections.OrderedDict()
+        cls.render_cache_stats = RenderCacheStats()
 
     @classmethod
     def apply(cls, root: TreeNode, **kwargs: Any) -> Union[str, Collection[str]]:
@@ -655,27 +1006,22 @@ class TemplatedGenerator(NodeVisitor):
         """
         return str(node)
 
+    @classmethod
+    def clear_render_cache(cls) -> None:
+        """Remove all the entries of the render cache and reset its statistics."""
+        cls.__render_cache__.clear()
+        cls.render_cache_stats = RenderCacheStats()
+
     def generic_visit(self, node: TreeNode, **kwargs: Any) -> Union[str, Collection[str]]:
         result: Union[str, Collection[str]] = ""
         if isinstance(node, Node):
             template, key = self.get_template(node)
             if template:
-                try:
-                    result = self.render_template(
-                        template,
-                        node,
-                        self.transform_children(node, **kwargs),
-                        self.transform_impl_fields(node, **kwargs),
-                        **kwargs,
-                    )
-                except TemplateRenderingError as e:
-                    # Raise a new exception with extra information keeping the original cause
-                    raise TemplateRenderingError(
-                        f"Error in '{key}' template when rendering node '{node}'.\n"
-                        + getattr(e, "message", str(e)),
-                        **e.info,
-                        node=node,
-                    ) from e.__cause__
+                assert key is not None
+                if key in self.memoized_templates and self.render_cache_size > 0:
+                    result = self._render_node_memoized(template, key, node, **kwargs)
+                else:
+                    result = self._render_node(template, key, node, **kwargs)
 
         elif isinstance(
             node, (collections.abc.Sequence, collections.abc.Set)
@@ -688,18 +1034,77 @@ class TemplatedGenerator(NodeVisitor):
 
         return result
 
+    def _render_node(self, template: Template, key: str, node: Node, **kwargs: Any) -> str:
+        try:
+            return self.render_template(
+                template,
+                node,
+                self.transform_children(node, **kwargs),
+                self.transform_impl_fields(node, **kwargs),
+                **kwargs,
+            )
+        except TemplateRenderingError as e:
+            # Raise a new exception with extra information keeping the original cause
+            raise TemplateRenderingError(
+                f"Error in '{key}' template when rendering node '{node}'.\n"
+                + getattr(e, "message", str(e)),
+                **e.info,
+                node=node,
+            ) from e.__cause__
+
+    def _render_node_memoized(self, template: Template, key: str, node: Node, **kwargs: Any) -> str:
+        cache = self.__render_cache__
+        stats = self.render_cache_stats
+        cache_key = (
+            _render_key_value(node),
+            tuple(
+                _render_key_value(kwargs.get(name, None)) for name in self.memoized_templates[key]
+            ),
+        )
+        try:
+            result: Optional[str] = cache.get(cache_key, None)
+        except TypeError:
+            # Unhashable values in the key: skip the cache
+            stats.misses += 1
+            return self._render_node(template, key, node, **kwargs)
+
+        if result is not None:
+            stats.hits += 1
+            cache.move_to_end(cache_key)
+            return result
+
+        stats.misses += 1
+        result = self._render_node(template, key, node, **kwargs)
+        cache[cache_key] = result
+        if len(cache) > self.render_cache_size:
+            cache.popitem(last=False)
+            stats.evictions += 1
+
+        return result
+
     def get_template(self, node: TreeNode) -> Tuple[Optional[Template], Optional[str]]:
         """Get a template for a node instance (see class documentation)."""
+        if not isinstance(node, Node):
+            return None, None
+
+        node_class = node.__class__
+        try:
+            return self.__templates_cache__[node_class]
+        except KeyError:
+            pass
+
         template: Optional[Template] = None
         template_key: Optional[str] = None
-        if isinstance(node, Node):
-            for node_class in node.__class__.__mro__:
-                template_key = node_class.__name__
-                template = self.__templates__.get(template_key, None)
-                if template is not None or node_class is Node:
-                    break
+        for base_class in node_class.__mro__:
+            template_key = base_class.__name__
+            template = self.__templates__.get(template_key, None)
+            if template is not None or base_class is Node:
+                break
+
+        result = (template, None if template is None else template_key)
+        self.__templates_cache__[node_class] = result
 
-        return template, None if template is None else template_key
+        return result
 
     def render_template(
         self,
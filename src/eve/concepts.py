@@ -19,19 +19,31 @@
 
 from __future__ import annotations
 
+import collections
+import collections.abc
+import contextlib
+import contextvars
 import functools
+import heapq
+import itertools
+import operator
+import weakref
 
 import pydantic
 import pydantic.generics
+import typing_inspect
+import xxhash
 
-from . import iterators, utils
+from . import exceptions, iterators, utils
 from .type_definitions import NOTHING, IntEnum, Str, StrEnum
 from .typingx import (
     Any,
     AnyNoArgCallable,
+    Callable,
     ClassVar,
     Dict,
-    Generator,
+    FrozenSet,
+    Iterator,
     List,
     Optional,
     Set,
@@ -111,6 +123,10 @@ class FrozenModelConfig(BaseModelConfig):
     allow_mutation = False
 
 
+class InternedNodeConfig(FrozenModelConfig):
+    intern_nodes = True
+
+
 class Model(pydantic.BaseModel):
     class Config(BaseModelConfig):
         pass
@@ -131,6 +147,30 @@ LeafNode = Union[AnyNode, ValueNode]
 TreeNode = Union[AnyNode, Union[List[LeafNode], Dict[Any, LeafNode], Set[LeafNode]]]
 
 
+def _make_fields_getter(names: Tuple[str, ...]) -> Callable[[Any], Tuple[Any, ...]]:
+    """Create a fused getter returning a tuple with the values of the `names` attributes."""
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+    elif len(names) == 1:
+        single_getter = operator.attrgetter(names[0])
+        return lambda obj: (single_getter(obj),)
+    else:
+        return lambda obj: ()
+
+
+#: All the node classes, used to find the possible classes of the children values
+_node_classes: weakref.WeakSet = weakref.WeakSet()
+
+#: Version of the set of node classes and their field annotations
+_node_classes_version: int = 0
+
+
+def _register_node_class(node_class: Type[BaseNode]) -> None:
+    global _node_classes_version
+    _node_classes.add(node_class)
+    _node_classes_version += 1
+
+
 class NodeMetaclass(pydantic.main.ModelMetaclass):
     """Custom metaclass for Node classes.
 
@@ -159,8 +199,36 @@ class NodeMetaclass(pydantic.main.ModelMetaclass):
         cls.__node_impl_fields__ = impl_fields_metadata
         cls.__node_children__ = children_metadata
 
+        # Field names and fused getters used by the iteration methods
+        cls.__node_impl_field_names__ = tuple(
+            name for name in impl_fields_metadata if not name.endswith(_EVE_NODE_INTERNAL_SUFFIX)
+        )
+        cls.__node_children_names__ = tuple(children_metadata)
+        cls.__node_impl_fields_getter__ = staticmethod(
+            _make_fields_getter(cls.__node_impl_field_names__)
+        )
+        cls.__node_children_getter__ = staticmethod(
+            _make_fields_getter(cls.__node_children_names__)
+        )
+        cls.__node_required_fields__ = frozenset(
+            name for name, model_field in cls.__fields__.items() if model_field.required
+        )
+
+        # Interning of immutable nodes
+        cls.__node_interned__ = bool(getattr(cls.__config__, "intern_nodes", False))
+        if cls.__node_interned__ and cls.__config__.allow_mutation:
+            raise TypeError(f"Interned node class '{cls.__qualname__}' must be immutable")
+
+        _register_node_class(cls)
+
         return cls
 
+    def __call__(cls, *args, **kwargs):
+        node = super().__call__(*args, **kwargs)
+        if cls.__node_interned__ and _NODE_INTERNING.get():
+            node = _intern_node(node)
+        return node
+
 
 class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
     """Base class representing an IR node.
@@ -190,38 +258,152 @@ class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
 
     """
 
+    # `__weakref__` is needed by the interning table, since pydantic (>=1.7)
+    # adds `__slots__` to all the model classes
+    __slots__ = ("__node_index__", "__node_hash__", "__node_hash_version__", "__weakref__")
+
     __node_impl_fields__: ClassVar[NodeImplFieldMetadataDict]
     __node_children__: ClassVar[NodeChildrenMetadataDict]
+    __node_required_fields__: ClassVar[FrozenSet[str]]
+    __node_interned__: ClassVar[bool]
+    __node_impl_field_names__: ClassVar[Tuple[str, ...]]
+    __node_children_names__: ClassVar[Tuple[str, ...]]
+    __node_impl_fields_getter__: ClassVar[Callable[[Any], Tuple[Any, ...]]]
+    __node_children_getter__: ClassVar[Callable[[Any], Tuple[Any, ...]]]
 
     # Node fields
-    #: Unique node-id (implementation field)
+    #: Unique node-id (implementation field). Generated ids are stored as
+    #: integers and only formatted as strings when they are read.
     id_: Optional[Str] = None
 
-    @pydantic.validator("id_", pre=True, always=True)
-    def _id_validator(cls: Type[AnyNode], v: Optional[str]) -> str:  # type: ignore  # validators are classmethods
-        if v is None:
-            v = utils.UIDGenerator.sequential_id(prefix=cls.__qualname__)
-        if not isinstance(v, str):
+    @pydantic.validator("id_", pre=True)
+    def _id_validator(cls: Type[AnyNode], v: Optional[str]) -> Optional[str]:  # type: ignore  # validators are classmethods
+        if v is not None and not isinstance(v, str):
             raise TypeError(f"id_ is not an 'str' instance ({type(v)})")
         return v
 
-    def iter_impl_fields(self) -> Generator[Tuple[str, Any], None, None]:
-        for name, _ in self.__fields__.items():
-            if name.endswith(_EVE_NODE_IMPL_SUFFIX) and not name.endswith(
-                _EVE_NODE_INTERNAL_SUFFIX
-            ):
-                yield name, getattr(self, name)
-
-    def iter_children(self) -> Generator[Tuple[str, Any], None, None]:
-        for name, _ in self.__fields__.items():
-            if not (
-                name.endswith(_EVE_NODE_IMPL_SUFFIX) or name.endswith(_EVE_NODE_INTERNAL_SUFFIX)
-            ):
-                yield name, getattr(self, name)
-
-    def iter_children_values(self) -> Generator[Any, None, None]:
-        for _, node in self.iter_children():
-            yield node
+    @pydantic.validator("id_", always=True)
+    def _id_generator(cls: Type[AnyNode], v: Optional[str]) -> Union[str, int]:  # type: ignore  # validators are classmethods
+        return next(_NODE_ID_COUNTER.get()) if v is None else v
+
+    def __init__(__pydantic_self__, **data: Any) -> None:  # noqa: N805  # same as pydantic
+        if not (_TRUSTED_CONSTRUCTION.get() and __pydantic_self__._init_trusted(data)):
+            super().__init__(**data)
+
+    @classmethod
+    def update_forward_refs(cls, **localns: Any) -> None:
+        super().update_forward_refs(**localns)
+        _register_node_class(cls)
+
+    @classmethod
+    def construct_trusted(cls: Type[AnyNode], **values: Any) -> AnyNode:
+        """Create a new node from trusted or pre-validated values.
+
+        Like :meth:`pydantic.BaseModel.construct`, field values are neither
+        validated nor coerced and `pre` root validators are skipped, but
+        the node still gets a new ``id_`` (if not provided), default values
+        (including default factories) and the results of `post` root
+        validators, which are used to compute derived data. If the values of
+        some required fields or some unknown fields are passed, the node is
+        created with the regular (validated) constructor instead.
+
+        Values must already have the exact types of the field definitions
+        (e.g. a `tuple` for `Tuple` fields, not a `list`), since they will
+        not be converted.
+        """
+        node = cls.__new__(cls)
+        if not node._init_trusted(values):
+            node = cls(**values)
+        elif cls.__node_interned__ and _NODE_INTERNING.get():
+            node = _intern_node(node)
+        return node
+
+    def _init_trusted(self, data: Dict[str, Any]) -> bool:
+        cls = self.__class__
+        fields = cls.__fields__
+        if not (cls.__node_required_fields__ <= data.keys() <= fields.keys()):
+            return False
+
+        values = {
+            name: data[name] if name in data else model_field.get_default()
+            for name, model_field in fields.items()
+        }
+        if values["id_"] is None:
+            values["id_"] = next(_NODE_ID_COUNTER.get())
+        for _, validator in cls.__post_root_validators__:
+            values = validator(cls, values)
+
+        object.__setattr__(self, "__dict__", values)
+        object.__setattr__(self, "__fields_set__", set(data.keys()))
+
+        return True
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        object.__setattr__(self, "__node_hash__", None)
+        invalidate_node_indices()
+
+    def __eq__(self, other: Any) -> bool:
+        # Interned nodes are usually compared with themselves
+        return self is other or super().__eq__(other)
+
+    # Pydantic methods reading the field values directly from `__dict__`
+    def __iter__(self) -> Any:
+        _materialize_node_id(self)
+        return super().__iter__()
+
+    def _iter(self, *args: Any, **kwargs: Any) -> Any:
+        _materialize_node_id(self)
+        return super()._iter(*args, **kwargs)
+
+    def __repr_args__(self) -> Any:
+        _materialize_node_id(self)
+        return super().__repr_args__()
+
+    def content_hash(self) -> str:
+        """Return a structural hash of the tree, stable across interpreter sessions.
+
+        The hash depends on the node classes and the values of the children
+        fields, but not on the implementation fields (like `id_`). It is cached
+        in every node, together with the global version of the trees, and
+        computed from the cached hashes of the children. Setting any node
+        attribute (also from a :class:`eve.NodeMutator`) bumps the version and
+        thus invalidates the cached hashes of all the ancestors, but other
+        in-place modifications (like ``node.items.append(other)``) should be
+        followed by a call to :func:`invalidate_node_indices`.
+        """
+        cached = _cached_content_hash(self)
+        if cached is None:
+            cached = _compute_content_hash(self)
+        return cached
+
+    def invalidate_content_hash(self) -> None:
+        """Reset the cached :meth:`content_hash` of this node."""
+        object.__setattr__(self, "__node_hash__", None)
+
+    def find_all(self, node_class: Type[AnyNode]) -> Tuple[AnyNode, ...]:
+        """Return all the nodes in the tree which are instances of `node_class`.
+
+        Nodes are returned in pre-order (as in :meth:`iter_tree`), including
+        the node itself if it is an instance of `node_class`. The first call
+        builds an index of the tree by node class which is reused by next calls
+        until any node is modified (see :func:`invalidate_node_indices`).
+        """
+        index: Optional[_NodeIndex] = getattr(self, "__node_index__", None)
+        if index is None or index.version != _node_trees_version:
+            index = _NodeIndex(self)
+            object.__setattr__(self, "__node_index__", index)
+
+        return index.find_all(node_class)
+
+    def iter_impl_fields(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.__node_impl_field_names__, self.__node_impl_fields_getter__(self))
+
+    def iter_children(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.__node_children_names__, self.__node_children_getter__(self))
+
+    def iter_children_values(self) -> Iterator[Any]:
+        return iter(self.__node_children_getter__(self))
 
     def iter_tree_pre(self) -> utils.XIterator:
         return iterators.iter_tree_pre(self)
@@ -238,6 +420,180 @@ class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
         pass
 
 
+class _LazyNodeId:
+    """Data descriptor formatting the integer ids of nodes on first access."""
+
+    def __get__(self, node: Optional[BaseNode], owner: Any = None) -> Any:
+        # Return `None` for the class attribute, otherwise pydantic assumes that
+        # it is shadowed by the field of a subclass (e.g. in generic models)
+        return _materialize_node_id(node) if node is not None else None
+
+    def __set__(self, node: BaseNode, value: Optional[str]) -> None:
+        node.__dict__["id_"] = value
+
+
+def _materialize_node_id(node: BaseNode) -> Optional[str]:
+    node_id = node.__dict__.get("id_", None)
+    if node_id.__class__ is int:
+        node_id = f"{node.__class__.__qualname__}_{node_id}"
+        node.__dict__["id_"] = node_id
+    return node_id
+
+
+# Field names are removed from the class namespace by pydantic
+BaseNode.id_ = _LazyNodeId()  # type: ignore  # descriptor for the `id_` field
+
+
+#: Counter used to generate the ids of new nodes
+_NODE_ID_COUNTER: contextvars.ContextVar[Iterator[int]] = contextvars.ContextVar(
+    "_NODE_ID_COUNTER", default=itertools.count(1)
+)
+
+
+@contextlib.contextmanager
+def node_id_scope(start: int = 1) -> Iterator[None]:
+    """Context manager to generate the ids of new nodes from a new counter.
+
+    Nodes created inside the context get sequential ids starting at `start`,
+    independently of the nodes created before, so repeating the same sequence
+    of node constructions (e.g. the compilation of a stencil) inside a new
+    scope produces the same ids. Ids are only unique inside the same scope.
+
+    Args:
+        start: First id of the new counter.
+
+    """
+    token = _NODE_ID_COUNTER.set(itertools.count(start))
+    try:
+        yield
+    finally:
+        _NODE_ID_COUNTER.reset(token)
+
+
+#: Global version of all the trees, increased in every modification of any node
+_node_trees_version: int = 0
+
+
+def invalidate_node_indices() -> None:
+    """Invalidate the node indices used by :meth:`BaseNode.find_all` in all trees.
+
+    The cached :meth:`BaseNode.content_hash` values are invalidated too.
+    Setting node attributes (e.g. inside a :class:`eve.NodeMutator`) already
+    invalidates the indices, but in-place modifications of node collections
+    (like ``node.items.append(other)``) should be followed by a call to this function.
+    """
+    global _node_trees_version
+    _node_trees_version += 1
+
+
+class _NodeIndex:
+    """Index of the nodes of a tree by node class."""
+
+    __slots__ = ("version", "nodes_by_class", "cache")
+
+    version: int
+    #: Lists of (position in pre-order, node) items for each node class
+    nodes_by_class: Dict[Type[BaseNode], List[Tuple[int, BaseNode]]]
+    cache: Dict[Type[BaseNode], Tuple[BaseNode, ...]]
+
+    def __init__(self, root: BaseNode) -> None:
+        self.version = _node_trees_version
+        self.nodes_by_class = {}
+        self.cache = {}
+        # Pre-order traversal with an explicit stack (see _compute_content_hash)
+        nodes_by_class = self.nodes_by_class
+        position = 0
+        stack: List[Any] = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(type(item), NodeMetaclass):
+                nodes_by_class.setdefault(item.__class__, []).append((position, item))
+                position += 1
+                stack.extend(reversed(tuple(item.__node_children_getter__(item))))
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                stack.extend(reversed(tuple(item)))
+            elif isinstance(item, dict):
+                stack.extend(reversed(tuple(item.values())))
+
+    def find_all(self, node_class: Type[AnyNode]) -> Tuple[AnyNode, ...]:
+        try:
+            return self.cache[node_class]  # type: ignore  # AnyNode is a subclass of BaseNode
+        except KeyError:
+            matching = [
+                items
+                for item_class, items in self.nodes_by_class.items()
+                if issubclass(item_class, node_class)
+            ]
+            items = (
+                heapq.merge(*matching, key=operator.itemgetter(0))
+                if len(matching) > 1
+                else (matching[0] if matching else [])
+            )
+            result = self.cache[node_class] = tuple(node for _, node in items)
+            return result  # type: ignore  # AnyNode is a subclass of BaseNode
+
+
+def _cached_content_hash(node: BaseNode) -> Optional[str]:
+    # Hashes computed before any modification of a node are not valid anymore
+    if getattr(node, "__node_hash_version__", None) != _node_trees_version:
+        return None
+    return getattr(node, "__node_hash__", None)
+
+
+def _compute_content_hash(root: BaseNode) -> str:
+    # Collect the nodes without a cached hash in post-order (using an explicit
+    # stack to support deep trees) and hash them from the leaves up.
+    # Note: `isinstance(type(x), NodeMetaclass)` is a much faster check than
+    # `isinstance(x, BaseNode)`, which goes through `ABCMeta.__instancecheck__`
+    pending = []
+    stack: List[Any] = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(type(item), NodeMetaclass):
+            if _cached_content_hash(item) is None:
+                pending.append(item)
+                stack.extend(item.__node_children_getter__(item))
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+
+    for node in reversed(pending):
+        cls = node.__class__
+        hasher = xxhash.xxh64(f"{cls.__module__}.{cls.__qualname__}".encode())
+        for name, value in zip(cls.__node_children_names__, cls.__node_children_getter__(node)):
+            hasher.update(name.encode())
+            hasher.update(_value_digest(value).encode())
+        object.__setattr__(node, "__node_hash__", hasher.hexdigest())
+        object.__setattr__(node, "__node_hash_version__", _node_trees_version)
+
+    return root.__node_hash__  # type: ignore  # slot is always set at this point
+
+
+_LEAF_VALUE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def _value_digest(value: Any) -> str:
+    if isinstance(type(value), NodeMetaclass):
+        return "N" + value.__node_hash__  # type: ignore  # children are hashed before parents
+    if isinstance(value, _LEAF_VALUE_TYPES):
+        return f"{value.__class__.__qualname__}:{value!r}"
+    if isinstance(value, (list, tuple)):
+        return utils.shash(value.__class__.__qualname__, [_value_digest(item) for item in value])
+    if isinstance(value, (set, frozenset)):
+        return utils.shash("set", sorted(_value_digest(item) for item in value))
+    if isinstance(value, dict):
+        return utils.shash(
+            "dict", sorted((_value_digest(k), _value_digest(v)) for k, v in value.items())
+        )
+    if isinstance(value, pydantic.BaseModel):
+        # Pickled models contain the (unordered) set of explicitly set fields
+        cls = value.__class__
+        return utils.shash(f"{cls.__module__}.{cls.__qualname__}", _value_digest(value.__dict__))
+    return utils.shash(value)
+
+
 class GenericNode(BaseNode, pydantic.generics.GenericModel):
     pass
 
@@ -249,12 +605,311 @@ class Node(BaseNode):
 
 
 class FrozenNode(Node):
-    """Default public name for an inmutable base node class."""
+    """Default public name for an inmutable base node class.
+
+    Subclasses using :class:`InternedNodeConfig` (or setting the ``intern_nodes``
+    option in their config) are hash-consed: while node interning is enabled
+    (see :func:`node_interning`), creating a node structurally equal to an
+    existing one returns the existing (canonical) instance, which will also
+    keep its own ``id_``. Interning is disabled by default, since the ids of
+    the canonical nodes depend on the previously created trees. The table of
+    canonical nodes only holds weak references, so unused nodes are collected
+    as usual.
+    """
 
     class Config(FrozenModelConfig):
         pass
 
 
+# -- Interning --
+_NODE_INTERNING: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_NODE_INTERNING", default=False
+)
+
+_interned_nodes: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+@contextlib.contextmanager
+def node_interning(enabled: bool = True) -> Iterator[None]:
+    """Context manager to enable or disable the interning of immutable nodes.
+
+    Interning is disabled by default and only applies to the node classes
+    which opted into it (see :class:`FrozenNode`).
+
+    Args:
+        enabled: Enable (default) or disable node interning inside the context.
+
+    """
+    token = _NODE_INTERNING.set(enabled)
+    try:
+        yield
+    finally:
+        _NODE_INTERNING.reset(token)
+
+
+def _intern_node(node: AnyNode) -> AnyNode:
+    try:
+        key = _intern_key(node)
+        canonical = _interned_nodes.get(key, None)
+    except TypeError:
+        # Unhashable field values
+        return node
+    if canonical is None:
+        _interned_nodes[key] = canonical = node
+    return canonical
+
+
+def _intern_key(value: Any) -> Any:
+    if isinstance(value, BaseNode):
+        return (
+            value.__class__,
+            tuple(
+                (name, _intern_key(item)) for name, item in value.__dict__.items() if name != "id_"
+            ),
+        )
+    if isinstance(value, (list, tuple)):
+        return (value.__class__, tuple(_intern_key(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return (value.__class__, frozenset(_intern_key(item) for item in value))
+    if isinstance(value, dict):
+        return (dict, frozenset((_intern_key(k), _intern_key(v)) for k, v in value.items()))
+    # Include the type to distinguish equal values like `1`, `1.0` and `True`
+    return (value.__class__, value)
+
+
+# -- Reachability --
+def reaching_children_names(
+    node_class: Type[BaseNode], node_types: Tuple[Type[BaseNode], ...]
+) -> Tuple[str, ...]:
+    """Return the names of the children of `node_class` which may contain instances of `node_types`.
+
+    The result is computed from the type annotations of the node fields
+    (assuming that values of a node class annotation can be instances of
+    any of its subclasses) and cached until new node classes are defined.
+    Fields with unknown contents (e.g. annotated with `Any`) are always
+    included.
+    """
+    global _reachability
+    if _reachability.version != _node_classes_version:
+        _reachability = _Reachability()
+    key = (node_class, node_types)
+    try:
+        return _reachability.children_names[key]
+    except KeyError:
+        result = _reachability.children_names[key] = _reachability.compute_children_names(
+            node_class, node_types
+        )
+        return result
+
+
+def can_reach(node_class: Type[BaseNode], node_types: Tuple[Type[BaseNode], ...]) -> bool:
+    """Check if the instances of `node_class` may be or contain instances of `node_types`."""
+    return issubclass(node_class, node_types) or bool(
+        reaching_children_names(node_class, node_types)
+    )
+
+
+class _Reachability:
+    """Reachability relation between the currently defined node classes."""
+
+    __slots__ = ("version", "children_classes", "subclasses", "containers", "children_names")
+
+    version: int
+    #: Node classes of the annotations of the children fields (`None` if unknown)
+    children_classes: Dict[Type[BaseNode], Dict[str, Optional[FrozenSet[Type[BaseNode]]]]]
+    #: Defined subclasses of each annotation class
+    subclasses: Dict[Type[BaseNode], FrozenSet[Type[BaseNode]]]
+    #: Node classes with children which may be instances of each class
+    containers: Dict[Type[BaseNode], Set[Type[BaseNode]]]
+    children_names: Dict[Tuple[Type[BaseNode], Tuple[Type[BaseNode], ...]], Tuple[str, ...]]
+
+    def __init__(self) -> None:
+        self.version = _node_classes_version
+        node_classes = list(_node_classes)
+        self.children_classes = {
+            node_class: {
+                name: _model_field_node_classes(metadata["definition"])
+                for name, metadata in node_class.__node_children__.items()
+            }
+            for node_class in node_classes
+        }
+        self.subclasses = {}
+        self.containers = collections.defaultdict(set)
+        for node_class, children_classes in self.children_classes.items():
+            for annotation_classes in children_classes.values():
+                for annotation_class in annotation_classes or ():
+                    if annotation_class not in self.subclasses:
+                        self.subclasses[annotation_class] = frozenset(
+                            c for c in node_classes if issubclass(c, annotation_class)
+                        )
+                    for subclass in self.subclasses[annotation_class]:
+                        self.containers[subclass].add(node_class)
+        self.children_names = {}
+
+    def compute_children_names(
+        self, node_class: Type[BaseNode], node_types: Tuple[Type[BaseNode], ...]
+    ) -> Tuple[str, ...]:
+        if node_class not in self.children_classes or not all(
+            isinstance(node_type, type) and issubclass(node_type, BaseNode)
+            for node_type in node_types
+        ):
+            return node_class.__node_children_names__
+
+        # Propagate upwards from the matching classes and the classes with unknown children
+        reaching = {
+            c
+            for c, children_classes in self.children_classes.items()
+            if issubclass(c, node_types) or None in children_classes.values()
+        }
+        pending = list(reaching)
+        while pending:
+            for container in self.containers.get(pending.pop(), ()):
+                if container not in reaching:
+                    reaching.add(container)
+                    pending.append(container)
+
+        return tuple(
+            name
+            for name, annotation_classes in self.children_classes[node_class].items()
+            if annotation_classes is None
+            or any(not self.subclasses[c].isdisjoint(reaching) for c in annotation_classes)
+        )
+
+
+def _model_field_node_classes(
+    model_field: pydantic.fields.ModelField,
+) -> Optional[FrozenSet[Type[BaseNode]]]:
+    # Use the pydantic sub-fields of collections and unions instead of the
+    # original annotation, since only their forward references are updated
+    if not model_field.sub_fields:
+        return _annotation_node_classes(model_field.type_)
+    result: Set[Type[BaseNode]] = set()
+    for sub_field in model_field.sub_fields:
+        sub_field_classes = _model_field_node_classes(sub_field)
+        if sub_field_classes is None:
+            return None
+        result |= sub_field_classes
+    return frozenset(result)
+
+
+def _annotation_node_classes(annotation: Any) -> Optional[FrozenSet[Type[BaseNode]]]:
+    # Node classes of the values which may appear in a value annotated with
+    # `annotation`, or `None` if they are unknown
+    if (
+        annotation is Any
+        or isinstance(annotation, str)
+        or typing_inspect.is_typevar(annotation)
+        or typing_inspect.is_forward_ref(annotation)
+    ):
+        return None
+    if typing_inspect.is_literal_type(annotation):
+        return frozenset()
+
+    origin = typing_inspect.get_origin(annotation)
+    if origin is type:
+        return frozenset()
+    if origin is not None or typing_inspect.is_union_type(annotation):
+        args = typing_inspect.get_args(annotation, evaluate=True)
+        if not args:
+            return None
+        result: Set[Type[BaseNode]] = set()
+        for arg in args:
+            if arg is not Ellipsis:
+                arg_classes = _annotation_node_classes(arg)
+                if arg_classes is None:
+                    return None
+                result |= arg_classes
+        return frozenset(result)
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseNode):
+            return frozenset([annotation])
+        if issubclass(annotation, (str, bytes)) or not issubclass(
+            annotation, collections.abc.Collection
+        ):
+            # Leaf values
+            return frozenset()
+
+    return None
+
+
+_reachability = _Reachability()
+
+
+# -- Validation --
+_TRUSTED_CONSTRUCTION: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_TRUSTED_CONSTRUCTION", default=False
+)
+
+
+@contextlib.contextmanager
+def trusted_construction(enabled: bool = True) -> Iterator[None]:
+    """Context manager to skip the validation of new nodes.
+
+    Inside this context, all nodes are created as with :meth:`BaseNode.construct_trusted`.
+    It is meant to be used inside compiler passes which build new nodes from
+    already validated nodes, so the validation only happens at the boundaries
+    of the pipeline (see :func:`validate_tree`).
+
+    Args:
+        enabled: Enable (default) or disable trusted construction inside the context.
+
+    """
+    token = _TRUSTED_CONSTRUCTION.set(enabled)
+    try:
+        yield
+    finally:
+        _TRUSTED_CONSTRUCTION.reset(token)
+
+
+def validate_tree(root: TreeNode) -> None:
+    """Validate all the nodes of a tree.
+
+    Run the validation of every node in the tree and check that stored
+    values are the same that the validation would produce. It is meant to
+    check at the boundaries of a pipeline the trees which have been built
+    with trusted construction.
+
+    Raises:
+        pydantic.ValidationError: If some node does not pass the validation.
+        exceptions.EveValueError: If some node contains non-canonical values,
+            that is, values with a different type than the one obtained after
+            validation (e.g. a `list` for a `Tuple` field).
+
+    """
+    for node in iterators.iter_tree(root).if_isinstance(BaseNode).to_list():
+        _materialize_node_id(node)
+        values, _, error = pydantic.validate_model(node.__class__, node.__dict__)
+        if error:
+            raise error
+        for name, value in values.items():
+            if not _are_canonically_equal(value, node.__dict__[name]):
+                raise exceptions.EveValueError(
+                    f"Non-canonical value in field '{name}' of node '{node.__class__.__name__}'"
+                    f" (expected {type(value)}, found {type(node.__dict__[name])})",
+                    node=node,
+                    field=name,
+                )
+
+
+def _are_canonically_equal(validated: Any, value: Any) -> bool:
+    if type(validated) is not type(value):
+        return False
+    if isinstance(value, pydantic.BaseModel):
+        # Nested models are validated independently
+        return True
+    if isinstance(value, (list, tuple)):
+        return len(validated) == len(value) and all(
+            _are_canonically_equal(a, b) for a, b in zip(validated, value)
+        )
+    if isinstance(value, dict):
+        return validated.keys() == value.keys() and all(
+            _are_canonically_equal(validated[key], value[key]) for key in value
+        )
+
+    return bool(validated == value)
+
+
 # -- Misc --
 class VType(FrozenModel):
 
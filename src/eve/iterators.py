@@ -19,17 +19,12 @@
 
 from __future__ import annotations
 
+import collections
 import collections.abc
 
 from . import concepts, utils
 from .type_definitions import Enum
-from .typingx import Any, Generator, Iterable, List, Optional, Tuple, Union
-
-
-try:
-    import cytoolz as toolz
-except ModuleNotFoundError:
-    import toolz  # noqa
+from .typingx import Any, Deque, Generator, Iterable, Tuple, Type, Union
 
 
 KeyValue = Tuple[Union[int, str], Any]
@@ -69,7 +64,7 @@ class TraversalOrder(Enum):
 
 @utils.as_xiter
 def iter_tree_pre(
-    node: concepts.TreeNode, *, with_keys: bool = False, __key__: Optional[Any] = None
+    node: concepts.TreeNode, *, with_keys: bool = False
 ) -> Generator[TreeIterationItem, None, None]:
     """Create a pre-order tree traversal iterator (Depth-First Search).
 
@@ -79,20 +74,32 @@ def iter_tree_pre(
             Defaults to `False`.
 
     """
-
+    # Explicit stack of children iterators (instead of recursive generators)
     if with_keys:
-        yield __key__, node
-        for key, child in generic_iter_children(node, with_keys=True):
-            yield from iter_tree_pre(child, with_keys=True, __key__=key)
+        yield None, node
+        stack = [iter(generic_iter_children(node, with_keys=True))]
+        while stack:
+            for key, child in stack[-1]:
+                yield key, child
+                stack.append(iter(generic_iter_children(child, with_keys=True)))
+                break
+            else:
+                stack.pop()
     else:
         yield node
-        for child in generic_iter_children(node, with_keys=False):
-            yield from iter_tree_pre(child, with_keys=False)
+        stack = [iter(generic_iter_children(node, with_keys=False))]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                stack.append(iter(generic_iter_children(child, with_keys=False)))
+                break
+            else:
+                stack.pop()
 
 
 @utils.as_xiter
 def iter_tree_post(
-    node: concepts.TreeNode, *, with_keys: bool = False, __key__: Optional[Any] = None
+    node: concepts.TreeNode, *, with_keys: bool = False
 ) -> Generator[TreeIterationItem, None, None]:
     """Create a post-order tree traversal iterator (Depth-First Search).
 
@@ -102,23 +109,29 @@ def iter_tree_post(
             Defaults to `False`.
 
     """
+    # Explicit stack of (item, children iterator) pairs: items are yielded
+    # once all their children have been visited
+    item: TreeIterationItem = (None, node) if with_keys else node
+    stack = [(item, iter(generic_iter_children(node, with_keys=with_keys)))]
     if with_keys:
-        for key, child in generic_iter_children(node, with_keys=True):
-            yield from iter_tree_post(child, with_keys=True, __key__=key)
-        yield __key__, node
+        while stack:
+            for key, child in stack[-1][1]:
+                stack.append(((key, child), iter(generic_iter_children(child, with_keys=True))))
+                break
+            else:
+                yield stack.pop()[0]
     else:
-        for child in generic_iter_children(node, with_keys=False):
-            yield from iter_tree_post(child, with_keys=False)
-        yield node
+        while stack:
+            for child in stack[-1][1]:
+                stack.append((child, iter(generic_iter_children(child, with_keys=False))))
+                break
+            else:
+                yield stack.pop()[0]
 
 
 @utils.as_xiter
 def iter_tree_levels(
-    node: concepts.TreeNode,
-    *,
-    with_keys: bool = False,
-    __key__: Optional[Any] = None,
-    __queue__: Optional[List] = None,
+    node: concepts.TreeNode, *, with_keys: bool = False
 ) -> Generator[TreeIterationItem, None, None]:
     """Create a tree traversal iterator by levels (Breadth-First Search).
 
@@ -128,19 +141,51 @@ def iter_tree_levels(
             Defaults to `False`.
 
     """
-    __queue__ = __queue__ or []
     if with_keys:
-        yield __key__, node
-        __queue__.extend(generic_iter_children(node, with_keys=True))
-        if __queue__:
-            key, child = __queue__.pop(0)
-            yield from iter_tree_levels(child, with_keys=True, __key__=key, __queue__=__queue__)
+        keyed_queue: Deque[Tuple[Any, Any]] = collections.deque([(None, node)])
+        while keyed_queue:
+            key, node = keyed_queue.popleft()
+            yield key, node
+            keyed_queue.extend(generic_iter_children(node, with_keys=True))
     else:
-        yield node
-        __queue__.extend(generic_iter_children(node, with_keys=False))
-        if __queue__:
-            child = __queue__.pop(0)
-            yield from iter_tree_levels(child, with_keys=False, __queue__=__queue__)
+        queue: Deque[Any] = collections.deque([node])
+        while queue:
+            node = queue.popleft()
+            yield node
+            queue.extend(generic_iter_children(node, with_keys=False))
+
+
+@utils.as_xiter
+def iter_tree_instances(
+    node: concepts.TreeNode, node_types: Union[Type, Tuple[Type, ...]]
+) -> Generator[Any, None, None]:
+    """Create a pre-order iterator over the instances of `node_types` in the tree.
+
+    It returns the same nodes as ``iter_tree_pre(node).if_isinstance(node_types)``
+    but the traversal skips the children which, according to the annotations
+    of the node fields, cannot contain instances of `node_types`
+    (see :func:`concepts.reaching_children_names`).
+
+    Args:
+        node_types: Node class or tuple of node classes.
+
+    """
+    if not isinstance(node_types, tuple):
+        node_types = (node_types,)
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, concepts.Node):
+            if isinstance(item, node_types):
+                yield item
+            stack.extend(
+                getattr(item, name)
+                for name in reversed(concepts.reaching_children_names(item.__class__, node_types))
+            )
+        elif not isinstance(item, (str, bytes)):
+            children = list(generic_iter_children(item))
+            children.reverse()
+            stack.extend(children)
 
 
 def iter_tree(
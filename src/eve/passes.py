@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Pass manager to run and instrument compilation pipelines."""
+
+
+from __future__ import annotations
+
+import os
+import time
+import tracemalloc
+
+from . import exceptions
+from .typingx import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
+#: Pass function: receives an IR and returns the (new) IR
+PassFunction = Callable[[Any], Any]
+
+#: Hook function: receives the name of the executed pass and the resulting IR
+PassHook = Callable[[str, Any], None]
+
+
+class Pass:
+    """Pipeline step of a :class:`PassManager`.
+
+    Args:
+        name: Unique name of the pass inside the pipeline.
+        func: Pass function receiving the IR and returning the new IR.
+        input_type: Expected class of the input IR.
+        output_type: Expected class of the output IR.
+        enabled: Disabled passes are skipped when running the pipeline.
+
+    """
+
+    __slots__ = ("name", "func", "input_type", "output_type", "enabled")
+
+    def __init__(
+        self,
+        name: str,
+        func: PassFunction,
+        *,
+        input_type: type = object,
+        output_type: type = object,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.input_type = input_type
+        self.output_type = output_type
+        self.enabled = enabled
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.name!r}, {self.input_type.__name__} -> "
+            f"{self.output_type.__name__}{'' if self.enabled else ', disabled'})"
+        )
+
+
+class PassStats(NamedTuple):
+    """Execution statistics of a pass."""
+
+    #: Wall-clock time in seconds
+    time: float
+    #: Memory allocated by the pass which is still in use at the end (in bytes)
+    allocated: Optional[int] = None
+    #: Peak of memory allocated during the execution of the pass (in bytes)
+    peak: Optional[int] = None
+
+
+class PassManager:
+    """Run a sequence of passes with per-pass timings and optional hooks.
+
+    Each pass declares the classes of its input and output IRs, which are
+    checked before running the pipeline (between consecutive passes) and
+    during the execution (against the actual IR values). Passes can be
+    added at any position, removed, disabled or reordered.
+
+    Args:
+        passes: Initial passes of the pipeline.
+        trace_memory: Measure the memory allocated by every pass with
+            :mod:`tracemalloc` (it slows down the execution considerably).
+
+    Examples:
+        >>> pm = PassManager()
+        >>> pm.register("double", lambda x: 2 * x, input_type=int, output_type=int)
+        Pass('double', int -> int)
+        >>> pm.register("to_str", str, input_type=int, output_type=str)
+        Pass('to_str', int -> str)
+        >>> pm.run(21)
+        '42'
+        >>> list(pm.stats.keys())
+        ['double', 'to_str']
+
+    """
+
+    passes: List[Pass]
+    hooks: List[PassHook]
+    trace_memory: bool
+    #: Statistics of the passes executed in the last run (reset by every :meth:`run`)
+    stats: Dict[str, PassStats]
+
+    def __init__(self, passes: Iterable[Pass] = (), *, trace_memory: bool = False) -> None:
+        self.passes = []
+        self.hooks = []
+        self.trace_memory = trace_memory
+        self.stats = {}
+        for pass_ in passes:
+            self._insert(pass_)
+
+    def __iter__(self) -> Iterator[Pass]:
+        return iter(self.passes)
+
+    def __len__(self) -> int:
+        return len(self.passes)
+
+    def __contains__(self, name: str) -> bool:
+        return any(pass_.name == name for pass_ in self.passes)
+
+    def __getitem__(self, name: str) -> Pass:
+        return self.passes[self._index(name)]
+
+    @property
+    def names(self) -> List[str]:
+        return [pass_.name for pass_ in self.passes]
+
+    def register(
+        self,
+        name: str,
+        func: PassFunction,
+        *,
+        input_type: type = object,
+        output_type: type = object,
+        enabled: bool = True,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> Pass:
+        """Add a new pass to the pipeline.
+
+        By default, the pass is appended at the end of the pipeline, unless
+        the name of the pass to be placed `before` or `after` is provided.
+        """
+        pass_ = Pass(name, func, input_type=input_type, output_type=output_type, enabled=enabled)
+        self._insert(pass_, before=before, after=after)
+        return pass_
+
+    def remove(self, name: str) -> Pass:
+        return self.passes.pop(self._index(name))
+
+    def skip(self, name: str, skip: bool = True) -> None:
+        """Disable (or re-enable if `skip` is `False`) a pass of the pipeline."""
+        self[name].enabled = not skip
+
+    def reorder(self, names: Sequence[str]) -> None:
+        """Reorder the passes of the pipeline following the provided sequence of names."""
+        if sorted(names) != sorted(self.names):
+            raise exceptions.EveValueError(
+                f"Reordered pipeline {list(names)} does not contain the same passes {self.names}"
+            )
+        self.passes = [self[name] for name in names]
+
+    def add_hook(self, hook: PassHook) -> None:
+        """Add a function to be called with the result of every executed pass."""
+        self.hooks.append(hook)
+
+    def check(self, *, first: Optional[str] = None, last: Optional[str] = None) -> None:
+        """Check that the output of every enabled pass is valid input for the next one."""
+        enabled_passes = [pass_ for pass_ in self._select(first, last) if pass_.enabled]
+        for pass_, next_pass in zip(enabled_passes, enabled_passes[1:]):
+            if not issubclass(pass_.output_type, next_pass.input_type):
+                raise exceptions.EveTypeError(
+                    f"Output of pass '{pass_.name}' ({pass_.output_type.__name__}) is not a "
+                    f"valid input for pass '{next_pass.name}' ({next_pass.input_type.__name__})"
+                )
+
+    def run(self, ir: Any, *, first: Optional[str] = None, last: Optional[str] = None) -> Any:
+        """Run the enabled passes of the pipeline on the `ir` and return the result.
+
+        Args:
+            ir: Input IR for the first pass.
+            first: Name of the first pass to run. Defaults to the first pass of the pipeline.
+            last: Name of the last pass to run. Defaults to the last pass of the pipeline.
+
+        """
+        self.check(first=first, last=last)
+        self.stats = {}
+        for pass_ in self._select(first, last):
+            if not pass_.enabled:
+                continue
+            if not isinstance(ir, pass_.input_type):
+                raise exceptions.EveTypeError(
+                    f"Invalid input for pass '{pass_.name}' (expected "
+                    f"{pass_.input_type.__name__}, got {type(ir).__name__})"
+                )
+
+            ir, self.stats[pass_.name] = self._run_pass(pass_, ir)
+
+            if not isinstance(ir, pass_.output_type):
+                raise exceptions.EveTypeError(
+                    f"Invalid output of pass '{pass_.name}' (expected "
+                    f"{pass_.output_type.__name__}, got {type(ir).__name__})"
+                )
+            for hook in self.hooks:
+                hook(pass_.name, ir)
+
+        return ir
+
+    def report(self, stats: Optional[Mapping[str, PassStats]] = None) -> str:
+        """Format the statistics of the last run (or the provided `stats`) as a table."""
+        if stats is None:
+            stats = self.stats
+        lines = [f"{'Pass':<32} {'Time (ms)':>12} {'Allocated (KiB)':>16} {'Peak (KiB)':>12}"]
+        for name, pass_stats in stats.items():
+            allocated = (
+                f"{pass_stats.allocated / 1024:.1f}" if pass_stats.allocated is not None else "-"
+            )
+            peak = f"{pass_stats.peak / 1024:.1f}" if pass_stats.peak is not None else "-"
+            lines.append(f"{name:<32} {pass_stats.time * 1e3:>12.3f} {allocated:>16} {peak:>12}")
+        lines.append(f"{'Total':<32} {sum(s.time for s in stats.values()) * 1e3:>12.3f}")
+
+        return "\n".join(lines)
+
+    def _select(self, first: Optional[str], last: Optional[str]) -> List[Pass]:
+        start = self._index(first) if first is not None else 0
+        stop = self._index(last) + 1 if last is not None else len(self.passes)
+        return self.passes[start:stop]
+
+    def _index(self, name: str) -> int:
+        for i, pass_ in enumerate(self.passes):
+            if pass_.name == name:
+                return i
+        raise exceptions.EveValueError(f"Pass '{name}' not found in the pipeline {self.names}")
+
+    def _insert(
+        self, pass_: Pass, *, before: Optional[str] = None, after: Optional[str] = None
+    ) -> None:
+        if pass_.name in self:
+            raise exceptions.EveValueError(f"Pass '{pass_.name}' already in the pipeline")
+        if before is not None and after is not None:
+            raise exceptions.EveValueError("Only one of 'before' or 'after' can be provided")
+        if before is not None:
+            self.passes.insert(self._index(before), pass_)
+        elif after is not None:
+            self.passes.insert(self._index(after) + 1, pass_)
+        else:
+            self.passes.append(pass_)
+
+    def _run_pass(self, pass_: Pass, ir: Any) -> Tuple[Any, PassStats]:
+        if not self.trace_memory:
+            start = time.perf_counter()
+            result = pass_.func(ir)
+            return result, PassStats(time.perf_counter() - start)
+
+        # The peak can only be measured if the tracing is restarted for this pass
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        try:
+            start_memory, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            result = pass_.func(ir)
+            elapsed = time.perf_counter() - start
+            end_memory, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            if owns_tracing:
+                tracemalloc.stop()
+
+        return (
+            result,
+            PassStats(
+                elapsed,
+                allocated=end_memory - start_memory,
+                peak=peak_memory - start_memory if owns_tracing else None,
+            ),
+        )
+
+
+def make_dump_hook(
+    path: str,
+    *,
+    passes: Optional[Iterable[str]] = None,
+    dump_function: Optional[Callable[[Any], str]] = None,
+) -> PassHook:
+    """Create a hook to write the IR produced by some passes to files.
+
+    Each IR is written in a ``<number>_<pass name>.txt`` file inside the
+    `path` folder, where the number follows the execution order.
+
+    Args:
+        path: Output folder (it will be created if it does not exist).
+        passes: Names of the passes whose output should be dumped. Defaults to all passes.
+        dump_function: Function to convert the IR to text. Defaults to :func:`devtools.pformat`.
+
+    """
+    selected = set(passes) if passes is not None else None
+    counter = 0
+
+    if dump_function is None:
+        import devtools
+
+        def _pformat(ir: Any) -> str:
+            return devtools.pformat(ir, highlight=False)
+
+        dump_function = _pformat
+
+    def _dump_hook(name: str, ir: Any) -> None:
+        nonlocal counter
+        counter += 1
+        if selected is None or name in selected:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, f"{counter:02d}_{name}.txt"), "w") as f:
+                f.write(dump_function(ir))
+
+    return _dump_hook
@@ -23,25 +23,19 @@ import collections.abc
 import enum
 import functools
 import hashlib
+import importlib.util
 import itertools
 import operator
 import pickle
 import re
+import sys
+import types
 import typing
 import uuid
 import warnings
 
 import xxhash
 from boltons.iterutils import flatten, flatten_iter, is_collection  # noqa: F401
-from boltons.strutils import (  # noqa: F401
-    a10n,
-    asciify,
-    format_int_list,
-    iter_splitlines,
-    parse_int_list,
-    slugify,
-    unwrap_text,
-)
 from boltons.typeutils import classproperty  # noqa: F401
 
 from .type_definitions import NOTHING
@@ -63,12 +57,62 @@ from .typingx import (
 )
 
 
-try:
-    # For perfomance reasons, try to use cytoolz when possible (using cython)
-    import cytoolz as toolz
-except ModuleNotFoundError:
-    # Fall back to pure Python toolz
-    import toolz
+def lazy_import(*names: str) -> types.ModuleType:
+    """Import the first available module in `names` deferring its loading until first use.
+
+    The module is registered in ``sys.modules`` but its code is only executed
+    when one of its attributes is accessed (see :class:`importlib.util.LazyLoader`),
+    which keeps heavy dependencies out of the import time of modules using them.
+
+    Examples:
+        >>> json = lazy_import("ujson_does_not_exist", "json")
+        >>> json.dumps([1])
+        '[1]'
+
+    """
+
+    for name in names:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is not None:
+            break
+    else:
+        raise ModuleNotFoundError(f"No module named '{names[0]}'", name=names[0])
+
+    assert spec.loader is not None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
+
+
+# For perfomance reasons, try to use cytoolz when possible (using cython)
+toolz = lazy_import("cytoolz", "toolz")
+
+_BOLTONS_STRUTILS_NAMES = frozenset(
+    (
+        "a10n",
+        "asciify",
+        "format_int_list",
+        "iter_splitlines",
+        "parse_int_list",
+        "slugify",
+        "unwrap_text",
+    )
+)
+
+
+def __getattr__(name: str) -> Any:
+    # String utilities from `boltons.strutils` are only imported on demand
+    if name in _BOLTONS_STRUTILS_NAMES:
+        import boltons.strutils
+
+        return getattr(boltons.strutils, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 def isinstancechecker(type_info: Union[Type, Iterable[Type]]) -> Callable[[Any], bool]:
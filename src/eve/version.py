@@ -17,9 +17,33 @@
 """Version specification."""
 
 
-from packaging.version import parse
+import functools
+from typing import Any, Callable
 
 from ._version import __version__
 
 
-__versioninfo__ = parse(__version__)
+@functools.lru_cache(maxsize=None)
+def _parse_version() -> Any:
+    # `packaging` is only imported when the parsed version info is requested
+    from packaging.version import parse
+
+    return parse(__version__)
+
+
+def versioninfo_getattr(module_name: str) -> Callable[[str], Any]:
+    """Create a module ``__getattr__`` function computing ``__versioninfo__`` on demand.
+
+    Packages sharing the Eve version define their ``__versioninfo__`` attribute with
+    ``__getattr__ = eve.version.versioninfo_getattr(__name__)``.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name == "__versioninfo__":
+            return _parse_version()
+        raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+
+    return __getattr__
+
+
+__getattr__ = versioninfo_getattr(__name__)
@@ -21,6 +21,7 @@ from __future__ import annotations
 
 import collections.abc
 import copy
+import enum
 import operator
 
 from . import concepts, iterators, utils
@@ -28,13 +29,16 @@ from .concepts import NOTHING
 from .typingx import (
     Any,
     Callable,
+    ClassVar,
     Collection,
     Dict,
     Iterable,
+    MutableMapping,
     MutableSequence,
     MutableSet,
+    Optional,
     Tuple,
-    Union,
+    Type,
 )
 
 
@@ -64,7 +68,11 @@ class NodeVisitor:
         3. ``self.generic_visit()``.
 
     This dispatching mechanism is implemented in the main :meth:`visit`
-    method and can be overriden in subclasses.
+    method and can be overriden in subclasses. The name of the selected
+    visitor method is cached for each (visitor class, node class) pair
+    the first time a node class is visited, so the lookup only happens once.
+    Every visitor subclass starts with its own empty cache, and instances
+    with visitor methods assigned as instance attributes get their own cache.
 
     Note that return values are not forwarded to the caller in the default
     :meth:`generic_visit` implementation. If you want to return a value from
@@ -95,6 +103,12 @@ class NodeVisitor:
         * If the visitor has internal state, make sure visitor instances
           are never reused or clean up the state at the end.
 
+        * If the visitor only handles a few node classes (e.g. an analysis
+          collecting some specific nodes), declare them in the
+          :attr:`visited_node_types` class attribute. Then :meth:`generic_visit`
+          skips the children which, according to the annotations of the node
+          fields, cannot contain instances of these classes.
+
     Notes:
         If you want to apply changes to nodes during the traversal,
         use the :class:`NodeMutator` subclass, which handles correctly
@@ -102,27 +116,60 @@ class NodeVisitor:
 
     """
 
-    def visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
-        visitor = self.generic_visit
+    #: Node classes handled by the visitor methods (used to prune the traversal)
+    visited_node_types: ClassVar[Optional[Tuple[Type[concepts.BaseNode], ...]]] = None
+
+    #: Cache of visitor method names for each visited node class
+    __visitor_names_cache__: ClassVar[Dict[Type, str]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore  # mypy issues 4335, 4660
+        cls.__visitor_names_cache__ = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name.startswith("visit_"):
+            # Visitor methods defined on the instance: use a cache for this instance only
+            object.__setattr__(self, "__visitor_names_cache__", {})
+        object.__setattr__(self, name, value)
 
-        method_name = "visit_" + node.__class__.__name__
+    def __delattr__(self, name: str) -> None:
+        if name.startswith("visit_"):
+            object.__setattr__(self, "__visitor_names_cache__", {})
+        object.__delattr__(self, name)
+
+    def _find_visitor_name(self, node_class: Type) -> str:
+        method_name = "visit_" + node_class.__name__
         if hasattr(self, method_name):
-            visitor = getattr(self, method_name)
-        elif isinstance(node, concepts.Node):
-            for node_class in node.__class__.__mro__[1:]:
-                method_name = "visit_" + node_class.__name__
+            return method_name
+
+        if issubclass(node_class, concepts.Node):
+            for base_class in node_class.__mro__[1:]:
+                method_name = "visit_" + base_class.__name__
                 if hasattr(self, method_name):
-                    visitor = getattr(self, method_name)
-                    break
+                    return method_name
 
-                if node_class is concepts.Node:
+                if base_class is concepts.Node:
                     break
 
-        return visitor(node, **kwargs)
+        return "generic_visit"
+
+    def visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        node_class = node.__class__
+        try:
+            method_name = self.__visitor_names_cache__[node_class]
+        except KeyError:
+            method_name = self._find_visitor_name(node_class)
+            self.__visitor_names_cache__[node_class] = method_name
+
+        return getattr(self, method_name)(node, **kwargs)
 
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
-        for child in iterators.generic_iter_children(node):
-            self.visit(child, **kwargs)
+        if self.visited_node_types is not None and isinstance(node, concepts.Node):
+            for name in concepts.reaching_children_names(node.__class__, self.visited_node_types):
+                self.visit(getattr(node, name), **kwargs)
+        else:
+            for child in iterators.generic_iter_children(node):
+                self.visit(child, **kwargs)
 
 
 class NodeTranslator(NodeVisitor):
@@ -136,6 +183,15 @@ class NodeTranslator(NodeVisitor):
     method (:meth:`generic_visit`) returns a `deepcopy` of the original
     node.
 
+    Subclasses can opt in to structural sharing by setting the
+    :attr:`structural_sharing` class attribute to ``True``. In this mode,
+    :meth:`generic_visit` returns the original node (or collection) if
+    none of its children have been replaced, and leaf values are never
+    copied, so the output tree shares all the unchanged subtrees with the
+    input tree. This makes light passes, which only touch a few nodes,
+    proportional to the number of changes, but it also means that the
+    input and output trees should not be modified in place afterwards.
+
     Keep in mind that if the node you're operating on has child nodes
     you must either transform the child nodes yourself or call the
     :meth:`generic_visit` method for the node first.
@@ -149,6 +205,9 @@ class NodeTranslator(NodeVisitor):
 
     """
 
+    #: Reuse unchanged subtrees of the input tree instead of copying them
+    structural_sharing: ClassVar[bool] = False
+
     _memo_dict_: Dict[int, Any]
 
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
@@ -161,6 +220,10 @@ class NodeTranslator(NodeVisitor):
                 tmp_items = {
                     key: self.visit(value, **kwargs) for key, value in node.iter_children()
                 }
+                if self.structural_sharing and _all_unchanged(
+                    tmp_items.values(), node.iter_children_values()
+                ):
+                    return node
                 result = node.__class__(  # type: ignore
                     **{key: value for key, value in node.iter_impl_fields()},
                     **{key: value for key, value in tmp_items.items() if value is not NOTHING},
@@ -169,6 +232,8 @@ class NodeTranslator(NodeVisitor):
             elif isinstance(node, (collections.abc.Sequence, collections.abc.Set)):
                 # Sequence or set: create a new container instance with the new values
                 tmp_items = [self.visit(value, **kwargs) for value in node]
+                if self.structural_sharing and _all_unchanged(tmp_items, node):
+                    return node
                 result = node.__class__(  # type: ignore
                     value for value in tmp_items if value is not NOTHING
                 )
@@ -176,10 +241,15 @@ class NodeTranslator(NodeVisitor):
             elif isinstance(node, collections.abc.Mapping):
                 # Mapping: create a new mapping instance with the new values
                 tmp_items = {key: self.visit(value, **kwargs) for key, value in node.items()}
+                if self.structural_sharing and _all_unchanged(tmp_items.values(), node.values()):
+                    return node
                 result = node.__class__(  # type: ignore
                     {key: value for key, value in tmp_items.items() if value is not NOTHING}
                 )
 
+        elif self.structural_sharing or isinstance(node, _IMMUTABLE_LEAF_TYPES):
+            result = node
+
         else:
             if not hasattr(self, "_memo_dict_"):
                 self._memo_dict_ = {}
@@ -188,6 +258,14 @@ class NodeTranslator(NodeVisitor):
         return result
 
 
+#: Leaf types which are returned as they are instead of being deep-copied
+_IMMUTABLE_LEAF_TYPES = (type(None), bool, int, float, complex, str, bytes, enum.Enum)
+
+
+def _all_unchanged(new_values: Iterable[Any], old_values: Iterable[Any]) -> bool:
+    return all(new is old for new, old in zip(new_values, old_values))
+
+
 class NodeMutator(NodeVisitor):
     """Special `NodeVisitor` to modify nodes in place.
 
@@ -210,75 +288,122 @@ class NodeMutator(NodeVisitor):
 
        YourMutator.apply(node)
 
+    By default, a child is only written back if the visitor returned a
+    different object (identity check), so that no-op passes do not pay for
+    the (recursive) comparison of pydantic nodes. Subclasses can set the
+    :attr:`structural_equality` class attribute to ``True`` to compare the
+    new and old values with ``==`` instead.
+
     Notes:
         Check :class:`NodeVisitor` documentation for more details.
 
     """
 
+    #: Compare the new and old values of the children by equality instead of identity
+    structural_equality: ClassVar[bool] = False
+
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
         result: Any = node
-        if isinstance(node, (concepts.Node, collections.abc.Collection)) and utils.is_collection(
-            node
-        ):
-            items: Iterable[Tuple[Any, Any]] = []
-            tmp_items: Collection[concepts.TreeNode] = []
-            set_op: Union[Callable[[Any, str, Any], None], Callable[[Any, int, Any], None]]
-            del_op: Union[Callable[[Any, str], None], Callable[[Any, int], None]]
-
-            if isinstance(node, concepts.Node):
-                items = list(node.iter_children())
-                set_op = setattr
-                del_op = delattr
-            elif isinstance(node, collections.abc.MutableSequence):
-                items = enumerate(node)
-                index_shift = 0
+        is_changed = operator.ne if self.structural_equality else operator.is_not
 
-                def set_op(container: MutableSequence, idx: int, value: concepts.TreeNode) -> None:
-                    container[idx - index_shift] = value
+        if isinstance(node, concepts.Node):
+            self._mutate_node(node, is_changed, **kwargs)
 
-                def del_op(container: MutableSequence, idx: int) -> None:
-                    nonlocal index_shift
-                    del container[idx - index_shift]
-                    index_shift += 1
+        elif isinstance(node, _IMMUTABLE_LEAF_TYPES):
+            pass
 
+        elif isinstance(node, collections.abc.Collection) and utils.is_collection(node):
+            if isinstance(node, collections.abc.MutableSequence):
+                self._mutate_sequence(node, is_changed, **kwargs)
             elif isinstance(node, collections.abc.MutableSet):
-                items = list(enumerate(node))
-
-                def set_op(container: MutableSet, idx: Any, value: concepts.TreeNode) -> None:
-                    container.add(value)
-
-                def del_op(container: MutableSet, idx: int) -> None:
-                    container.remove(items[idx])  # type: ignore
-
+                self._mutate_set(node, is_changed, **kwargs)
             elif isinstance(node, collections.abc.MutableMapping):
-                items = node.items()
-                set_op = operator.setitem
-                del_op = operator.delitem
+                self._mutate_mapping(node, is_changed, **kwargs)
 
             elif isinstance(node, (collections.abc.Sequence, collections.abc.Set)):
                 # Inmutable sequence or set: create a new container instance with the new values
                 tmp_items = [self.visit(value, **kwargs) for value in node]
-                result = node.__class__(  # type: ignore
-                    [value for value in tmp_items if value is not concepts.NOTHING]
-                )
+                if any(map(is_changed, tmp_items, node)):
+                    result = node.__class__(  # type: ignore
+                        [value for value in tmp_items if value is not concepts.NOTHING]
+                    )
 
             elif isinstance(node, collections.abc.Mapping):
                 # Inmutable mapping: create a new mapping instance with the new values
                 tmp_items = {key: self.visit(value, **kwargs) for key, value in node.items()}
-                result = node.__class__(  # type: ignore
-                    {
-                        key: value
-                        for key, value in tmp_items.items()
-                        if value is not concepts.NOTHING
-                    }
-                )
-
-            # Finally, in case current node object is mutable, process selected items (if any)
-            for key, value in items:
-                new_value = self.visit(value, **kwargs)
-                if new_value is concepts.NOTHING:
-                    del_op(result, key)
-                elif new_value != value:
-                    set_op(result, key, new_value)
+                if any(map(is_changed, tmp_items.values(), node.values())):
+                    result = node.__class__(  # type: ignore
+                        {
+                            key: value
+                            for key, value in tmp_items.items()
+                            if value is not concepts.NOTHING
+                        }
+                    )
 
         return result
+
+    def _mutate_node(
+        self, node: concepts.Node, is_changed: Callable[[Any, Any], bool], **kwargs: Any
+    ) -> None:
+        # `iter_children()` iterates over a snapshot of the values
+        for name, value in node.iter_children():
+            new_value = self.visit(value, **kwargs)
+            if new_value is concepts.NOTHING:
+                delattr(node, name)
+                concepts.invalidate_node_indices()
+            elif is_changed(new_value, value):
+                setattr(node, name, new_value)
+                concepts.invalidate_node_indices()
+
+    def _mutate_sequence(
+        self, node: MutableSequence, is_changed: Callable[[Any, Any], bool], **kwargs: Any
+    ) -> None:
+        # Compact the remaining items in place while iterating
+        write_idx = 0
+        for read_idx in range(len(node)):
+            value = node[read_idx]
+            new_value = self.visit(value, **kwargs)
+            if new_value is concepts.NOTHING:
+                continue
+            if write_idx != read_idx or is_changed(new_value, value):
+                node[write_idx] = new_value
+                concepts.invalidate_node_indices()
+            write_idx += 1
+        if write_idx < len(node):
+            del node[write_idx:]
+            concepts.invalidate_node_indices()
+
+    def _mutate_set(
+        self, node: MutableSet, is_changed: Callable[[Any, Any], bool], **kwargs: Any
+    ) -> None:
+        # Elements cannot be added or removed while iterating over the set
+        removed, added = [], []
+        for value in node:
+            new_value = self.visit(value, **kwargs)
+            if new_value is concepts.NOTHING or is_changed(new_value, value):
+                removed.append(value)
+                if new_value is not concepts.NOTHING:
+                    added.append(new_value)
+        if removed:
+            for value in removed:
+                node.discard(value)
+            for value in added:
+                node.add(value)
+            concepts.invalidate_node_indices()
+
+    def _mutate_mapping(
+        self, node: MutableMapping, is_changed: Callable[[Any, Any], bool], **kwargs: Any
+    ) -> None:
+        # Values of existing keys can be replaced while iterating but keys cannot be deleted
+        removed_keys = []
+        for key, value in node.items():
+            new_value = self.visit(value, **kwargs)
+            if new_value is concepts.NOTHING:
+                removed_keys.append(key)
+            elif is_changed(new_value, value):
+                node[key] = new_value
+                concepts.invalidate_node_indices()
+        if removed_keys:
+            for key in removed_keys:
+                del node[key]
+            concepts.invalidate_node_indices()
@@ -18,4 +18,8 @@
 
 # as long as gt_frontend and eve live in the same repository they share the same version
 #  for now this is only used as a version number in the documentation
-from eve.version import __version__, __versioninfo__  # noqa
+import eve.version
+from eve.version import __version__  # noqa
+
+
+__getattr__ = eve.version.versioninfo_getattr(__name__)
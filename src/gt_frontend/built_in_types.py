@@ -90,3 +90,11 @@ class Local(BuiltInType):
     """
 
     pass
+
+
+class K(BuiltInType):
+    """
+    Used as a type argument to :class:`.Field` representing the vertical dimension.
+    """
+
+    pass
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Persistent on-disk cache for the code generated from GTScript definitions."""
+
+import inspect
+import os
+import pickle
+import tempfile
+import textwrap
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import gtc
+from eve.utils import shash
+
+from .built_in_types import BuiltInTypeMeta
+
+
+def _canonical_repr(value: Any) -> str:
+    # Type annotations like `Field[Edge, dtype]` do not include their arguments in `repr()`
+    if isinstance(value, BuiltInTypeMeta):
+        args = ", ".join(_canonical_repr(arg) for arg in value.args or ())
+        return f"{value.class_name}[{args}]"
+    return repr(value)
+
+
+def compilation_key(
+    definition: Callable,
+    constants: Mapping[str, Any],
+    code_generator: type,
+    *,
+    formatted: bool = True,
+    passes: Sequence[Tuple[str, bool]] = (),
+) -> str:
+    """Compute the cache key of a GTScript definition.
+
+    The key depends on the source code and the argument annotations of the
+    definition, the compile-time constants of the symbol table, the code
+    generator class, the formatting of the generated code, the compilation
+    pipeline (`passes` is the ordered sequence of pass names and their
+    enabled state) and the version of gtc.
+    """
+    source = textwrap.dedent(inspect.getsource(definition))
+    annotations = {
+        name: _canonical_repr(param.annotation)
+        for name, param in inspect.signature(definition).parameters.items()
+    }
+    return shash(
+        source,
+        sorted(annotations.items()),
+        sorted((name, _canonical_repr(value)) for name, value in constants.items()),
+        f"{code_generator.__module__}.{code_generator.__qualname__}",
+        formatted,
+        [(name, bool(enabled)) for name, enabled in passes],
+        gtc.__version__,
+    )
+
+
+class CompilationCacheStats:
+    """Statistics of a :class:`CompilationCache` instance (in the current process)."""
+
+    __slots__ = ("hits", "misses", "stores", "evictions")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def update(self, other: "CompilationCacheStats") -> None:
+        """Add the counts of `other` (e.g. collected in another process)."""
+        self.hits += other.hits
+        self.misses += other.misses
+        self.stores += other.stores
+        self.evictions += other.evictions
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(hits={self.hits}, misses={self.misses}, "
+            f"stores={self.stores}, evictions={self.evictions})"
+        )
+
+
+class CompilationCache:
+    """Content-addressed on-disk cache of generated code.
+
+    Each entry is stored in a ``<key>.cpp`` file with the generated code and,
+    if `store_irs` is enabled, a ``<key>.pkl`` file with the pickled IRs.
+    Files are written atomically (using a temporary file and a rename), so
+    the same cache directory can be shared by concurrent processes. When the
+    total size of the cache exceeds `max_size`, the least recently used
+    entries are removed (the last access time is tracked with the
+    modification time of the ``.cpp`` file).
+
+    Args:
+        path: Cache directory. Defaults to the ``GT_FRONTEND_CACHE_DIR``
+            environment variable or ``~/.cache/gt_frontend``.
+        max_size: Maximum size of the cache in bytes.
+        store_irs: Store also the pickled IRs together with the generated code.
+
+    """
+
+    CODE_SUFFIX = ".cpp"
+    IRS_SUFFIX = ".pkl"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        max_size: int = 256 * 1024 ** 2,
+        store_irs: bool = False,
+    ) -> None:
+        if path is None:
+            path = os.environ.get(
+                "GT_FRONTEND_CACHE_DIR",
+                os.path.join(os.path.expanduser("~"), ".cache", "gt_frontend"),
+            )
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self.store_irs = store_irs
+        self.stats = CompilationCacheStats()
+
+    def _entry_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.path, key + suffix)
+
+    def load(self, key: str) -> Optional[str]:
+        """Return the generated code stored for `key` or `None` if it is not cached."""
+        code_path = self._entry_path(key, self.CODE_SUFFIX)
+        try:
+            with open(code_path, "r") as f:
+                code = f.read()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+
+        try:
+            # Update the last access time used for the LRU eviction
+            os.utime(code_path)
+        except OSError:
+            # The entry could have been evicted by another process
+            pass
+
+        self.stats.hits += 1
+        return code
+
+    def load_irs(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the IRs stored for `key` or `None` if they are not cached."""
+        try:
+            with open(self._entry_path(key, self.IRS_SUFFIX), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, code: str, irs: Optional[Dict[str, Any]] = None) -> None:
+        """Store the generated code (and the IRs if `store_irs` is enabled) for `key`."""
+        if self.store_irs and irs is not None:
+            self._write_atomic(self._entry_path(key, self.IRS_SUFFIX), pickle.dumps(irs))
+        # The code file is written last since it marks the entry as valid
+        self._write_atomic(self._entry_path(key, self.CODE_SUFFIX), code.encode())
+        self.stats.stores += 1
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all the entries of the cache."""
+        for entry in os.scandir(self.path):
+            if entry.name.endswith((self.CODE_SUFFIX, self.IRS_SUFFIX)):
+                self._remove(entry.path)
+
+    def size(self) -> int:
+        """Total size of the cached entries in bytes."""
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.path)
+            if entry.name.endswith((self.CODE_SUFFIX, self.IRS_SUFFIX))
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for entry in os.scandir(self.path) if entry.name.endswith(self.CODE_SUFFIX))
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._entry_path(key, self.CODE_SUFFIX))
+
+    def _write_atomic(self, file_path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+    def _evict(self) -> None:
+        # Collect the size and the last access time of every entry
+        sizes: Dict[str, int] = {}
+        access_times: Dict[str, float] = {}
+        for entry in os.scandir(self.path):
+            key, suffix = os.path.splitext(entry.name)
+            if suffix not in (self.CODE_SUFFIX, self.IRS_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            sizes[key] = sizes.get(key, 0) + stat.st_size
+            if suffix == self.CODE_SUFFIX or key not in access_times:
+                access_times[key] = stat.st_mtime
+
+        total_size = sum(sizes.values())
+        for key in sorted(access_times, key=access_times.__getitem__):
+            if total_size <= self.max_size:
+                break
+            self._remove(self._entry_path(key, self.CODE_SUFFIX))
+            self._remove(self._entry_path(key, self.IRS_SUFFIX))
+            self.stats.evictions += 1
+            total_size -= sizes[key]
+
+    @staticmethod
+    def _remove(file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
@@ -15,10 +15,15 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import ast
+import concurrent.futures
 import inspect
 import textwrap
+import traceback
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
 
 import devtools
+from gt_frontend import gtscript_ast
+from gt_frontend.compilation_cache import CompilationCache, CompilationCacheStats, compilation_key
 from gt_frontend.gtscript_to_gtir import (
     GTScriptToGTIR,
     NodeCanonicalizer,
@@ -29,11 +34,16 @@ from gt_frontend.gtscript_to_gtir import (
 )
 from gt_frontend.py_to_gtscript import PyToGTScript
 
+import eve
+from eve import codegen
 from gtc import common
+from gtc.unstructured import gtir, nir, usid
 from gtc.unstructured.gtir_to_nir import GtirToNir
-from gtc.unstructured.nir_passes.merge_horizontal_loops import find_and_merge_horizontal_loops
+from gtc.unstructured.nir_passes.demote_temporaries import demote_temporaries
+from gtc.unstructured.nir_passes.fuse_horizontal_loops import fuse_horizontal_loops
 from gtc.unstructured.nir_to_usid import NirToUsid
 from gtc.unstructured.usid_codegen import UsidGpuCodeGenerator
+from gtc.unstructured.usid_passes.share_temporary_storage import share_temporary_storage
 
 
 # todo(tehrengruber): the frontend as written here will disappear at some point as the `PassManager` in Eve and
@@ -63,7 +73,73 @@ class GTScriptCompilationTask:
         self.python_ast = None
         self.gtscript_ast = None
         self.gtir = None
+        self.nir = None
+        self.usid = None
         self.cpp_code = None
+        self.code_generator = UsidGpuCodeGenerator
+        self.pass_stats: Dict[str, eve.PassStats] = {}
+
+        self.pass_manager = eve.PassManager()
+        self.pass_manager.register(
+            "py_to_gtscript", self._py_to_gtscript, output_type=gtscript_ast.Computation
+        )
+        for name, func in [
+            ("canonicalization", self._canonicalize),
+            # Populate symbol table
+            ("var_decl_extraction", self._extract_var_decls),
+            ("temporary_field_decl_extraction", self._extract_temporary_field_decls),
+            ("symbol_resolution_validation", self._validate_symbol_resolution),
+        ]:
+            self.pass_manager.register(
+                name,
+                func,
+                input_type=gtscript_ast.Computation,
+                output_type=gtscript_ast.Computation,
+            )
+        self.pass_manager.register(
+            "gtscript_to_gtir",
+            self._gtscript_to_gtir,
+            input_type=gtscript_ast.Computation,
+            output_type=gtir.Computation,
+        )
+        self.pass_manager.register(
+            "gtir_to_nir",
+            self._gtir_to_nir,
+            input_type=gtir.Computation,
+            output_type=nir.Computation,
+        )
+        self.pass_manager.register(
+            "fuse_horizontal_loops",
+            self._fuse_horizontal_loops,
+            input_type=nir.Computation,
+            output_type=nir.Computation,
+        )
+        self.pass_manager.register(
+            "demote_temporaries",
+            self._demote_temporaries,
+            input_type=nir.Computation,
+            output_type=nir.Computation,
+        )
+        self.pass_manager.register(
+            "nir_to_usid",
+            self._nir_to_usid,
+            input_type=nir.Computation,
+            output_type=usid.Computation,
+        )
+        self.pass_manager.register(
+            "share_temporary_storage",
+            self._share_temporary_storage,
+            input_type=usid.Computation,
+            output_type=usid.Computation,
+        )
+        self.pass_manager.register(
+            "codegen", self._codegen, input_type=usid.Computation, output_type=str
+        )
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Wall-clock time in seconds of every pass executed by the last code generation."""
+        return {name: stats.time for name, stats in self.pass_stats.items()}
 
     def _annotate_args(self):
         """
@@ -73,48 +149,224 @@ class GTScriptCompilationTask:
         for name, param in sig.parameters.items():
             self.symbol_table[name] = param.annotation
 
-    def _generate_gtscript_ast(self):
+    # -- Passes --
+    def _py_to_gtscript(self, definition):
         self._annotate_args()
-        self.source = textwrap.dedent(inspect.getsource(self.definition))
+        self.source = textwrap.dedent(inspect.getsource(definition))
         self.python_ast = ast.parse(self.source).body[0]
         self.gtscript_ast = PyToGTScript().transform(self.python_ast)
-
         return self.gtscript_ast
 
-    def _generate_gtir(self):
-        # Canonicalization
-        NodeCanonicalizer.apply(self.gtscript_ast)
+    def _canonicalize(self, gtscript_comp):
+        NodeCanonicalizer.apply(gtscript_comp)
+        return gtscript_comp
+
+    def _extract_var_decls(self, gtscript_comp):
+        VarDeclExtractor.apply(self.symbol_table, gtscript_comp)
+        return gtscript_comp
 
-        # Populate symbol table
-        VarDeclExtractor.apply(self.symbol_table, self.gtscript_ast)
-        TemporaryFieldDeclExtractor.apply(self.symbol_table, self.gtscript_ast)
-        SymbolResolutionValidation.apply(self.symbol_table, self.gtscript_ast)
+    def _extract_temporary_field_decls(self, gtscript_comp):
+        TemporaryFieldDeclExtractor.apply(self.symbol_table, gtscript_comp)
+        return gtscript_comp
 
-        # Transform into GTIR
-        self.gtir = GTScriptToGTIR.apply(self.symbol_table, self.gtscript_ast)
+    def _validate_symbol_resolution(self, gtscript_comp):
+        SymbolResolutionValidation.apply(self.symbol_table, gtscript_comp)
+        return gtscript_comp
 
+    def _gtscript_to_gtir(self, gtscript_comp):
+        self.gtir = GTScriptToGTIR.apply(self.symbol_table, gtscript_comp)
         return self.gtir
 
+    def _gtir_to_nir(self, gtir_comp):
+        self.nir = GtirToNir.apply(gtir_comp)
+        return self.nir
+
+    def _fuse_horizontal_loops(self, nir_comp):
+        self.nir = fuse_horizontal_loops(nir_comp)
+        return self.nir
+
+    def _demote_temporaries(self, nir_comp):
+        self.nir = demote_temporaries(nir_comp)
+        return self.nir
+
+    def _nir_to_usid(self, nir_comp):
+        self.usid = NirToUsid.apply(nir_comp)
+        return self.usid
+
+    def _share_temporary_storage(self, usid_comp):
+        self.usid = share_temporary_storage(usid_comp)
+        return self.usid
+
+    def _codegen(self, usid_comp):
+        self.cpp_code = self.code_generator.apply(usid_comp)
+        return self.cpp_code
+
+    # -- Stages --
+    def _run_passes(self, ir, *, first=None, last=None):
+        # The pass manager only keeps the statistics of its last run
+        result = self.pass_manager.run(ir, first=first, last=last)
+        self.pass_stats.update(self.pass_manager.stats)
+        return result
+
+    def _generate_gtscript_ast(self):
+        return self._run_passes(self.definition, last="py_to_gtscript")
+
+    def _generate_gtir(self):
+        return self._run_passes(
+            self.gtscript_ast, first="canonicalization", last="gtscript_to_gtir"
+        )
+
     def _generate_cpp(self, *, debug=False, code_generator=UsidGpuCodeGenerator):
-        # Code generation
-        nir_comp = GtirToNir().visit(self.gtir)
-        nir_comp = find_and_merge_horizontal_loops(nir_comp)
-        usid_comp = NirToUsid().visit(nir_comp)
+        self.code_generator = code_generator
+        self._run_passes(self.gtir, first="gtir_to_nir")
 
         if debug:
-            devtools.debug(nir_comp)
-            devtools.debug(usid_comp)
-
-        self.cpp_code = code_generator.apply(usid_comp)
+            # Nodes are created without validation inside the lowering passes
+            # (their GTIR input has been validated by the frontend)
+            eve.validate_tree(self.nir)
+            eve.validate_tree(self.usid)
+            devtools.debug(self.nir)
+            devtools.debug(self.usid)
 
         return self.cpp_code
 
-    def generate(self, *, debug=False, code_generator=UsidGpuCodeGenerator):
+    def generate(
+        self,
+        *,
+        debug=False,
+        code_generator=UsidGpuCodeGenerator,
+        cache: Optional[CompilationCache] = None,
+        format_code: bool = True,
+    ):
         """
         Generate c++ code of the stencil.
+
+        If a `cache` is provided, the code is only generated if it is not already cached.
+        Formatting of the generated code can be skipped with `format_code=False`.
         """
-        self._generate_gtscript_ast()
-        self._generate_gtir()
-        self._generate_cpp(debug=debug, code_generator=code_generator)
+        if cache is not None:
+            key = compilation_key(
+                self.definition,
+                self.symbol_table.constants,
+                code_generator,
+                formatted=format_code,
+                passes=[(pass_.name, pass_.enabled) for pass_ in self.pass_manager],
+            )
+            cpp_code = cache.load(key)
+            if cpp_code is not None:
+                irs = cache.load_irs(key) if cache.store_irs else None
+                if irs:
+                    self.gtir, self.nir, self.usid = irs["gtir"], irs["nir"], irs["usid"]
+                self.cpp_code = cpp_code
+                return self.cpp_code
+
+        self.pass_stats = {}
+
+        # Node ids only depend on the compilation itself
+        with eve.node_id_scope(), codegen.source_formatting(format_code):
+            self._generate_gtscript_ast()
+            self._generate_gtir()
+            self._generate_cpp(debug=debug, code_generator=code_generator)
+
+        if cache is not None:
+            cache.store(key, self.cpp_code, {"gtir": self.gtir, "nir": self.nir, "usid": self.usid})
 
         return self.cpp_code
+
+
+class CompilationResult(NamedTuple):
+    """Result of the compilation of a GTScript definition in :func:`compile_many`."""
+
+    #: Name of the definition
+    name: str
+    #: Generated code (`None` if the compilation failed)
+    cpp_code: Optional[str]
+    #: Formatted traceback of the compilation error (if any)
+    error: Optional[str]
+    #: Wall-clock time in seconds of every compilation stage
+    timings: Dict[str, float]
+    #: Statistics of the compilation cache in the worker (if a cache was used)
+    cache_stats: Optional[CompilationCacheStats] = None
+
+
+def _compile_definition(
+    definition: Callable, code_generator, cache, format_code
+) -> CompilationResult:
+    if cache is not None:
+        # The cache is a copy of the one in the main process: only count this compilation
+        cache.stats = CompilationCacheStats()
+    cache_stats = cache.stats if cache is not None else None
+
+    task = GTScriptCompilationTask(definition)
+    try:
+        task.generate(code_generator=code_generator, cache=cache, format_code=format_code)
+    except Exception:
+        return CompilationResult(
+            definition.__name__, None, traceback.format_exc(), task.timings, cache_stats
+        )
+
+    return CompilationResult(definition.__name__, task.cpp_code, None, task.timings, cache_stats)
+
+
+def compile_many(
+    definitions: Sequence[Callable],
+    *,
+    code_generator=UsidGpuCodeGenerator,
+    max_workers: Optional[int] = None,
+    cache: Optional[CompilationCache] = None,
+    format_code: bool = True,
+) -> List[CompilationResult]:
+    """
+    Generate c++ code of several stencils in parallel using a pool of processes.
+
+    Results are returned in the same order of the `definitions`. Errors are
+    reported in the results of the failing definitions without stopping the
+    compilation of the others. Definitions must be picklable (e.g. module-level
+    functions). Without a `cache`, the generated code of all the stencils is
+    formatted at once at the end (instead of in every worker), and formatting
+    can be skipped with `format_code=False`. The statistics of the `cache` are
+    updated with the lookups and stores of all the workers.
+    """
+    # Cached code is always stored as generated (i.e. formatted in the workers)
+    batch_format = format_code and cache is None
+    results: List[CompilationResult] = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _compile_definition,
+                definition,
+                code_generator,
+                cache,
+                format_code and not batch_format,
+            )
+            for definition in definitions
+        ]
+        for definition, future in zip(definitions, futures):
+            try:
+                result = future.result()
+                if cache is not None and result.cache_stats is not None:
+                    cache.stats.update(result.cache_stats)
+                results.append(result)
+            except Exception:
+                # The worker process died or the definition could not be sent to it
+                results.append(
+                    CompilationResult(
+                        getattr(definition, "__name__", str(definition)),
+                        None,
+                        traceback.format_exc(),
+                        {},
+                    )
+                )
+
+    if batch_format:
+        formatted_code = iter(
+            codegen.format_sources(
+                "cpp", [r.cpp_code for r in results if r.cpp_code is not None], style="LLVM"
+            )
+        )
+        results = [
+            r._replace(cpp_code=next(formatted_code)) if r.cpp_code is not None else r
+            for r in results
+        ]
+
+    return results
@@ -18,7 +18,7 @@ from typing import Callable
 
 import gtc.common as common
 
-from .built_in_types import Field, Local, Location, Mesh, TemporaryField
+from .built_in_types import Field, K, Local, Location, Mesh, TemporaryField
 
 
 # built-in symbols
@@ -40,6 +40,7 @@ _built_in_functions = [
 
 __all__ = _built_in_functions + [
     "Field",
+    "K",
     "Local",
     "Location",
     "Mesh",
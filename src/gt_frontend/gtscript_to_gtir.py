@@ -21,7 +21,7 @@ import gtc.common as common
 import gtc.unstructured.gtir as gtir
 
 from .built_in_types import BuiltInTypeMeta
-from .gtscript import Field, Local, Location, Mesh, TemporaryField
+from .gtscript import Field, K, Local, Location, Mesh, TemporaryField
 from .gtscript_ast import (
     Argument,
     Assign,
@@ -454,12 +454,17 @@ class GTScriptToGTIR(eve.NodeTranslator):
         )
 
     @staticmethod
-    def _transform_field_type(name, field_type):
+    def _transform_field_type(name, field_type, *, vertical=False):
         assert issubclass(field_type, Field) or issubclass(field_type, TemporaryField)
         *location_types, vtype, = field_type.args
 
         assert isinstance(vtype, common.DataType)
 
+        if len(location_types) > 0 and isinstance(location_types[-1], BuiltInTypeMeta):
+            if issubclass(location_types[-1], K):
+                location_types.pop()
+                vertical = True
+
         if len(location_types) == 1:
             assert isinstance(location_types[0], common.LocationType)
             horizontal_dim = gtir.HorizontalDimension(primary=location_types[0])
@@ -476,7 +481,11 @@ class GTScriptToGTIR(eve.NodeTranslator):
             raise ValueError()
 
         return gtir.UField(
-            name=name, vtype=vtype, dimensions=gtir.Dimensions(horizontal=horizontal_dim),
+            name=name,
+            vtype=vtype,
+            dimensions=gtir.Dimensions(
+                horizontal=horizontal_dim, vertical=gtir.VerticalDimension() if vertical else None,
+            ),
         )
 
     def visit_Computation(self, node: Computation) -> gtir.Computation:
@@ -488,11 +497,14 @@ class GTScriptToGTIR(eve.NodeTranslator):
         for arg in node.arguments[1:]:
             field_args.append(self._transform_field_type(arg.name, self.symbol_table[arg.name]))
 
-        # parse temporary fields
+        # parse temporary fields (with a vertical dimension if any of the arguments has one)
+        vertical = any(field.dimensions.vertical for field in field_args)
         temporary_field_decls = []
         for name, type_ in self.symbol_table.types.items():
             if issubclass(type_, TemporaryField):
-                temporary_field_decls.append(self._transform_field_type(name, type_))
+                temporary_field_decls.append(
+                    self._transform_field_type(name, type_, vertical=vertical)
+                )
 
         return gtir.Computation(
             name=node.name,
@@ -16,6 +16,10 @@
 
 """GT Toolchain: Eve toolchains for stencils in structured and unstructured grids."""
 
-from eve.version import __version__, __versioninfo__  # noqa
+import eve.version
+from eve.version import __version__  # noqa
 
 from . import structured, unstructured  # noqa
+
+
+__getattr__ = eve.version.versioninfo_getattr(__name__)
@@ -64,6 +64,16 @@ class DataType(IntEnum):
     UINT32 = 6
 
 
+#: Size in bytes of the concrete data types
+DATA_TYPE_SIZES = {
+    DataType.BOOLEAN: 1,
+    DataType.INT32: 4,
+    DataType.FLOAT32: 4,
+    DataType.FLOAT64: 8,
+    DataType.UINT32: 4,
+}
+
+
 # TODO not really common
 @enum.unique
 class LoopOrder(IntEnum):
@@ -17,7 +17,6 @@
 import enum
 from typing import List, Optional, Union
 
-from devtools import debug  # noqa: F401
 from pydantic import root_validator, validator
 
 from eve import Node, Str, StrEnum
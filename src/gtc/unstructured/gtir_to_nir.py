@@ -15,7 +15,6 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
-import copy
 from types import MappingProxyType
 from typing import ClassVar, Dict, List, Mapping
 
@@ -48,8 +47,14 @@ class GtirToNir(eve.NodeTranslator):
         }
     )
 
+    @classmethod
+    def apply(cls, root, **kwargs):
+        # Input nodes have been already validated
+        with eve.trusted_construction():
+            return cls().visit(root, **kwargs)
+
     def visit_NeighborChain(self, node: gtir.NeighborChain, **kwargs):
-        return nir.NeighborChain(elements=node.elements)
+        return nir.NeighborChain(elements=tuple(node.elements))
 
     def visit_HorizontalDimension(self, node: gtir.HorizontalDimension, **kwargs):
         return nir.HorizontalDimension(
@@ -100,9 +105,29 @@ class GtirToNir(eve.NodeTranslator):
 
         return result
 
+    @staticmethod
+    def full_chain(
+        location_comprehension: gtir.LocationComprehension,
+        location_comprehensions: Dict[str, gtir.LocationComprehension],
+    ) -> nir.NeighborChain:
+        """
+        Returns the chain from the location of the horizontal loop to the given location.
+
+        The chain of a (nested) `LocationComprehension` only contains the last neighbor hop,
+        e.g. `(Edge, Cell)` for `c in cells(e)` with `e in edges(v)`, while the full chain
+        is `(Vertex, Edge, Cell)`.
+        """
+        elements = tuple(location_comprehension.chain.elements)
+        while not isinstance(location_comprehension.of, gtir.Domain):
+            location_comprehension = location_comprehensions[location_comprehension.of.name]
+            elements = tuple(location_comprehension.chain.elements[:-1]) + elements
+        return nir.NeighborChain(elements=elements)
+
     def visit_FieldAccess(self, node: gtir.FieldAccess, *, location_comprehensions, **kwargs):
         ordered_location_refs = self.order_location_refs(node.subscript, location_comprehensions)
-        primary_chain = location_comprehensions[ordered_location_refs["primary"]].chain
+        primary_chain = self.full_chain(
+            location_comprehensions[ordered_location_refs["primary"]], location_comprehensions
+        )
         secondary_chain = (
             location_comprehensions[ordered_location_refs["secondary"]].chain
             if "secondary" in ordered_location_refs
@@ -113,11 +138,11 @@ class GtirToNir(eve.NodeTranslator):
             name=node.name,
             location_type=node.location_type,
             primary=primary_chain,
-            secondary=secondary_chain,
+            secondary=self.visit(secondary_chain) if secondary_chain else None,
         )
 
     def visit_NeighborReduce(self, node: gtir.NeighborReduce, *, last_block, **kwargs):
-        loc_comprehension = copy.deepcopy(kwargs["location_comprehensions"])
+        loc_comprehension = dict(kwargs["location_comprehensions"])
         assert node.neighbors.name not in loc_comprehension
         loc_comprehension[node.neighbors.name] = node.neighbors
         kwargs["location_comprehensions"] = loc_comprehension
@@ -142,21 +167,22 @@ class GtirToNir(eve.NodeTranslator):
                 location_type=node.location_type,
             ),
         )
-        body = nir.BlockStmt(
-            declarations=[],
-            statements=[
-                nir.AssignStmt(
+        # nested reductions are emitted into the body of this neighbor loop
+        body = nir.BlockStmt(declarations=[], statements=[], location_type=body_location)
+        operand = self.visit(
+            node.operand, **{**kwargs, "in_neighbor_loop": True, "last_block": body}
+        )
+        body.statements.append(
+            nir.AssignStmt(
+                left=nir.VarAccess(name=reduce_var_name, location_type=body_location),
+                right=nir.BinaryOp(
                     left=nir.VarAccess(name=reduce_var_name, location_type=body_location),
-                    right=nir.BinaryOp(
-                        left=nir.VarAccess(name=reduce_var_name, location_type=body_location),
-                        op=self.REDUCE_OP_TO_BINOP[node.op],
-                        right=self.visit(node.operand, in_neighbor_loop=True, **kwargs),
-                        location_type=body_location,
-                    ),
+                    op=self.REDUCE_OP_TO_BINOP[node.op],
+                    right=operand,
                     location_type=body_location,
-                )
-            ],
-            location_type=body_location,
+                ),
+                location_type=body_location,
+            )
         )
         last_block.statements.append(
             nir.NeighborLoop(
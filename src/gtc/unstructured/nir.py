@@ -16,7 +16,6 @@
 
 from typing import List, Optional, Tuple, Union
 
-from devtools import debug  # noqa: F401
 from pydantic import root_validator, validator
 
 import eve
@@ -42,7 +41,7 @@ class Literal(Expr):
 class NeighborChain(Node):
     elements: Tuple[common.LocationType, ...]
 
-    class Config(eve.concepts.FrozenModelConfig):
+    class Config(eve.concepts.InternedNodeConfig):
         pass
 
     # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
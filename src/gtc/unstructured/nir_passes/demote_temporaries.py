@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Dict, List, NamedTuple, Set
+
+import eve  # noqa: F401
+from eve import Node, NodeTranslator, NodeVisitor
+from gtc.unstructured import nir
+
+
+class _Access(NamedTuple):
+    loop: str
+    is_write: bool
+    #: Write in a top-level statement of the loop (always executed)
+    is_unconditional_write: bool
+    has_offset: bool
+
+
+class _TemporaryAccessesAnalysis(NodeVisitor):
+    """Collect the accesses to the temporaries (in execution order) and the loops containing them."""
+
+    visited_node_types = (nir.HorizontalLoop, nir.NeighborLoop, nir.AssignStmt, nir.FieldAccess)
+
+    def __init__(self, temporaries: Set[str], **kwargs):
+        super().__init__()
+        self.temporaries = temporaries
+        self.accesses: Dict[str, List[_Access]] = {name: [] for name in temporaries}
+
+    @classmethod
+    def apply(cls, root: Node, temporaries: Set[str], **kwargs) -> Dict[str, List[_Access]]:
+        instance = cls(temporaries)
+        instance.visit(root, **kwargs)
+        return instance.accesses
+
+    def visit_HorizontalLoop(self, node: nir.HorizontalLoop, **kwargs):
+        self.generic_visit(node, loop=node.id_, nested=False)
+
+    def visit_NeighborLoop(self, node: nir.NeighborLoop, **kwargs):
+        self.generic_visit(node, **{**kwargs, "nested": True})
+
+    def visit_FieldAccess(self, node: nir.FieldAccess, *, loop, is_write=False, **kwargs):
+        if node.name in self.temporaries:
+            self.accesses[node.name].append(
+                _Access(
+                    loop=loop,
+                    is_write=is_write,
+                    is_unconditional_write=is_write and not kwargs["nested"],
+                    has_offset=node.extent or node.secondary is not None,
+                )
+            )
+
+    def visit_AssignStmt(self, node: nir.AssignStmt, **kwargs):
+        # the right hand side is evaluated before the assignment
+        self.visit(node.right, **kwargs)
+        self.visit(node.left, is_write=True, **kwargs)
+
+
+def _is_demotable(accesses: List[_Access]) -> bool:
+    return (
+        len(accesses) > 0
+        and accesses[0].is_unconditional_write
+        and all(access.loop == accesses[0].loop for access in accesses)
+        and not any(access.has_offset for access in accesses)
+    )
+
+
+class DemoteTemporaries(NodeTranslator):
+    """Replace temporary fields only used in a single horizontal loop by local variables.
+
+    A temporary can be demoted to a local variable (a register) of a horizontal
+    loop if it is accessed only in that loop, always without offset (so every
+    thread only accesses its own element), and it is written in a top-level
+    statement of the loop before any read. Its accesses become
+    :class:`nir.VarAccess` nodes and its declaration is moved from the
+    computation to the loop, so the temporary storage is not allocated.
+
+    This usually applies after fusing horizontal loops
+    (see :mod:`gtc.unstructured.nir_passes.fuse_horizontal_loops`).
+    The input tree is not modified.
+    """
+
+    structural_sharing = True
+
+    @classmethod
+    def apply(cls, root: nir.Computation, **kwargs) -> nir.Computation:
+        """"""
+        return cls().visit(root, **kwargs)
+
+    def visit_Computation(self, node: nir.Computation, **kwargs):
+        temporaries = {temporary.name: temporary for temporary in node.declarations or []}
+
+        # Only temporaries accessed in a single loop and never with offset can be
+        # demoted, which is checked first with the node-type index of the loops
+        loops: Dict[str, Set[str]] = {}
+        with_offset: Set[str] = set()
+        for loop in node.find_all(nir.HorizontalLoop):
+            for access in loop.find_all(nir.FieldAccess):
+                if access.name in temporaries:
+                    loops.setdefault(access.name, set()).add(loop.id_)
+                    if access.extent or access.secondary is not None:
+                        with_offset.add(access.name)
+        candidates = {
+            name
+            for name, temporary in temporaries.items()
+            if temporary.dimensions.horizontal is not None
+            and len(loops.get(name, ())) == 1
+            and name not in with_offset
+        }
+        if not candidates:
+            return node
+        accesses = _TemporaryAccessesAnalysis.apply(node, candidates)
+
+        local_vars: Dict[str, List[nir.TemporaryField]] = {}
+        for name, temporary in temporaries.items():
+            if name in candidates and _is_demotable(accesses[name]):
+                local_vars.setdefault(accesses[name][0].loop, []).append(temporary)
+        if not local_vars:
+            return node
+
+        demoted = {
+            temporary.name
+            for loop_temporaries in local_vars.values()
+            for temporary in loop_temporaries
+        }
+        return node.copy(
+            update={
+                "stencils": self.visit(node.stencils, demoted=demoted, local_vars=local_vars),
+                "declarations": [
+                    temporary for temporary in node.declarations if temporary.name not in demoted
+                ],
+            }
+        )
+
+    def visit_HorizontalLoop(self, node: nir.HorizontalLoop, *, local_vars, **kwargs):
+        result = self.generic_visit(node, local_vars=local_vars, **kwargs)
+        if node.id_ not in local_vars:
+            return result
+
+        declarations = list(result.stmt.declarations)
+        for temporary in local_vars[node.id_]:
+            declarations.append(
+                nir.LocalVar(
+                    name=temporary.name, vtype=temporary.vtype, location_type=node.location_type
+                )
+            )
+        return nir.HorizontalLoop(
+            stmt=nir.BlockStmt(
+                declarations=declarations,
+                statements=result.stmt.statements,
+                location_type=node.location_type,
+            ),
+            location_type=node.location_type,
+        )
+
+    def visit_FieldAccess(self, node: nir.FieldAccess, *, demoted, **kwargs):
+        if node.name in demoted:
+            return nir.VarAccess(name=node.name, location_type=node.location_type)
+        return node
+
+
+def demote_temporaries(root: nir.Computation) -> nir.Computation:
+    return DemoteTemporaries.apply(root)
@@ -14,19 +14,162 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import List
-
-import networkx as nx
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import eve  # noqa: F401
 from eve import NodeVisitor
-from gtc.unstructured.nir import AssignStmt, FieldAccess, HorizontalLoop
+from gtc.unstructured.nir import Access, AssignStmt, FieldAccess, HorizontalLoop
+
+
+class FieldDependencyGraph:
+    """Compact directed graph of field writes.
+
+    Nodes are identified by consecutive integer indices (in order of insertion),
+    which map to the write accesses in `writes` (looked up by their `id_`). Edges are stored in insertion
+    order and packed as ``target << 1 | extent``, and they are converted to a
+    CSR (compressed sparse row) adjacency structure on demand for the queries.
+    Parallel edges are allowed: the extent of an edge is the union of the extents
+    of all edges between the same nodes.
+    """
+
+    __slots__ = (
+        "writes",
+        "has_read_with_offset_after_write",
+        "_indices",
+        "_sources",
+        "_packed_targets",
+        "_csr",
+    )
+
+    def __init__(self) -> None:
+        self.writes: List[Access] = []
+        #: True if any edge has extent
+        self.has_read_with_offset_after_write = False
+        self._indices: Dict[str, int] = {}
+        self._sources = array("q")
+        self._packed_targets = array("q")
+        self._csr: Optional[Tuple[array, array]] = None
+
+    def __len__(self) -> int:
+        return len(self.writes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._sources)
+
+    def add_node(self, write: Access) -> int:
+        """Add a write access (if not already present) and return its index."""
+        index = self._indices.get(write.id_, None)
+        if index is None:
+            index = len(self.writes)
+            self._indices[write.id_] = index
+            self.writes.append(write)
+        return index
+
+    def add_edge(self, source: int, target: int, extent: bool) -> None:
+        self._sources.append(source)
+        self._packed_targets.append(target << 1 | bool(extent))
+        if extent:
+            self.has_read_with_offset_after_write = True
+        self._csr = None
+
+    def index(self, write: Access) -> int:
+        """Return the index of a write access."""
+        return self._indices[write.id_]
+
+    def nodes(self) -> range:
+        return range(len(self.writes))
+
+    def edges(self) -> List[Tuple[int, int, bool]]:
+        """Return the ``(source, target, extent)`` tuples in insertion order."""
+        return [
+            (source, packed >> 1, bool(packed & 1))
+            for source, packed in zip(self._sources, self._packed_targets)
+        ]
+
+    def _adjacency(self) -> Tuple[array, array]:
+        if self._csr is None:
+            # Counting sort of the edges by source (stable, so it keeps insertion order)
+            offsets = array("q", bytes(8 * (len(self.writes) + 1)))
+            for source in self._sources:
+                offsets[source + 1] += 1
+            for i in range(len(self.writes)):
+                offsets[i + 1] += offsets[i]
+            positions = array("q", offsets)
+            targets = array("q", bytes(8 * len(self._sources)))
+            for source, packed in zip(self._sources, self._packed_targets):
+                targets[positions[source]] = packed
+                positions[source] += 1
+            self._csr = (offsets, targets)
+
+        return self._csr
+
+    def successors(self, source: int) -> List[int]:
+        offsets, targets = self._adjacency()
+        return [packed >> 1 for packed in targets[offsets[source] : offsets[source + 1]]]
+
+    def has_edge(self, source: int, target: int) -> bool:
+        return self.extent(source, target) is not None
+
+    def extent(self, source: int, target: int) -> Optional[bool]:
+        """Return if any read of `source` in `target` has extent (`None` if there is no edge)."""
+        offsets, targets = self._adjacency()
+        result = None
+        for packed in targets[offsets[source] : offsets[source + 1]]:
+            if packed >> 1 == target:
+                result = result or bool(packed & 1)
+        return result
+
+    def reachable(self, source: int) -> Set[int]:
+        """Return the indices of all the writes depending (transitively) on `source`."""
+        offsets, targets = self._adjacency()
+        visited = set()
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            for packed in targets[offsets[node] : offsets[node + 1]]:
+                target = packed >> 1
+                if target not in visited:
+                    visited.add(target)
+                    stack.append(target)
+        return visited
+
+    def topological_order(self) -> List[int]:
+        """Return the node indices in a topological order (raise ValueError if there are cycles)."""
+        offsets, targets = self._adjacency()
+        in_degree = array("q", bytes(8 * len(self.writes)))
+        for packed in targets:
+            in_degree[packed >> 1] += 1
+        order = [node for node in self.nodes() if in_degree[node] == 0]
+        for node in order:
+            for packed in targets[offsets[node] : offsets[node + 1]]:
+                in_degree[packed >> 1] -= 1
+                if in_degree[packed >> 1] == 0:
+                    order.append(packed >> 1)
+        if len(order) != len(self.writes):
+            raise ValueError("Dependency graph contains cycles")
+        return order
+
+    def to_networkx(self) -> Any:
+        """Export as a `networkx.DiGraph` keyed by the `id_` of the writes (for debugging)."""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(write.id_ for write in self.writes)
+        for source, target, extent in self.edges():
+            source_id, target_id = self.writes[source].id_, self.writes[target].id_
+            if graph.has_edge(source_id, target_id):
+                extent = extent or graph[source_id][target_id]["extent"]
+            graph.add_edge(source_id, target_id, extent=extent)
+        return graph
 
 
 class _FieldWriteDependencyGraph(NodeVisitor):
     """Returns a dependency graph of field writes for a list of horizontal loops.
 
-    Result is a DAG where nodes represent writes and edges represent reads with extent information.
+    Result is a DAG (:class:`FieldDependencyGraph`) where nodes represent writes
+    and edges represent reads with extent information.
 
     Example 1:
     A = 1
@@ -38,34 +181,45 @@ class _FieldWriteDependencyGraph(NodeVisitor):
     A = B (B is external to the loop)
 
     Graph: A
+
+    The graph can be extended incrementally with more loops (see :meth:`add_loop`)
+    and `has_read_with_offset_after_write` tracks if any edge has extent.
     """
 
+    visited_node_types = (AssignStmt, FieldAccess)
+
     def __init__(self, **kwargs):
         super().__init__()
-        self.graph = nx.DiGraph()
+        self.graph = FieldDependencyGraph()
         self.last_write_access = {}
 
+    @property
+    def has_read_with_offset_after_write(self) -> bool:
+        return self.graph.has_read_with_offset_after_write
+
     @classmethod
     def generate(cls, loops, **kwargs):
-        """Runs the visitor, returns graph.
-        """
+        """Runs the visitor, returns graph."""
         instance = cls()
         for loop in loops:
-            instance.visit(loop, **kwargs)
+            instance.add_loop(loop, **kwargs)
         return instance.graph
 
+    def add_loop(self, loop: HorizontalLoop, **kwargs) -> None:
+        """Extend the graph with the writes and reads of a loop following the previous ones."""
+        self.visit(loop, **kwargs)
+
     def visit_FieldAccess(self, node: FieldAccess, **kwargs):
         assert "current_write" in kwargs
         if node.name in self.last_write_access:
-            assert self.last_write_access[node.name] in self.graph.nodes()
             source = self.last_write_access[node.name]
-            self.graph.add_edge(source, kwargs["current_write"], extent=node.extent)
+            self.graph.add_edge(source, kwargs["current_write"], node.extent)
 
     def visit_AssignStmt(self, node: AssignStmt, **kwargs):
-        self.graph.add_node(node.left.id_)  # make IR nodes hashable?
-        self.visit(node.right, current_write=node.left.id_)
-        self.last_write_access[node.left.name] = node.left.id_
+        current_write = self.graph.add_node(node.left)
+        self.visit(node.right, current_write=current_write)
+        self.last_write_access[node.left.name] = current_write
 
 
-def generate_dependency_graph(loops: List[HorizontalLoop]) -> nx.DiGraph:
+def generate_dependency_graph(loops: List[HorizontalLoop]) -> FieldDependencyGraph:
     return _FieldWriteDependencyGraph().generate(loops)
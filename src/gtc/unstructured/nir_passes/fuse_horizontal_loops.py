@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import itertools
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set
+
+import eve  # noqa: F401
+from eve import Node, NodeTranslator
+from gtc import common
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.merge_horizontal_loops import (
+    MergeHorizontalLoops,
+    _find_merge_candidates,
+    _merge_loops,
+)
+
+
+#: Size of the fields of unknown type (FLOAT64)
+_DEFAULT_DATA_TYPE_SIZE = common.DATA_TYPE_SIZES[common.DataType.FLOAT64]
+
+
+class FusionCost(NamedTuple):
+    """Cost of a sequence of (possibly fused) horizontal loops.
+
+    Costs are compared lexicographically: first the number of kernels and then
+    the bytes moved per horizontal element, assuming that every field accessed
+    in a kernel is loaded or stored once.
+    """
+
+    kernels: int
+    bytes_moved: int
+
+
+class _LoopAccesses:
+    """Names of the fields written and read (with and without offset) in a loop.
+
+    The accesses are looked up in the node-type index of the loop, which is
+    reused by the repeated queries of the scheduling and the cost model.
+    """
+
+    def __init__(self, writes: Set[str], reads: Set[str], offset_reads: Set[str]):
+        self.writes = writes
+        self.reads = reads
+        self.offset_reads = offset_reads
+
+    @classmethod
+    def apply(cls, loop: nir.HorizontalLoop) -> "_LoopAccesses":
+        write_accesses = [
+            stmt.left
+            for stmt in loop.find_all(nir.AssignStmt)
+            if isinstance(stmt.left, nir.FieldAccess)
+        ]
+        written = {id(access) for access in write_accesses}
+        read_accesses = [
+            access for access in loop.find_all(nir.FieldAccess) if id(access) not in written
+        ]
+        return cls(
+            writes={access.name for access in write_accesses},
+            reads={access.name for access in read_accesses},
+            offset_reads={access.name for access in read_accesses if access.extent},
+        )
+
+    @property
+    def fields(self) -> Set[str]:
+        return self.writes | self.reads
+
+
+def fusion_cost(
+    groups: List[List[nir.HorizontalLoop]], field_sizes: Optional[Dict[str, int]] = None
+) -> FusionCost:
+    """Cost of running each group of horizontal loops as a single kernel."""
+    field_sizes = field_sizes or {}
+    bytes_moved = 0
+    for group in groups:
+        fields = set().union(*(_LoopAccesses.apply(loop).fields for loop in group))
+        bytes_moved += sum(field_sizes.get(name, _DEFAULT_DATA_TYPE_SIZE) for name in fields)
+
+    return FusionCost(kernels=len(groups), bytes_moved=bytes_moved)
+
+
+def _schedule_fusion(loops: List[nir.HorizontalLoop]) -> List[List[nir.HorizontalLoop]]:
+    """Reorder independent loops to group the loops which can be fused.
+
+    The dependency DAG of the loops has an edge from a loop to every later loop
+    reading a field it writes (read after write), writing a field it reads
+    (write after read) or writing a field it writes (write after write).
+    Loops are scheduled greedily in topological order: the next loop is the
+    first ready loop (in the original order) which can be fused with the
+    current group, or the first ready loop (starting a new group) if there is
+    none. A loop can be fused with a group if it has the same location type
+    and neither of them reads with offset a field written by the other (the
+    neighbors are computed by other threads of the fused kernel).
+
+    Without fusable loops the original order is kept.
+    """
+    accesses = [_LoopAccesses.apply(loop) for loop in loops]
+
+    successors: List[Set[int]] = [set() for _ in loops]
+    in_degree = [0] * len(loops)
+    last_write: Dict[str, int] = {}
+    reads_since_write: Dict[str, List[int]] = {}
+    for index, access in enumerate(accesses):
+        predecessors = {last_write[name] for name in access.fields if name in last_write}
+        for name in access.writes:
+            predecessors.update(reads_since_write.get(name, ()))
+        predecessors.discard(index)
+        for predecessor in predecessors:
+            successors[predecessor].add(index)
+        in_degree[index] = len(predecessors)
+
+        for name in access.reads:
+            reads_since_write.setdefault(name, []).append(index)
+        for name in access.writes:
+            last_write[name] = index
+            reads_since_write[name] = []
+
+    ready = [index for index, degree in enumerate(in_degree) if degree == 0]
+    groups: List[List[nir.HorizontalLoop]] = []
+    group_writes: Set[str] = set()
+    group_offset_reads: Set[str] = set()
+    while ready:
+        selected = None
+        if groups:
+            location_type = groups[-1][0].location_type
+            for index in ready:
+                access = accesses[index]
+                if (
+                    loops[index].location_type == location_type
+                    and access.offset_reads.isdisjoint(group_writes)
+                    and access.writes.isdisjoint(group_offset_reads)
+                ):
+                    selected = index
+                    break
+        if selected is None:
+            selected = ready[0]
+            groups.append([])
+            group_writes = set()
+            group_offset_reads = set()
+
+        ready.remove(selected)
+        groups[-1].append(loops[selected])
+        group_writes |= accesses[selected].writes
+        group_offset_reads |= accesses[selected].offset_reads
+        for successor in successors[selected]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                ready.append(successor)
+        ready.sort()
+
+    return groups
+
+
+def _adjacent_groups(vertical_loops: List[nir.VerticalLoop]) -> List[List[nir.HorizontalLoop]]:
+    """Groups of loops fused by :class:`MergeHorizontalLoops` (only adjacent loops)."""
+    groups = []
+    for vertical_loop in vertical_loops:
+        candidates = {
+            id(candidate[0]): candidate for candidate in _find_merge_candidates(vertical_loop)
+        }
+        merged: Set[int] = set()
+        for loop in vertical_loop.horizontal_loops:
+            if id(loop) in candidates:
+                groups.append(candidates[id(loop)])
+                merged.update(id(candidate_loop) for candidate_loop in candidates[id(loop)])
+            elif id(loop) not in merged:
+                groups.append([loop])
+    return groups
+
+
+class FuseHorizontalLoops(NodeTranslator):
+    """Reorder and fuse the horizontal loops of consecutive vertical loops.
+
+    Independent horizontal loops are reordered (following their dependency DAG)
+    to make loops on the same location type adjacent, so that they can be fused
+    in a single kernel, e.g. for loops A, B, C where A and C have the same
+    location type and B is independent of C, the result is A + C, B.
+
+    In a computation, all the horizontal loops of consecutive stencils with the
+    same loop order are considered together (without vertical offsets the levels
+    are independent, so a loop only depends on the same level of the other loops).
+    The reordered loops are used only if the :class:`FusionCost` is lower than
+    with the fusion of adjacent loops (:class:`MergeHorizontalLoops`), so the
+    result is the same as :class:`MergeHorizontalLoops` if nothing is gained.
+    The input tree is not modified.
+    """
+
+    structural_sharing = True
+
+    @classmethod
+    def apply(cls, root: Node, **kwargs) -> Node:
+        """"""
+        return cls().visit(root, **kwargs)
+
+    @staticmethod
+    def _fuse(
+        vertical_loops: List[nir.VerticalLoop], field_sizes: Dict[str, int]
+    ) -> Optional[nir.VerticalLoop]:
+        """Return a single vertical loop with the fused loops (`None` if it costs more)."""
+        loops = [
+            loop for vertical_loop in vertical_loops for loop in vertical_loop.horizontal_loops
+        ]
+        groups = _schedule_fusion(loops)
+        if fusion_cost(groups, field_sizes) >= fusion_cost(
+            _adjacent_groups(vertical_loops), field_sizes
+        ):
+            return None
+
+        return nir.VerticalLoop(
+            horizontal_loops=[
+                group[0] if len(group) == 1 else _merge_loops(group) for group in groups
+            ],
+            loop_order=vertical_loops[0].loop_order,
+        )
+
+    def visit_VerticalLoop(self, node: nir.VerticalLoop, **kwargs):
+        return self._fuse([node], {}) or MergeHorizontalLoops.apply(node)
+
+    def visit_Computation(self, node: nir.Computation, **kwargs):
+        field_sizes = {
+            field.name: common.DATA_TYPE_SIZES.get(field.vtype, _DEFAULT_DATA_TYPE_SIZE)
+            for field in node.params + (node.declarations or [])
+        }
+
+        def loop_order(stencil: nir.Stencil) -> Hashable:
+            loop_orders = {vertical_loop.loop_order for vertical_loop in stencil.vertical_loops}
+            return loop_orders.pop() if len(loop_orders) == 1 else stencil.id_
+
+        stencils = []
+        for _, run in itertools.groupby(node.stencils, key=loop_order):
+            run = list(run)
+            fused = self._fuse(
+                [vertical_loop for stencil in run for vertical_loop in stencil.vertical_loops],
+                field_sizes,
+            )
+            if fused is None:
+                stencils.extend(MergeHorizontalLoops.apply(stencil) for stencil in run)
+            else:
+                stencils.append(nir.Stencil(vertical_loops=[fused]))
+
+        return node.copy(update={"stencils": stencils})
+
+
+def fuse_horizontal_loops(root: Node) -> Node:
+    return FuseHorizontalLoops.apply(root)
@@ -14,14 +14,12 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import List
-
-import networkx as nx
+from typing import List, Optional
 
 import eve  # noqa: F401
 from eve import Node, NodeTranslator, NodeVisitor
 from gtc.unstructured import nir
-from gtc.unstructured.nir_passes.field_dependency_graph import generate_dependency_graph
+from gtc.unstructured.nir_passes.field_dependency_graph import _FieldWriteDependencyGraph
 
 
 class _FindMergeCandidatesAnalysis(NodeVisitor):
@@ -45,82 +43,108 @@ class _FindMergeCandidatesAnalysis(NodeVisitor):
      - Read after write access
         - if the read is without offset, we can fuse
         - if the read is with offset, we cannot fuse
+
+    The dependency graph of the current candidate is extended with every new loop
+    (instead of being rebuilt), so the search is linear in the number of loops.
     """
 
+    visited_node_types = (nir.HorizontalLoop,)
+
     def __init__(self, **kwargs):
         super().__init__()
         self.candidates = []
         self.candidate = []
+        self.dependencies = _FieldWriteDependencyGraph()
 
     @classmethod
     def find(cls, root, **kwargs) -> List[List[nir.HorizontalLoop]]:
         """Runs the visitor, returns merge candidates."""
         instance = cls()
-        instance.visit(root, **kwargs)
+        if isinstance(root, Node):
+            # Use the node-type index of the tree instead of a full traversal
+            for loop in root.find_all(nir.HorizontalLoop):
+                instance.visit_HorizontalLoop(loop, **kwargs)
+        else:
+            instance.visit(root, **kwargs)
         if len(instance.candidate) > 1:
             instance.candidates.append(instance.candidate)
         return instance.candidates
 
-    def has_read_with_offset_after_write(self, graph: nx.DiGraph, **kwargs):
-        return any(edge["extent"] for _, _, edge in graph.edges(data=True))
-
     def visit_HorizontalLoop(self, node: nir.HorizontalLoop, **kwargs):
-        if len(self.candidate) == 0:
-            self.candidate.append(node)
-            return
-        elif (
-            self.candidate[-1].location_type == node.location_type
+        if (
+            len(self.candidate) > 0 and self.candidate[-1].location_type == node.location_type
         ):  # same location type as previous
-            dependencies = generate_dependency_graph(self.candidate + [node])
-            if not self.has_read_with_offset_after_write(dependencies):
+            # the graph of the current candidate has no reads with offset after write
+            self.dependencies.add_loop(node)
+            if not self.dependencies.has_read_with_offset_after_write:
                 self.candidate.append(node)
                 return
         # cannot merge to previous loop:
         if len(self.candidate) > 1:
             self.candidates.append(self.candidate)  # add a new merge set
         self.candidate = [node]
+        self.dependencies = _FieldWriteDependencyGraph()
+        self.dependencies.add_loop(node)
 
 
 def _find_merge_candidates(root: nir.VerticalLoop):
     return _FindMergeCandidatesAnalysis().find(root)
 
 
+def _merge_loops(candidate: List[nir.HorizontalLoop]) -> nir.HorizontalLoop:
+    """Return a single horizontal loop with the declarations and statements of all the loops."""
+    declarations = []
+    statements = []
+    location_type = candidate[0].location_type
+
+    for loop in candidate:
+        declarations += loop.stmt.declarations
+        statements += loop.stmt.statements
+
+    return nir.HorizontalLoop(
+        stmt=nir.BlockStmt(
+            declarations=declarations, statements=statements, location_type=location_type,
+        ),
+        location_type=location_type,
+    )
+
+
 class MergeHorizontalLoops(NodeTranslator):
-    """"""
+    """Merge the horizontal loops of the visited vertical loops.
+
+    The input tree is not modified: the vertical loops with merged horizontal
+    loops are new nodes and all the other nodes are shared with the input tree.
+    If no merge candidates are provided, they are computed for each vertical loop.
+    """
+
+    structural_sharing = True
 
     @classmethod
-    def apply(cls, root: nir.VerticalLoop, merge_candidates, **kwargs) -> nir.VerticalLoop:
+    def apply(
+        cls, root: Node, merge_candidates: Optional[List[List[nir.HorizontalLoop]]] = None, **kwargs
+    ) -> Node:
         """"""
-        # merge_candidates = _find_merge_candidates(root)
         return cls().visit(root, merge_candidates=merge_candidates)
 
     def visit_VerticalLoop(
-        self, node: nir.VerticalLoop, *, merge_candidates: List[List[nir.HorizontalLoop]], **kwargs
+        self,
+        node: nir.VerticalLoop,
+        *,
+        merge_candidates: Optional[List[List[nir.HorizontalLoop]]],
+        **kwargs,
     ):
-        for candidate in merge_candidates:
-            declarations = []
-            statements = []
-            location_type = candidate[0].location_type
+        if merge_candidates is None:
+            merge_candidates = _find_merge_candidates(node)
+        if not merge_candidates:
+            return node
 
-            first_index = node.horizontal_loops.index(candidate[0])
-            last_index = node.horizontal_loops.index(candidate[-1])
-
-            for loop in candidate:
-                declarations += loop.stmt.declarations
-                statements += loop.stmt.statements
-
-            node.horizontal_loops[first_index : last_index + 1] = [  # noqa: E203
-                nir.HorizontalLoop(
-                    stmt=nir.BlockStmt(
-                        declarations=declarations,
-                        statements=statements,
-                        location_type=location_type,
-                    ),
-                    location_type=location_type,
-                )
-            ]
+        horizontal_loops = list(node.horizontal_loops)
+        for candidate in merge_candidates:
+            first_index = horizontal_loops.index(candidate[0])
+            last_index = horizontal_loops.index(candidate[-1])
+            horizontal_loops[first_index : last_index + 1] = [_merge_loops(candidate)]  # noqa: E203
 
-        return node
+        return node.copy(update={"horizontal_loops": horizontal_loops})
 
 
 def merge_horizontal_loops(
@@ -130,9 +154,4 @@ def merge_horizontal_loops(
 
 
 def find_and_merge_horizontal_loops(root: Node):
-    copy = root.copy(deep=True)
-    vertical_loops = eve.iter_tree(copy).if_isinstance(nir.VerticalLoop).to_list()
-    for loop in vertical_loops:
-        loop = merge_horizontal_loops(loop, _find_merge_candidates(loop))
-
-    return copy
+    return MergeHorizontalLoops().apply(root)
@@ -15,6 +15,8 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+from typing import List, Tuple
+
 from devtools import debug  # noqa: F401
 
 import eve  # noqa: F401
@@ -32,11 +34,45 @@ def location_type_from_dimensions(dimensions):
         raise ValueError("Invalid!")
 
 
+def body_chain(chain: usid.NeighborChain, loop: nir.NeighborLoop) -> usid.NeighborChain:
+    """Chain (starting at the horizontal loop location) of the body location of a neighbor loop."""
+    assert chain.elements[-1] == loop.neighbors.elements[0]
+    return usid.NeighborChain(elements=chain.elements + tuple(loop.neighbors.elements[1:]))
+
+
+class NeighborLoopCollector(eve.NodeVisitor):
+    """Collect all (possibly nested) neighbor loops together with the chain of their outer location.
+
+    The chain starts at the location of the horizontal loop, i.e. for a loop over cells nested in
+    a loop over the edges of a vertex, the outer chain is `(Vertex, Edge)`.
+    """
+
+    visited_node_types = (nir.NeighborLoop,)
+
+    @classmethod
+    def apply(
+        cls, root, chain: usid.NeighborChain
+    ) -> List[Tuple[nir.NeighborLoop, usid.NeighborChain]]:
+        loops: List[Tuple[nir.NeighborLoop, usid.NeighborChain]] = []
+        cls().visit(root, chain=chain, loops=loops)
+        return loops
+
+    def visit_NeighborLoop(self, node: nir.NeighborLoop, *, chain, loops, **kwargs):
+        loops.append((node, chain))
+        self.visit(node.body, chain=body_chain(chain, node), loops=loops, **kwargs)
+
+
 class NirToUsid(eve.NodeTranslator):
     def __init__(self, **kwargs):
         super().__init__()
         self.fields = dict()  # poor man symbol table
 
+    @classmethod
+    def apply(cls, root, **kwargs):
+        # Input nodes have been already validated
+        with eve.trusted_construction():
+            return cls().visit(root, **kwargs)
+
     def convert_dimensions(self, dims: nir.Dimensions):
         dimensions = []
         if dims.horizontal:
@@ -49,7 +85,7 @@ class NirToUsid(eve.NodeTranslator):
         return dimensions
 
     def visit_NeighborChain(self, node: nir.NeighborChain, **kwargs):
-        return usid.NeighborChain(elements=[location for location in node.elements])
+        return usid.NeighborChain(elements=tuple(node.elements))
 
     def visit_VerticalDimension(self, node: nir.VerticalDimension, **kwargs):
         return usid.VerticalDimension()
@@ -75,16 +111,17 @@ class NirToUsid(eve.NodeTranslator):
     def visit_Literal(self, node: nir.Literal, **kwargs):
         return usid.Literal(value=node.value, vtype=node.vtype, location_type=node.location_type)
 
-    def visit_NeighborLoop(self, node: nir.NeighborLoop, **kwargs):
+    def visit_NeighborLoop(self, node: nir.NeighborLoop, *, chain, **kwargs):
+        loop_body_chain = body_chain(chain, node)
         return usid.NeighborLoop(
-            outer_sid=kwargs["sids_tbl"][usid.NeighborChain(elements=[node.location_type])].name,
+            outer_sid=kwargs["sids_tbl"][chain].name,
             connectivity=kwargs["conn_tbl"][node.neighbors].name,
-            sid=kwargs["sids_tbl"][node.neighbors].name
-            if node.neighbors in kwargs["sids_tbl"]
+            sid=kwargs["sids_tbl"][loop_body_chain].name
+            if loop_body_chain in kwargs["sids_tbl"]
             else None,
             location_type=node.location_type,
             body_location_type=node.neighbors.elements[-1],
-            body=self.visit(node.body, **kwargs),
+            body=self.visit(node.body, chain=loop_body_chain, **kwargs),
         )
 
     def visit_FieldAccess(self, node: nir.FieldAccess, **kwargs):
@@ -121,60 +158,37 @@ class NirToUsid(eve.NodeTranslator):
             statements.append(self.visit(stmt, **kwargs))
         return statements
 
-    def visit_HorizontalLoop(self, node: nir.HorizontalLoop, **kwargs):
+    def visit_HorizontalLoop(self, node: nir.HorizontalLoop, *, loop_order=None, **kwargs):
         location_type_str = str(common.LocationType(node.location_type).name).lower()
         primary_connectivity = location_type_str + "_conn"
+        primary_chain = usid.NeighborChain(elements=(node.location_type,))
         connectivities = set()
-        connectivities.add(
-            usid.Connectivity(
-                name=primary_connectivity, chain=usid.NeighborChain(elements=[node.location_type])
+        connectivities.add(usid.Connectivity(name=primary_connectivity, chain=primary_chain))
+
+        # entries of the sid composites by chain of their location (starting at the primary one)
+        sids_entries = {primary_chain: set()}
+        for acc in node.stmt.find_all(nir.FieldAccess):
+            assert acc.primary.elements[0] == node.location_type
+            sids_entries.setdefault(self.visit(acc.primary), set()).add(
+                usid.SidCompositeEntry(name=acc.name)
             )
-        )
 
-        field_accesses = eve.iter_tree(node.stmt).if_isinstance(nir.FieldAccess).to_list()
-
-        other_sids_entries = {}
-        primary_sid_entries = set()
-        for acc in field_accesses:
-            if len(acc.primary.elements) == 1:
-                assert acc.primary.elements[0] == node.location_type
-                primary_sid_entries.add(usid.SidCompositeEntry(name=acc.name))
-            else:
-                assert (
-                    len(acc.primary.elements) == 2
-                )  # TODO cannot deal with more than one level of nesting
-                secondary_loc = acc.primary.elements[
-                    -1
-                ]  # TODO change if we have more than one level of nesting
-                if secondary_loc not in other_sids_entries:
-                    other_sids_entries[secondary_loc] = set()
-                other_sids_entries[secondary_loc].add(usid.SidCompositeEntry(name=acc.name))
-
-        neighloops = eve.iter_tree(node.stmt).if_isinstance(nir.NeighborLoop).to_list()
-        for loop in neighloops:
+        # the neighbor table of a loop lives in the sid composite of its outer location
+        for loop, outer_chain in NeighborLoopCollector.apply(node.stmt, primary_chain):
             transformed_neighbors = self.visit(loop.neighbors, **kwargs)
             connectivity_name = str(transformed_neighbors) + "_conn"
             connectivities.add(
                 usid.Connectivity(name=connectivity_name, chain=transformed_neighbors)
             )
-            primary_sid_entries.add(
+            sids_entries.setdefault(outer_chain, set()).add(
                 usid.SidCompositeNeighborTableEntry(connectivity=connectivity_name)
             )
 
         primary_sid = location_type_str
         sids = []
-        sids.append(
-            usid.SidComposite(
-                name=primary_sid,
-                entries=primary_sid_entries,
-                location=usid.NeighborChain(elements=[node.location_type]),
-            )
-        )
-
-        for k, v in other_sids_entries.items():
-            chain = usid.NeighborChain(elements=[node.location_type, k])
+        for chain, entries in sids_entries.items():
             sids.append(
-                usid.SidComposite(name=str(chain), entries=v, location=chain)
+                usid.SidComposite(name=str(chain), entries=list(entries), location=chain)
             )  # TODO _conn via property
 
         kernel_name = "kernel_" + node.id_
@@ -183,22 +197,25 @@ class NirToUsid(eve.NodeTranslator):
                 node.stmt,
                 sids_tbl={s.location: s for s in sids},
                 conn_tbl={c.chain: c for c in connectivities},
+                chain=primary_chain,
                 **kwargs,
             ),
             name=kernel_name,
             primary_connectivity=primary_connectivity,
             primary_sid=primary_sid,
-            connectivities=connectivities,
+            connectivities=list(connectivities),
             sids=sids,
+            loop_order=loop_order,
         )
         return kernel, usid.KernelCall(name=kernel_name)
 
-    def visit_VerticalLoop(self, node: nir.VerticalLoop, **kwargs):
-        # TODO I am completely ignoring k loops at this point!
+    def visit_VerticalLoop(self, node: nir.VerticalLoop, *, vertical, **kwargs):
+        # Without vertical offsets the levels are independent, so every kernel gets its own k loop
+        loop_order = node.loop_order if vertical else None
         kernels = []
         kernel_calls = []
         for loop in node.horizontal_loops:
-            k, c = self.visit(loop, **kwargs)
+            k, c = self.visit(loop, loop_order=loop_order, **kwargs)
             kernels.append(k)
             kernel_calls.append(c)
         return kernels, kernel_calls
@@ -225,10 +242,15 @@ class NirToUsid(eve.NodeTranslator):
             temporaries.append(converted_tmp)
             self.fields[converted_tmp.name] = converted_tmp
 
+        # k loops are only generated if there are fields with a vertical dimension
+        vertical = any(
+            field.dimensions.vertical for field in node.params + (node.declarations or [])
+        )
+
         kernels = []
         ctrlflow_ast = []
         for s in node.stencils:
-            kernel, kernel_call = self.visit(s)
+            kernel, kernel_call = self.visit(s, vertical=vertical)
             kernels.extend(kernel)
             ctrlflow_ast.extend(kernel_call)
 
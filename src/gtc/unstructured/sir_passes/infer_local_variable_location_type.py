@@ -63,6 +63,15 @@ class _LocationTypeAnalysis(NodeVisitor):
     - Variables recursively (by building a dependency tree)
     """
 
+    visited_node_types = (
+        sir.Stencil,
+        sir.FieldAccessExpr,
+        sir.VarAccessExpr,
+        sir.VarDeclStmt,
+        sir.ReductionOverNeighborExpr,
+        sir.AssignmentExpr,
+    )
+
     def __init__(self, **kwargs):
         super().__init__()
         self.inferred_location = {}
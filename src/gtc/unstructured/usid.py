@@ -17,7 +17,6 @@
 
 from typing import List, Optional, Tuple, Union
 
-from devtools import debug  # noqa: F401
 from pydantic import validator
 
 import eve
@@ -36,7 +35,7 @@ class Stmt(Node):
 class NeighborChain(Node):
     elements: Tuple[common.LocationType, ...]
 
-    class Config(eve.concepts.FrozenModelConfig):
+    class Config(eve.concepts.InternedNodeConfig):
         pass
 
     # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
@@ -95,7 +94,7 @@ class Connectivity(Node):
     def neighbor_tbl_tag(self):
         return self.name + "_neighbor_tbl_tag"
 
-    class Config(eve.concepts.FrozenModelConfig):
+    class Config(eve.concepts.InternedNodeConfig):
         pass
 
     # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
@@ -113,7 +112,7 @@ class SidCompositeEntry(Node):
     def tag_name(self):
         return self.name + "_tag"
 
-    class Config(eve.concepts.FrozenModelConfig):
+    class Config(eve.concepts.InternedNodeConfig):
         pass
 
     # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
@@ -134,7 +133,7 @@ class SidCompositeNeighborTableEntry(Node):
     def tag_name(self):
         return self.connectivity_deref_.neighbor_tbl_tag
 
-    class Config(eve.concepts.FrozenModelConfig):
+    class Config(eve.concepts.InternedNodeConfig):
         pass
 
     # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
@@ -206,6 +205,7 @@ class Kernel(Node):
     primary_connectivity: Str  # symbol ref to the above
     primary_sid: Str  # symbol ref to the above
     ast: List[Stmt]
+    loop_order: Optional[common.LoopOrder]  # of the vertical loop (None if there is no k loop)
 
     # private symbol table
     @property
@@ -228,7 +228,8 @@ class UField(Node):
 
 
 class Temporary(UField):
-    pass
+    # name of the temporary whose storage is reused (None if it has its own storage)
+    storage: Optional[Str] = None
 
 
 class Computation(Node):
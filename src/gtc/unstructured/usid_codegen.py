@@ -17,8 +17,6 @@
 from types import MappingProxyType
 from typing import ClassVar, Mapping
 
-from devtools import debug  # noqa: F401
-
 from eve import NodeTranslator, codegen
 from eve.codegen import FormatTemplate as as_fmt
 from eve.codegen import MakoTemplate as as_mako
@@ -28,8 +26,10 @@ from gtc.unstructured.usid import (
     Connectivity,
     Kernel,
     KernelCall,
+    NeighborLoop,
     SidCompositeNeighborTableEntry,
     Temporary,
+    VerticalDimension,
 )
 
 
@@ -38,6 +38,8 @@ class SymbolTblHelper(NodeTranslator):
     # - temporary helper which resolves symbol refs with the symbol it's pointing to
     # - the code generator relies on the possibility to look up a symbol ref outside of a visitor
 
+    structural_sharing = True
+
     def visit_SidCompositeNeighborTableEntry(self, node: SidCompositeNeighborTableEntry, **kwargs):
         connectivity_deref = kwargs["symbol_tbl_conn"][node.connectivity]
         return SidCompositeNeighborTableEntry(
@@ -80,6 +82,38 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         }
     )
 
+    LOOP_ORDER_TO_K_LOOP: ClassVar[Mapping[common.LoopOrder, str]] = MappingProxyType(
+        {
+            common.LoopOrder.FORWARD: "for (int k = 0; k < k_size; ++k)",
+            common.LoopOrder.BACKWARD: "for (int k = k_size - 1; k >= 0; --k)",
+        }
+    )
+
+    # Statements and expressions are rendered only once for every different
+    # (structurally equal) node and symbol table. All the memoized templates
+    # only depend on node data and class constants of the generator.
+    memoized_templates = MappingProxyType(
+        {
+            "NeighborChain": (),
+            "Connectivity": (),
+            "SidCompositeEntry": (),
+            "SidCompositeNeighborTableEntry": (),
+            "SidComposite": (),
+            "Literal": (),
+            "VarAccess": (),
+            "FieldAccess": ("symbol_tbl_sids",),
+            "BinaryOp": ("symbol_tbl_sids",),
+            "AssignStmt": ("symbol_tbl_sids",),
+            "VarDecl": ("symbol_tbl_sids",),
+            "NeighborLoop": (
+                "symbol_tbl_sids",
+                "symbol_tbl_conn",
+                "neighbor_loop_depth",
+                "vertical",
+            ),
+        }
+    )
+
     @classmethod
     def apply(cls, root, **kwargs) -> str:
         symbol_tbl_resolved = SymbolTblHelper().visit(root)
@@ -134,6 +168,8 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
 
         # TODO I don't like that I render here and that I somehow have the same pattern for the parameters
         args = [c.name for c in kernel.connectivities]
+        if kernel.loop_order is not None:
+            args.append("k_size")
         args += [
             "gridtools::sid::get_origin({0}), gridtools::sid::get_strides({0})".format(s.field_name)
             for s in kernel.sids
@@ -154,6 +190,8 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         symbol_tbl_sids = {s.name: s for s in node.sids}
 
         parameters = [c.name for c in node.connectivities]
+        if node.loop_order is not None:
+            parameters.append("k_size")
         for s in node.sids:
             if len(s.entries) > 0:
                 parameters.append(s.origin_name)
@@ -178,20 +216,30 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
 
     BinaryOp = as_fmt("({left} {op} {right})")
 
+    def visit_NeighborLoop(self, node: NeighborLoop, *, neighbor_loop_depth=0, **kwargs):
+        # the depth counts this loop, nested loops in the body see a larger depth
+        return self.generic_visit(node, neighbor_loop_depth=neighbor_loop_depth + 1, **kwargs)
+
     NeighborLoop = as_mako(
         """<%
             outer_sid_deref = symbol_tbl_sids[_this_node.outer_sid]
             sid_deref = symbol_tbl_sids[_this_node.sid] if _this_node.sid else None
             conn_deref = symbol_tbl_conn[_this_node.connectivity]
             body_location = _this_generator.LOCATION_TYPE_TO_STR[sid_deref.location.elements[-1]] if sid_deref else None
+            suffix = "_" + str(neighbor_loop_depth - 1) if neighbor_loop_depth > 1 else ""
+            neigh = "neigh" + suffix
+            absolute_neigh_index = "absolute_neigh_index" + suffix
         %>
-        for (int neigh = 0; neigh < gridtools::next::connectivity::max_neighbors(${ conn_deref.name }); ++neigh) {
-            auto absolute_neigh_index = *gridtools::host_device::at_key<${ conn_deref.neighbor_tbl_tag }>(${ outer_sid_deref.ptr_name});
-            if (absolute_neigh_index != gridtools::next::connectivity::skip_value(${ conn_deref.name })) {
+        for (int ${ neigh } = 0; ${ neigh } < gridtools::next::connectivity::max_neighbors(${ conn_deref.name }); ++${ neigh }) {
+            auto ${ absolute_neigh_index } = *gridtools::host_device::at_key<${ conn_deref.neighbor_tbl_tag }>(${ outer_sid_deref.ptr_name});
+            if (${ absolute_neigh_index } != gridtools::next::connectivity::skip_value(${ conn_deref.name })) {
                 % if sid_deref:
                     auto ${ sid_deref.ptr_name } = ${ sid_deref.origin_name }();
                     gridtools::sid::shift(
-                        ${ sid_deref.ptr_name }, gridtools::host_device::at_key<${ body_location }>(${ sid_deref.strides_name }), absolute_neigh_index);
+                        ${ sid_deref.ptr_name }, gridtools::host_device::at_key<${ body_location }>(${ sid_deref.strides_name }), ${ absolute_neigh_index });
+                    % if vertical:
+                    gridtools::sid::shift(${ sid_deref.ptr_name }, gridtools::sid::get_stride<dim::k>(${ sid_deref.strides_name }), k);
+                    % endif
                 % endif
 
                 // bodyparameters
@@ -229,6 +277,7 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         return self.generic_visit(
             node,
             computation_fields=node.parameters + node.temporaries,
+            vertical=any(k.loop_order is not None for k in node.kernels),
             # cache_allocator=cache_allocator_,
             sid_tags=sid_tags,
             symbol_tbl_kernel=symbol_tbl_kernel,
@@ -246,7 +295,7 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         }
 
         template<class mesh_t, ${ ','.join('class ' + p.name + '_t' for p in _this_node.parameters) }>
-        void ${ name }(mesh_t&& mesh, ${ ','.join(p.name + '_t&& ' + p.name for p in _this_node.parameters) }){
+        void ${ name }(mesh_t&& mesh, ${ 'int k_size, ' if vertical else '' }${ ','.join(p.name + '_t&& ' + p.name for p in _this_node.parameters) }){
             namespace tu = gridtools::tuple_util;
             using namespace ${ name }_impl_;
 
@@ -263,12 +312,19 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
     def visit_Temporary(self, node: Temporary, **kwargs):
         c_vtype = self.DATA_TYPE_TO_STR[node.vtype]
         loctype = self.LOCATION_TYPE_TO_STR[self.location_type_from_dimensions(node.dimensions)]
-        return self.generic_visit(node, loctype=loctype, c_vtype=c_vtype, **kwargs)
+        k_size = (
+            "k_size" if any(isinstance(dim, VerticalDimension) for dim in node.dimensions) else "1"
+        )
+        return self.generic_visit(node, loctype=loctype, c_vtype=c_vtype, k_size=k_size, **kwargs)
 
     Temporary = as_mako(
         """
+        % if _this_node.storage:
+        auto& ${ name } = ${ _this_node.storage };\\
+        % else:
         auto ${ name } = gridtools::next::make_simple_tmp_storage<${ loctype }, ${ c_vtype }>(
-            (int)gridtools::next::connectivity::size(gridtools::next::mesh::connectivity<std::tuple<${ loctype }>>(mesh)), 1 /* TODO ksize */, tmp_alloc);"""
+            (int)gridtools::next::connectivity::size(gridtools::next::mesh::connectivity<std::tuple<${ loctype }>>(mesh)), ${ k_size }, tmp_alloc);\\
+        % endif"""
     )
 
 
@@ -316,13 +372,22 @@ class UsidGpuCodeGenerator(UsidCodeGenerator):
             auto idx = blockIdx.x * blockDim.x + threadIdx.x;
             if (idx >= gridtools::next::connectivity::size(${ prim_conn.name }))
                 return;
+            % if vertical:
+            ${ _this_generator.LOOP_ORDER_TO_K_LOOP[_this_node.loop_order] } {
+            % endif
             % if len(prim_sid.entries) > 0:
             auto ${ prim_sid.ptr_name } = ${ prim_sid.origin_name }();
             gridtools::sid::shift(${ prim_sid.ptr_name }, gridtools::host_device::at_key<
                 ${ _this_generator.LOCATION_TYPE_TO_STR[prim_sid.location.elements[-1]] }
                 >(${ prim_sid.strides_name }), idx);
+            % if vertical:
+            gridtools::sid::shift(${ prim_sid.ptr_name }, gridtools::sid::get_stride<dim::k>(${ prim_sid.strides_name }), k);
+            % endif
             % endif
             ${ "".join(ast) }
+            % if vertical:
+            }
+            % endif
         }
         """
     )
@@ -352,13 +417,22 @@ class UsidNaiveCodeGenerator(UsidCodeGenerator):
         template<${ ','.join("class {}_t".format(p) for p in parameters)}>
         void ${ name }( ${','.join("{0}_t {0}".format(p) for p in parameters) }) {
             for(std::size_t idx = 0; idx < gridtools::next::connectivity::size(${ prim_conn.name }); idx++) {
+                % if vertical:
+                ${ _this_generator.LOOP_ORDER_TO_K_LOOP[_this_node.loop_order] } {
+                % endif
                 % if len(prim_sid.entries) > 0:
                 auto ${ prim_sid.ptr_name } = ${ prim_sid.origin_name }();
                 gridtools::sid::shift(${ prim_sid.ptr_name }, gridtools::host_device::at_key<
                     ${ _this_generator.LOCATION_TYPE_TO_STR[prim_sid.location.elements[-1]] }
                     >(${ prim_sid.strides_name }), idx);
+                % if vertical:
+                gridtools::sid::shift(${ prim_sid.ptr_name }, gridtools::sid::get_stride<dim::k>(${ prim_sid.strides_name }), k);
+                % endif
                 % endif
                 ${ "".join(ast) }
+                % if vertical:
+                }
+                % endif
             }
         }
         """
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Dict, Hashable, List, Mapping, NamedTuple, Optional
+
+import eve  # noqa: F401
+from eve import NodeTranslator
+from gtc import common
+from gtc.unstructured import usid
+
+
+class Lifetime(NamedTuple):
+    """Indices of the first and last kernel calls accessing a temporary."""
+
+    first: int
+    last: int
+
+
+class TemporaryMemory(NamedTuple):
+    """Memory (in bytes) allocated for the temporaries of a computation."""
+
+    #: With one storage for every temporary
+    unshared: int
+    #: With the storages shared between temporaries
+    shared: int
+
+
+def temporary_lifetimes(computation: usid.Computation) -> Dict[str, Lifetime]:
+    """Return the lifetime of the temporaries accessed by the kernel calls of the computation."""
+    temporaries = {temporary.name for temporary in computation.temporaries}
+    kernel_fields = {
+        kernel.name: {
+            entry.name
+            for sid in kernel.sids
+            for entry in sid.entries
+            if isinstance(entry, usid.SidCompositeEntry)
+        }
+        for kernel in computation.kernels
+    }
+
+    lifetimes: Dict[str, Lifetime] = {}
+    for index, kernel_call in enumerate(computation.ctrlflow_ast):
+        for name in kernel_fields[kernel_call.name] & temporaries:
+            first = lifetimes[name].first if name in lifetimes else index
+            lifetimes[name] = Lifetime(first, index)
+
+    return lifetimes
+
+
+def _location_type(temporary: usid.Temporary) -> common.LocationType:
+    (location_type,) = [dim for dim in temporary.dimensions if isinstance(dim, common.LocationType)]
+    return location_type
+
+
+def _is_vertical(temporary: usid.Temporary) -> bool:
+    return any(isinstance(dim, usid.VerticalDimension) for dim in temporary.dimensions)
+
+
+def _storage_key(temporary: usid.Temporary) -> Hashable:
+    # temporaries with the same key have storages of the same size and type
+    return (_location_type(temporary), temporary.vtype, _is_vertical(temporary))
+
+
+def assign_storages(computation: usid.Computation) -> Dict[str, Optional[str]]:
+    """Return the name of the temporary whose storage is reused by every temporary.
+
+    Compatible temporaries (same location type, data type and vertical dimension)
+    with disjoint lifetimes share a storage. The storages are assigned greedily
+    to the temporaries in order of the start of their lifetimes, which uses the
+    minimum number of storages (interval graph colouring). Temporaries which are
+    never accessed are not shared.
+    """
+    lifetimes = temporary_lifetimes(computation)
+    temporaries = sorted(
+        (temporary for temporary in computation.temporaries if temporary.name in lifetimes),
+        key=lambda temporary: lifetimes[temporary.name].first,
+    )
+
+    storages: Dict[str, Optional[str]] = {
+        temporary.name: None for temporary in computation.temporaries
+    }
+    # last kernel call accessing every storage (by the name of its first temporary)
+    storage_ends: Dict[Hashable, Dict[str, int]] = {}
+    for temporary in temporaries:
+        lifetime = lifetimes[temporary.name]
+        ends = storage_ends.setdefault(_storage_key(temporary), {})
+        storage = next((name for name, end in ends.items() if end < lifetime.first), None)
+        if storage is None:
+            storage = temporary.name
+        else:
+            storages[temporary.name] = storage
+        ends[storage] = lifetime.last
+
+    return storages
+
+
+def temporary_memory(
+    computation: usid.Computation,
+    location_sizes: Mapping[common.LocationType, int],
+    k_size: int = 1,
+) -> TemporaryMemory:
+    """Return the bytes allocated for the temporaries on a mesh with the given sizes.
+
+    All the storages are allocated at the beginning of the computation, so this
+    is also the peak of the memory used by the temporaries.
+    """
+
+    def storage_size(temporary: usid.Temporary) -> int:
+        return (
+            location_sizes[_location_type(temporary)]
+            * (k_size if _is_vertical(temporary) else 1)
+            * common.DATA_TYPE_SIZES[temporary.vtype]
+        )
+
+    storages = assign_storages(computation)
+    return TemporaryMemory(
+        unshared=sum(storage_size(temporary) for temporary in computation.temporaries),
+        shared=sum(
+            storage_size(temporary)
+            for temporary in computation.temporaries
+            if storages[temporary.name] is None
+        ),
+    )
+
+
+class ShareTemporaryStorage(NodeTranslator):
+    """Reuse the storages of temporaries with disjoint lifetimes (see :func:`assign_storages`).
+
+    The temporaries reusing a storage are moved after the temporaries with
+    their own storage, so that they are declared after the storage they reuse.
+    The input tree is not modified.
+    """
+
+    structural_sharing = True
+
+    @classmethod
+    def apply(cls, root: usid.Computation, **kwargs) -> usid.Computation:
+        """"""
+        return cls().visit(root, **kwargs)
+
+    def visit_Computation(self, node: usid.Computation, **kwargs):
+        storages = assign_storages(node)
+        if all(storage is None for storage in storages.values()):
+            return node
+
+        allocated: List[usid.Temporary] = []
+        shared: List[usid.Temporary] = []
+        for temporary in node.temporaries:
+            if storages[temporary.name] is None:
+                allocated.append(temporary)
+            else:
+                shared.append(temporary.copy(update={"storage": storages[temporary.name]}))
+
+        return node.copy(update={"temporaries": allocated + shared})
+
+
+def share_temporary_storage(root: usid.Computation) -> usid.Computation:
+    return ShareTemporaryStorage.apply(root)
@@ -17,4 +17,8 @@
 """Version specification."""
 
 # TODO: separate versioning info from eve
-from eve import __version__, __versioninfo__  # noqa
+import eve.version
+from eve import __version__  # noqa
+
+
+__getattr__ = eve.version.versioninfo_getattr(__name__)
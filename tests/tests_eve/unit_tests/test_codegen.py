@@ -14,13 +14,14 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import Callable, Optional, Set, Type
+from typing import Callable, List, Optional, Set, Type
 
 import pytest
 
 import eve
 import eve.codegen
 
+from .. import definitions
 from .test_utils import name_with_cases  # noqa: F401
 
 
@@ -87,6 +88,8 @@ def test_template_definition(template_maker):
         if t is None:
             # Some template engines do not check templates at definition
             raise eve.codegen.TemplateDefinitionError
+        # Template strings are compiled lazily
+        t.compile()
 
 
 def test_template_rendering(template_maker):
@@ -100,6 +103,76 @@ def test_template_rendering(template_maker):
         template.render()
 
 
+@pytest.mark.parametrize("template_maker", [jinja_tpl_maker, mako_tpl_maker])
+def test_template_disk_cache(template_maker, tmp_path, monkeypatch):
+    monkeypatch.setenv("EVE_TEMPLATE_CACHE_DIR", str(tmp_path))
+    skeleton = "aaa {s} bbbb {i} cccc " + tmp_path.name
+    data = {"s": "STRING", "i": 1}
+
+    template = template_maker(skeleton, data.keys())
+    assert not any(tmp_path.iterdir())
+    assert template.render(**data).startswith("aaa STRING bbbb 1 cccc")
+    cached_files = set(tmp_path.iterdir())
+    assert cached_files
+
+    # A new template with the same source reuses the cached files
+    assert template_maker(skeleton, data.keys()).render(**data).startswith("aaa STRING")
+    assert set(tmp_path.iterdir()) == cached_files
+
+    # The disk cache is disabled by default
+    monkeypatch.delenv("EVE_TEMPLATE_CACHE_DIR")
+    other_template = template_maker(skeleton + " dddd", data.keys())
+    assert other_template.render(**data).endswith(" dddd")
+    assert set(tmp_path.iterdir()) == cached_files
+
+    monkeypatch.setenv("EVE_TEMPLATE_CACHE_DIR", "")
+    other_template = template_maker(skeleton + " eeee", data.keys())
+    assert other_template.render(**data).endswith(" eeee")
+    assert set(tmp_path.iterdir()) == cached_files
+
+
+# -- Formatting tests --
+@pytest.mark.skipif("cpp" not in eve.codegen.SOURCE_FORMATTERS, reason="clang-format not available")
+def test_format_cpp_sources():
+    sources = [f"int  f{i}( ) {{ return {i} ; }}" for i in range(3)]
+    expected = [f"int f{i}() {{ return {i}; }}" for i in range(3)]
+
+    formatted = eve.codegen.format_sources("cpp", sources + sources[:1], style="LLVM")
+    assert [s.strip() for s in formatted] == expected + expected[:1]
+    assert [
+        eve.codegen.format_source("cpp", source, style="LLVM").strip() for source in sources
+    ] == expected
+
+    # Formatted sources are cached
+    key = eve.codegen._cpp_format_cache_key(sources[0], ("clang-format", "--style=LLVM"))
+    assert eve.codegen._cpp_format_cache[key] == formatted[0]
+
+
+@pytest.mark.skipif("cpp" not in eve.codegen.SOURCE_FORMATTERS, reason="clang-format not available")
+def test_source_formatting():
+    source = "int  a ;"
+    with eve.codegen.source_formatting(False):
+        assert eve.codegen.format_source("cpp", source) == source
+        assert eve.codegen.format_sources("cpp", [source]) == [source]
+
+    assert eve.codegen.format_source("cpp", source).strip() == "int a;"
+    assert [s.strip() for s in eve.codegen.format_sources("cpp", [source])] == ["int a;"]
+
+
+@pytest.mark.skipif("cpp" not in eve.codegen.SOURCE_FORMATTERS, reason="clang-format not available")
+def test_format_cpp_sources_style_file(tmp_path, monkeypatch):
+    (tmp_path / ".clang-format").write_text("BasedOnStyle: LLVM\nIndentWidth: 8\n")
+    monkeypatch.chdir(tmp_path)
+    source = "int f() { int a = 1; return a; }"
+    expected = "int f() {\n        int a = 1;\n        return a;\n}"
+
+    # The style file is looked up from the current directory in both cases
+    eve.codegen._cpp_format_cache.clear()
+    assert eve.codegen.format_source("cpp", source).strip() == expected
+    eve.codegen._cpp_format_cache.clear()
+    assert [s.strip() for s in eve.codegen.format_sources("cpp", [source])] == [expected]
+
+
 # -- TemplatedGenerator tests --
 class _BaseTestGenerator(eve.codegen.TemplatedGenerator):
     KEYWORDS = ("BASE", "ONE")
@@ -221,3 +294,76 @@ def test_templated_generator(templated_generator, fixed_compound_node):
 def test_templated_generator_exceptions(faulty_templated_generator, fixed_compound_node):
     with pytest.raises(eve.codegen.TemplateRenderingError, match="when rendering node"):
         faulty_templated_generator.apply(fixed_compound_node)
+
+
+def test_templated_generator_template_cache(templated_generator, fixed_compound_node):
+    templated_generator.apply(fixed_compound_node)
+    cache = templated_generator.__templates_cache__
+    template, key = cache[type(fixed_compound_node)]
+
+    assert key == "CompoundNode"
+    assert template is templated_generator.__templates__["CompoundNode"]
+    assert cache[type(fixed_compound_node.simple_opt)] == (None, None)
+
+
+class _MemoizedTestGenerator(eve.codegen.TemplatedGenerator):
+    memoized_templates = {"SimpleNodeWithOptionals": ("suffix",), "OptionalsList": ("suffix",)}
+    render_cache_size = 2
+
+    SimpleNodeWithOptionals = eve.codegen.FormatTemplate("{int_value}-{str_value}{suffix}")
+    OptionalsList = eve.codegen.JinjaTemplate("[{{ items|join(', ') }}]")
+
+
+class OptionalsList(eve.Node):
+    items: List[definitions.SimpleNodeWithOptionals]
+
+
+def test_templated_generator_render_cache():
+    generator = _MemoizedTestGenerator
+    generator.clear_render_cache()
+
+    def render(int_value, suffix=""):
+        node = definitions.SimpleNodeWithOptionals(int_value=int_value, str_value="a")
+        return generator.apply(node, suffix=suffix)
+
+    assert render(1) == "1-a"
+    assert render(1) == "1-a"
+    assert (generator.render_cache_stats.hits, generator.render_cache_stats.misses) == (1, 1)
+
+    # Relevant kwargs are part of the key
+    assert render(1, suffix="!") == "1-a!"
+    assert generator.render_cache_stats.misses == 2
+
+    # Least recently used entries are evicted
+    assert render(2) == "2-a"
+    assert generator.render_cache_stats.evictions == 1
+    assert render(1, suffix="!") == "1-a!"
+    assert generator.render_cache_stats.hits == 2
+    assert render(1) == "1-a"
+    assert generator.render_cache_stats.misses == 4
+
+    # Unhashable kwargs skip the cache
+    assert render(1, suffix=bytearray(b"?")) == "1-abytearray(b'?')"
+    assert generator.render_cache_stats.misses == 5
+    assert generator.render_cache_stats.evictions == 2
+
+    generator.clear_render_cache()
+    assert generator.render_cache_stats.hits == generator.render_cache_stats.misses == 0
+
+
+def test_templated_generator_render_cache_after_mutation():
+    generator = _MemoizedTestGenerator
+    generator.clear_render_cache()
+
+    node = OptionalsList(
+        items=[definitions.SimpleNodeWithOptionals(int_value=i, str_value="a") for i in range(2)]
+    )
+    assert generator.apply(node, suffix="") == "[0-a, 1-a]"
+
+    # Modified descendants invalidate the memoized rendering of the ancestors
+    node.items[1].int_value = 5
+    assert generator.apply(node, suffix="") == "[0-a, 5-a]"
+
+    node.items.append(definitions.SimpleNodeWithOptionals(int_value=7, str_value="b"))
+    eve.invalidate_node_indices()
+    assert generator.apply(node, suffix="") == "[0-a, 5-a, 7-b]"
@@ -15,9 +15,19 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+import gc
+import os
+import pickle
+import subprocess
+import sys
+import weakref
+from typing import Any, Dict, List, Tuple, Union
+
 import pydantic
 import pytest
 
+import eve
+
 from .. import definitions
 
 
@@ -51,6 +61,26 @@ class TestNode:
         with pytest.raises(pydantic.ValidationError, match="id_"):
             definitions.LocationNode(id_=32, loc=source_location)
 
+    def test_lazy_id(self, sample_node_maker):
+        node = sample_node_maker()
+        int_id = node.__dict__["id_"]
+        assert isinstance(int_id, int)
+        assert node.id_ == f"{node.__class__.__qualname__}_{int_id}"
+        assert node.__dict__["id_"] == node.id_
+
+        other_node = sample_node_maker()
+        copied_node = other_node.copy()
+        assert copied_node == other_node
+        assert repr(copied_node) == repr(other_node)
+        assert copied_node.dict()["id_"] == other_node.id_
+
+    def test_id_scope(self, sample_node_maker):
+        with eve.node_id_scope():
+            ids = [sample_node_maker().id_ for _ in range(3)]
+        with eve.node_id_scope():
+            assert [sample_node_maker().id_ for _ in range(3)] == ids
+        assert sample_node_maker().id_ not in ids
+
     def test_impl_fields(self, sample_node):
         impl_names = set(name for name, _ in sample_node.iter_impl_fields())
 
@@ -99,3 +129,334 @@ class TestNode:
             and isinstance(metadata["definition"], pydantic.fields.ModelField)
             for metadata in sample_node.__node_children__.values()
         )
+
+    def test_precomputed_accessors(self, sample_node):
+        field_names = list(sample_node.__fields__.keys())
+        children_names = [name for name in field_names if not name.endswith("_")]
+        impl_names = [
+            name for name in field_names if name.endswith("_") and not name.endswith("__")
+        ]
+
+        assert sample_node.__node_children_names__ == tuple(children_names)
+        assert sample_node.__node_impl_field_names__ == tuple(impl_names)
+        assert [name for name, _ in sample_node.iter_children()] == children_names
+        assert [name for name, _ in sample_node.iter_impl_fields()] == impl_names
+        assert all(
+            value is getattr(sample_node, name) for name, value in sample_node.iter_children()
+        )
+
+
+class _Tree(eve.Node):
+    children: List[Union[int, "_Tree"]]
+
+
+_Tree.update_forward_refs()
+
+
+class TestContentHash:
+    def test_structural_equality(self, sample_node):
+        copied_node = sample_node.copy(deep=True)
+        copied_node.id_ = "other_id"
+        assert copied_node.content_hash() == sample_node.content_hash()
+
+        node = definitions.make_compound_node()
+        other_node = definitions.CompoundNode(**dict(node.iter_children()))
+        assert other_node.id_ != node.id_
+        assert other_node.content_hash() == node.content_hash()
+
+        other_node.simple = definitions.make_simple_node()
+        assert other_node.content_hash() != node.content_hash()
+
+    def test_cache(self):
+        node = definitions.make_compound_node()
+        content_hash = node.content_hash()
+        assert node.__node_hash__ == content_hash
+        assert node.simple.__node_hash__ is not None
+        assert "__node_hash__" not in node.dict()
+
+        node.simple.int_value += 1
+        assert node.simple.__node_hash__ is None
+        assert node.content_hash() != content_hash
+
+    def test_ancestors_invalidation(self):
+        node = definitions.make_node_with_symbol_table()
+        grandchild = node.compound_with_name.simple
+        content_hash = node.content_hash()
+
+        grandchild.int_value += 1
+        assert node.content_hash() != content_hash
+
+        grandchild_hash = grandchild.content_hash()
+        new_content_hash = node.content_hash()
+        node.list_with_name.append(definitions.make_simple_node_with_symbol_name())
+        eve.invalidate_node_indices()
+        assert node.content_hash() != new_content_hash
+        assert grandchild.content_hash() == grandchild_hash
+
+    def test_mutator_invalidation(self):
+        node = definitions.make_node_with_symbol_table()
+        content_hash = node.content_hash()
+
+        class RemoveFromLists(eve.NodeMutator):
+            def visit_list(self, node):
+                return []
+
+        RemoveFromLists().visit(node)
+        assert node.content_hash() != content_hash
+
+    def test_stability(self):
+        node = definitions.make_compound_node()
+        script = (
+            "import pickle, sys; from tests_eve import definitions;"
+            "print(pickle.loads(sys.stdin.buffer.read()).content_hash())"
+        )
+        for seed in ("0", "1"):
+            output = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=os.path.dirname(os.path.dirname(definitions.__file__)),
+                env={**os.environ, "PYTHONHASHSEED": seed},
+                input=pickle.dumps(node),
+                capture_output=True,
+                check=True,
+            ).stdout.decode()
+            assert output.strip() == node.content_hash()
+
+    def test_deep_tree(self):
+        tree = _Tree(children=[0])
+        for i in range(1, 3 * sys.getrecursionlimit()):
+            tree = _Tree(children=[i, tree])
+        content_hash = tree.content_hash()
+
+        tree.children[1].children[0] = -1
+        eve.invalidate_node_indices()
+        assert tree.content_hash() != content_hash
+
+
+class _InternedLeaf(eve.FrozenNode):
+    name: str
+    values: Tuple[int, ...] = ()
+
+    class Config(eve.InternedNodeConfig):
+        pass
+
+
+class _InternedPair(eve.FrozenNode):
+    first: _InternedLeaf
+    second: _InternedLeaf
+
+    class Config(eve.InternedNodeConfig):
+        pass
+
+
+class TestInterning:
+    @pytest.fixture(autouse=True)
+    def enabled_interning(self):
+        with eve.node_interning():
+            yield
+
+    def test_canonical_instances(self):
+        leaf = _InternedLeaf(name="a", values=(1, 2))
+        assert _InternedLeaf(name="a", values=[1, 2]) is leaf
+        assert _InternedLeaf.construct_trusted(name="a", values=(1, 2)) is leaf
+        assert _InternedLeaf(name="a", values=(1, 2), id_="other_id") is leaf
+        assert _InternedLeaf(name="a", values=(1, 3)) is not leaf
+        assert _InternedLeaf(name="b", values=(1, 2)) is not leaf
+
+        pair = _InternedPair(first=leaf, second=_InternedLeaf(name="b"))
+        other_pair = _InternedPair(
+            first=_InternedLeaf(name="a", values=(1, 2)), second=_InternedLeaf(name="b")
+        )
+        assert other_pair is pair
+        assert pair == other_pair
+
+    def test_disabled(self):
+        leaf = _InternedLeaf(name="c")
+        with eve.node_interning(False):
+            other_leaf = _InternedLeaf(name="c")
+        assert other_leaf is not leaf
+        assert other_leaf.content_hash() == leaf.content_hash()
+        assert _InternedLeaf(name="c") is leaf
+
+        assert definitions.make_frozen_simple_node() is not definitions.make_frozen_simple_node()
+
+    def test_weak_references(self):
+        leaf = _InternedLeaf(name="d")
+        leaf_id = leaf.id_
+        del leaf
+        gc.collect()
+        assert _InternedLeaf(name="d").id_ != leaf_id
+
+    def test_weak_referenceable_nodes(self):
+        # pydantic >= 1.7 adds `__slots__` to the model classes, so nodes can only
+        # be weakly referenced (and interned) if `__weakref__` is in the slots
+        for node in (
+            _InternedLeaf(name="e"),
+            definitions.make_frozen_simple_node(),
+            definitions.make_simple_node(),
+        ):
+            assert weakref.ref(node)() is node, f"pydantic {pydantic.VERSION}"
+
+    def test_mutable_config(self):
+        with pytest.raises(TypeError, match="immutable"):
+
+            class InternedMutableNode(eve.Node):
+                class Config:
+                    intern_nodes = True
+
+
+def test_interning_disabled_by_default():
+    leaf = _InternedLeaf(name="f")
+    assert _InternedLeaf(name="f") is not leaf
+    with eve.node_interning():
+        canonical_leaf = _InternedLeaf(name="f")
+        assert _InternedLeaf(name="f") is canonical_leaf
+
+
+class TestReachability:
+    def test_reaching_children_names(self):
+        reaching_children_names = eve.concepts.reaching_children_names
+        assert reaching_children_names(definitions.CompoundNode, (definitions.LocationNode,)) == (
+            "location",
+        )
+        assert reaching_children_names(definitions.CompoundNode, (definitions.EmptyNode,)) == ()
+        assert reaching_children_names(
+            definitions.NodeWithSymbolTable, (definitions.SimpleNode,)
+        ) == ("compound_with_name",)
+        assert reaching_children_names(
+            definitions.NodeWithSymbolTable, (definitions.SimpleNodeWithSymbolName,)
+        ) == ("node_with_name", "list_with_name", "compound_with_name")
+        assert eve.concepts.can_reach(definitions.LocationNode, (definitions.LocationNode,))
+        assert not eve.concepts.can_reach(definitions.SimpleNode, (definitions.LocationNode,))
+
+    def test_subclasses(self):
+        reaching_children_names = eve.concepts.reaching_children_names
+        assert reaching_children_names(_Tree, (definitions.LocationNode,)) == ()
+
+        class TreeWithLocation(_Tree):
+            location: definitions.LocationNode
+
+        # Any `_Tree` in the children can now contain a `LocationNode`
+        assert reaching_children_names(_Tree, (definitions.LocationNode,)) == ("children",)
+        assert reaching_children_names(TreeWithLocation, (definitions.LocationNode,)) == (
+            "children",
+            "location",
+        )
+
+    def test_unknown_annotations(self):
+        class NodeWithAny(eve.Node):
+            value: Any
+            values: List[Any]
+            ints: Dict[str, Tuple[int, ...]]
+
+        assert eve.concepts.reaching_children_names(NodeWithAny, (definitions.EmptyNode,)) == (
+            "value",
+            "values",
+        )
+
+
+class TestTrustedConstruction:
+    def test_construct_trusted(self, sample_node):
+        values = {name: getattr(sample_node, name) for name in sample_node.__fields_set__}
+        values.pop("id_", None)
+        trusted_node = sample_node.__class__.construct_trusted(**values)
+
+        assert isinstance(trusted_node.id_, str) and trusted_node.id_ != sample_node.id_
+        assert trusted_node.__fields_set__ == set(values.keys())
+        assert all(getattr(trusted_node, name) is value for name, value in values.items())
+        assert all(
+            getattr(trusted_node, name) == getattr(sample_node, name)
+            for name in sample_node.__fields__.keys()
+            if name != "id_"
+        )
+        eve.validate_tree(trusted_node)
+
+    def test_trusted_construction(self, sample_node_maker):
+        with eve.trusted_construction():
+            node = sample_node_maker()
+            with eve.trusted_construction(False):
+                with pytest.raises(pydantic.ValidationError):
+                    definitions.SimpleNode()
+
+        eve.validate_tree(node)
+
+    def test_derived_values(self):
+        with eve.trusted_construction():
+            node = definitions.make_node_with_symbol_table()
+
+        assert set(node.symtable_.keys()) == {
+            node.node_with_name.name,
+            node.node_with_default_name.name,
+            node.compound_with_name.node_with_name.name,
+            *(n.name for n in node.list_with_name),
+        }
+
+    def test_fallback(self):
+        with eve.trusted_construction():
+            with pytest.raises(pydantic.ValidationError, match="int_value"):
+                definitions.SimpleNodeWithOptionals()
+            with pytest.raises(pydantic.ValidationError, match="unknown_value"):
+                definitions.SimpleNodeWithOptionals(int_value=1, unknown_value=2)
+
+            node = definitions.SimpleNodeWithOptionals(int_value=1)
+            assert node.float_value is None and node.str_value is None
+
+    def test_validate_invalid_tree(self, invalid_sample_node_maker):
+        with pytest.raises(pydantic.ValidationError):
+            with eve.trusted_construction():
+                node = invalid_sample_node_maker()
+            eve.validate_tree([definitions.make_empty_node(), node])
+
+    def test_validate_non_canonical_tree(self):
+        node = definitions.SimpleNodeWithCollections.construct_trusted(
+            int_value=1, int_list=(1, 2, 3), str_set={"a"}, str_to_int_dict={"a": 1}, loc=None
+        )
+
+        with pytest.raises(eve.exceptions.EveValueError, match="int_list"):
+            eve.validate_tree([node])
+
+
+class TestNodeIndex:
+    @pytest.mark.parametrize(
+        "node_class", [eve.Node, definitions.SimpleNode, definitions.LocationNode]
+    )
+    def test_find_all(self, sample_node, node_class):
+        expected = eve.iter_tree(sample_node).if_isinstance(node_class).to_list()
+        assert list(sample_node.find_all(node_class)) == expected
+        assert sample_node.find_all(node_class) is sample_node.find_all(node_class)
+        assert "__node_index__" not in sample_node.dict()
+
+    def test_invalidation(self):
+        node = definitions.make_compound_node()
+        simple_nodes = node.find_all(definitions.SimpleNode)
+        assert simple_nodes == (node.simple,)
+
+        node.simple = definitions.make_simple_node()
+        assert node.find_all(definitions.SimpleNode) == (node.simple,)
+        assert node.find_all(definitions.SimpleNode)[0] is not simple_nodes[0]
+
+        nodes = node.find_all(eve.Node)
+        node.simple.int_value += 1
+        assert node.find_all(eve.Node) is not nodes
+
+    def test_mutator_invalidation(self):
+        node = definitions.make_node_with_symbol_table()
+        assert len(node.find_all(definitions.SimpleNodeWithSymbolName)) == 2 + len(
+            node.list_with_name
+        )
+
+        class RemoveFromLists(eve.NodeMutator):
+            def visit_list(self, node):
+                return []
+
+        RemoveFromLists().visit(node)
+        assert len(node.find_all(definitions.SimpleNodeWithSymbolName)) == 2
+
+    def test_manual_invalidation(self):
+        node = definitions.make_node_with_symbol_table()
+        count = len(node.find_all(definitions.SimpleNodeWithSymbolName))
+
+        node.list_with_name.append(definitions.make_simple_node_with_symbol_name())
+        assert len(node.find_all(definitions.SimpleNodeWithSymbolName)) == count
+
+        eve.invalidate_node_indices()
+        assert len(node.find_all(definitions.SimpleNodeWithSymbolName)) == count + 1
@@ -17,12 +17,15 @@
 
 from __future__ import annotations
 
+import sys
 from typing import List, Union
 
 import pytest
 
 import eve
 
+from .. import definitions
+
 
 class Tree(eve.Node):
     children: List[Union["Tree", int]]
@@ -110,3 +113,55 @@ def test_iter_tree(tree):
         traversals.append([value for value in eve.iter_tree(tree, order)])
 
     assert all(len(traversals[0]) == len(t) for t in traversals)
+
+
+def _make_deep_tree(depth):
+    tree = Tree(children=[0])
+    for i in range(1, depth):
+        tree = Tree(children=[i, tree])
+    return tree
+
+
+@pytest.mark.parametrize("order", [*eve.iterators.TraversalOrder])
+def test_iter_deep_tree(order):
+    depth = 3 * sys.getrecursionlimit()
+    tree = _make_deep_tree(depth)
+
+    values = [value for value in eve.iter_tree(tree, order) if isinstance(value, int)]
+    assert values == list(reversed(range(depth)))
+
+    keys = [
+        key for key, value in eve.iter_tree(tree, order, with_keys=True) if isinstance(value, Tree)
+    ]
+    if order == eve.iterators.TraversalOrder.POST_ORDER:
+        keys.reverse()
+    assert keys == [None] + [1] * (depth - 1)
+
+
+@pytest.mark.parametrize("order", [*eve.iterators.TraversalOrder])
+def test_iter_wide_tree(order):
+    width = 3 * sys.getrecursionlimit()
+    tree = Tree(children=[Tree(children=[i]) for i in range(width)])
+
+    items = list(eve.iter_tree(tree, order, with_keys=True))
+    assert len(items) == 2 + 3 * width
+    assert [value for _, value in items if isinstance(value, int)] == list(range(width))
+    keys = [key for key, value in items if isinstance(value, Tree)]
+    if order == eve.iterators.TraversalOrder.POST_ORDER:
+        assert keys == [*range(width), None]
+    else:
+        assert keys == [None, *range(width)]
+
+
+def test_iter_tree_instances(compound_node, node_with_symbol_table):
+    for tree in (compound_node, node_with_symbol_table, _make_deep_tree(1000)):
+        for node_types in (
+            (definitions.LocationNode,),
+            (definitions.SimpleNodeWithSymbolName,),
+            (definitions.SimpleNode, Tree),
+            (eve.Node,),
+        ):
+            assert (
+                eve.iter_tree_instances(tree, node_types).to_list()
+                == eve.iter_tree(tree).if_isinstance(*node_types).to_list()
+            )
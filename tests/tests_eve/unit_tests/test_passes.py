@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import eve
+from eve.passes import make_dump_hook
+
+
+@pytest.fixture
+def pass_manager():
+    pm = eve.PassManager()
+    pm.register("parse", int, input_type=str, output_type=int)
+    pm.register("double", lambda x: 2 * x, input_type=int, output_type=int)
+    pm.register("increment", lambda x: x + 1, input_type=int, output_type=int)
+    pm.register("to_str", str, input_type=int, output_type=str)
+    yield pm
+
+
+class TestPassManager:
+    def test_run(self, pass_manager):
+        assert pass_manager.run("20") == "41"
+        assert list(pass_manager.stats.keys()) == ["parse", "double", "increment", "to_str"]
+        assert all(stats.time >= 0.0 for stats in pass_manager.stats.values())
+        assert all(stats.allocated is None for stats in pass_manager.stats.values())
+
+    def test_partial_run(self, pass_manager):
+        assert pass_manager.run("20", last="double") == 40
+        assert pass_manager.run(40, first="increment") == "41"
+        assert pass_manager.run(20, first="double", last="increment") == 41
+
+    def test_stats_of_last_run(self, pass_manager):
+        pass_manager.run("20")
+        pass_manager.skip("double")
+        pass_manager.run("20")
+        assert list(pass_manager.stats.keys()) == ["parse", "increment", "to_str"]
+
+        pass_manager.run(20, first="increment", last="increment")
+        assert list(pass_manager.stats.keys()) == ["increment"]
+        assert "parse" not in pass_manager.report()
+
+        stats = {"double": eve.PassStats(0.5)}
+        assert "double" in pass_manager.report(stats)
+        assert "500.000" in pass_manager.report(stats)
+
+    def test_register_position(self, pass_manager):
+        pass_manager.register(
+            "square", lambda x: x * x, input_type=int, output_type=int, after="parse"
+        )
+        pass_manager.register(
+            "negate", lambda x: -x, input_type=int, output_type=int, before="to_str"
+        )
+
+        assert pass_manager.names == ["parse", "square", "double", "increment", "negate", "to_str"]
+        assert pass_manager.run("3") == "-19"
+
+        with pytest.raises(eve.exceptions.EveValueError, match="already"):
+            pass_manager.register("double", lambda x: x)
+        with pytest.raises(eve.exceptions.EveValueError, match="not found"):
+            pass_manager.register("other", lambda x: x, before="missing")
+
+    def test_skip_remove_and_reorder(self, pass_manager):
+        pass_manager.skip("double")
+        assert pass_manager.run("20") == "21"
+        assert "double" not in pass_manager.stats
+
+        pass_manager.skip("double", False)
+        pass_manager.reorder(["parse", "increment", "double", "to_str"])
+        assert pass_manager.run("20") == "42"
+
+        removed = pass_manager.remove("increment")
+        assert removed.name == "increment" and "increment" not in pass_manager
+        assert pass_manager.run("20") == "40"
+
+        with pytest.raises(eve.exceptions.EveValueError):
+            pass_manager.reorder(["parse", "to_str"])
+
+    def test_type_checks(self, pass_manager):
+        pass_manager.reorder(["parse", "double", "to_str", "increment"])
+        with pytest.raises(eve.exceptions.EveTypeError, match="to_str"):
+            pass_manager.run("20")
+
+        pass_manager.remove("increment")
+        with pytest.raises(eve.exceptions.EveTypeError, match="parse"):
+            pass_manager.run(20)
+
+        pass_manager.register("wrong", lambda x: None, input_type=str, output_type=str)
+        with pytest.raises(eve.exceptions.EveTypeError, match="wrong"):
+            pass_manager.run("20")
+
+    def test_trace_memory(self, pass_manager):
+        pass_manager.register("allocate", lambda x: [x] * 100_000, input_type=str, output_type=list)
+        pass_manager.trace_memory = True
+        pass_manager.run("20")
+
+        assert all(stats.peak is not None for stats in pass_manager.stats.values())
+        assert pass_manager.stats["allocate"].allocated >= 100_000 * 8
+        assert "allocate" in pass_manager.report()
+
+    def test_hooks(self, pass_manager, tmp_path):
+        collected = []
+        pass_manager.add_hook(lambda name, ir: collected.append((name, ir)))
+        pass_manager.add_hook(make_dump_hook(str(tmp_path), passes=["double", "to_str"]))
+        pass_manager.run("20")
+
+        assert collected == [("parse", 20), ("double", 40), ("increment", 41), ("to_str", "41")]
+        assert sorted(os.listdir(tmp_path)) == ["02_double.txt", "04_to_str.txt"]
+        with open(tmp_path / "02_double.txt") as f:
+            assert f.read() == "40"
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import eve
+
+from .. import definitions
+
+
+class _CollectVisitor(eve.NodeVisitor):
+    def __init__(self):
+        self.visited = []
+
+    def visit_LocationNode(self, node, **kwargs):
+        self.visited.append(("LocationNode", type(node).__name__))
+
+    def visit_Node(self, node, **kwargs):
+        self.visited.append(("Node", type(node).__name__))
+        self.generic_visit(node, **kwargs)
+
+
+class _DerivedCollectVisitor(_CollectVisitor):
+    def visit_SimpleNode(self, node, **kwargs):
+        self.visited.append(("SimpleNode", type(node).__name__))
+
+
+def test_visitor_dispatch(fixed_compound_node):
+    visitor = _CollectVisitor()
+    visitor.visit(fixed_compound_node)
+
+    assert ("Node", "CompoundNode") in visitor.visited
+    assert ("Node", "SimpleNode") in visitor.visited
+    assert ("LocationNode", "LocationNode") in visitor.visited
+
+
+def test_visitor_dispatch_cache(fixed_compound_node):
+    visitor = _CollectVisitor()
+    visitor.visit(fixed_compound_node)
+    visitor.visit(fixed_compound_node)
+
+    cache = _CollectVisitor.__visitor_names_cache__
+    assert cache[definitions.CompoundNode] == "visit_Node"
+    assert cache[definitions.LocationNode] == "visit_LocationNode"
+    assert cache[definitions.SimpleNode] == "visit_Node"
+    assert (
+        visitor.visited[: len(visitor.visited) // 2] == visitor.visited[len(visitor.visited) // 2 :]
+    )
+
+    # Subclasses use their own cache
+    derived_visitor = _DerivedCollectVisitor()
+    derived_visitor.visit(fixed_compound_node)
+
+    assert _DerivedCollectVisitor.__visitor_names_cache__ is not cache
+    assert (
+        _DerivedCollectVisitor.__visitor_names_cache__[definitions.SimpleNode] == "visit_SimpleNode"
+    )
+    assert cache[definitions.SimpleNode] == "visit_Node"
+    assert ("SimpleNode", "SimpleNode") in derived_visitor.visited
+    assert ("Node", "SimpleNode") not in derived_visitor.visited
+
+
+def test_visitor_dispatch_instance_methods(fixed_compound_node):
+    class_visitor = _CollectVisitor()
+    class_visitor.visit(fixed_compound_node)
+
+    visitor = _CollectVisitor()
+    visitor.visit_SimpleNode = lambda node, **kwargs: visitor.visited.append(
+        ("instance", type(node).__name__)
+    )
+    visitor.visit(fixed_compound_node)
+
+    assert ("instance", "SimpleNode") in visitor.visited
+    assert ("Node", "SimpleNode") not in visitor.visited
+    assert _CollectVisitor.__visitor_names_cache__[definitions.SimpleNode] == "visit_Node"
+
+    del visitor.visit_SimpleNode
+    visitor.visited = []
+    visitor.visit(fixed_compound_node)
+    assert visitor.visited == class_visitor.visited
+
+
+def test_visitor_dispatch_non_nodes():
+    class IntVisitor(eve.NodeVisitor):
+        def visit_int(self, node, **kwargs):
+            return node + 1
+
+    visitor = IntVisitor()
+    assert visitor.visit(1) == 2
+    assert visitor.visit("a") is None
+    assert IntVisitor.__visitor_names_cache__ == {int: "visit_int", str: "generic_visit"}
+
+
+class _CollectLocationsVisitor(eve.NodeVisitor):
+    def __init__(self):
+        self.locations = []
+        self.generic_visits = 0
+
+    def visit_LocationNode(self, node, **kwargs):
+        self.locations.append(node)
+
+    def generic_visit(self, node, **kwargs):
+        self.generic_visits += 1
+        super().generic_visit(node, **kwargs)
+
+
+class _PrunedCollectLocationsVisitor(_CollectLocationsVisitor):
+    visited_node_types = (definitions.LocationNode,)
+
+
+def test_visitor_pruning(fixed_compound_node):
+    visitor = _CollectLocationsVisitor()
+    visitor.visit(fixed_compound_node)
+    pruned_visitor = _PrunedCollectLocationsVisitor()
+    pruned_visitor.visit(fixed_compound_node)
+
+    assert pruned_visitor.locations == visitor.locations == [fixed_compound_node.location]
+    assert pruned_visitor.generic_visits == 1
+    assert pruned_visitor.generic_visits < visitor.generic_visits
+
+
+class _SharingTranslator(eve.NodeTranslator):
+    structural_sharing = True
+
+
+class _ReplaceLocationTranslator(_SharingTranslator):
+    def visit_LocationNode(self, node, **kwargs):
+        return definitions.LocationNode(loc=node.loc)
+
+
+def test_translator_copy(fixed_compound_node):
+    result = eve.NodeTranslator().visit(fixed_compound_node)
+
+    assert result == fixed_compound_node
+    assert result is not fixed_compound_node
+    assert result.simple is not fixed_compound_node.simple
+    assert result.simple.str_value is fixed_compound_node.simple.str_value
+    assert result.simple.str_kind is fixed_compound_node.simple.str_kind
+
+
+def test_translator_structural_sharing(fixed_compound_node, fixed_simple_node_with_collections):
+    assert _SharingTranslator().visit(fixed_compound_node) is fixed_compound_node
+    assert (
+        _SharingTranslator().visit(fixed_simple_node_with_collections)
+        is fixed_simple_node_with_collections
+    )
+
+    result = _ReplaceLocationTranslator().visit(fixed_compound_node)
+
+    assert result is not fixed_compound_node
+    assert result.id_ == fixed_compound_node.id_
+    assert result.location is not fixed_compound_node.location
+    assert result.location.loc == fixed_compound_node.location.loc
+    for name in ["simple", "simple_loc", "simple_opt"]:
+        assert getattr(result, name).__dict__ == getattr(fixed_compound_node, name).__dict__
+        for child_name, child in getattr(fixed_compound_node, name).iter_children():
+            assert getattr(getattr(result, name), child_name) is child
+
+
+class _RemoveOddMutator(eve.NodeMutator):
+    def visit_int(self, node, **kwargs):
+        return eve.NOTHING if node % 2 else node
+
+    def visit_str(self, node, **kwargs):
+        return node.upper()
+
+
+def test_mutator_removal():
+    node = definitions.SimpleNodeWithCollections(
+        int_value=2,
+        int_list=[1, 3, 4, 5, 7, 8, 9],
+        str_set={"a", "b"},
+        str_to_int_dict={"a": 1, "b": 2, "c": 3, "d": 5},
+    )
+    _RemoveOddMutator().visit(node)
+
+    assert node.int_list == [4, 8]
+    assert node.str_set == {"A", "B"}
+    assert node.str_to_int_dict == {"b": 2}
+
+
+class _CopyLocationsMutator(eve.NodeMutator):
+    def visit_LocationNode(self, node, **kwargs):
+        return node.copy()
+
+
+class _StructuralCopyLocationsMutator(_CopyLocationsMutator):
+    structural_equality = True
+
+
+def test_mutator_change_detection(fixed_compound_node):
+    original_location = fixed_compound_node.location
+    node_index_version = eve.concepts._node_trees_version
+    eve.NodeMutator().visit(fixed_compound_node)
+    assert eve.concepts._node_trees_version == node_index_version
+
+    _StructuralCopyLocationsMutator().visit(fixed_compound_node)
+    assert fixed_compound_node.location is original_location
+    assert eve.concepts._node_trees_version == node_index_version
+
+    _CopyLocationsMutator().visit(fixed_compound_node)
+    assert fixed_compound_node.location is not original_location
+    assert fixed_compound_node.location == original_location
+    assert eve.concepts._node_trees_version != node_index_version
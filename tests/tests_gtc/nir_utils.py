@@ -97,3 +97,12 @@ def make_horizontal_loop_with_init(field: Str):
         ),
         write_access,
     )
+
+
+def make_chain(n_loops: int, offset_every: int = 0) -> nir.VerticalLoop:
+    """Loops copying the field written by the previous loop (with offset every n loops)."""
+    loops = [make_horizontal_loop_with_init("field_0")[0]]
+    for i in range(1, n_loops):
+        has_extent = offset_every > 0 and i % offset_every == 0
+        loops.append(make_horizontal_loop_with_copy(f"field_{i}", f"field_{i - 1}", has_extent)[0])
+    return make_vertical_loop(loops)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.demote_temporaries import demote_temporaries
+
+from .nir_utils import (
+    default_location,
+    default_vtype,
+    make_block_stmt,
+    make_horizontal_loop,
+    make_horizontal_loop_with_copy,
+    make_horizontal_loop_with_init,
+    make_vertical_loop,
+)
+
+
+def make_field(name):
+    return nir.UField(
+        name=name,
+        vtype=default_vtype,
+        dimensions=nir.Dimensions(horizontal=nir.HorizontalDimension(primary=default_location)),
+    )
+
+
+def make_temporary(name):
+    return nir.TemporaryField(
+        name=name,
+        vtype=default_vtype,
+        dimensions=nir.Dimensions(horizontal=nir.HorizontalDimension(primary=default_location)),
+    )
+
+
+def make_computation(horizontal_loops):
+    return nir.Computation(
+        name="computation",
+        params=[make_field("out")],
+        declarations=[make_temporary("tmp")],
+        stencils=[nir.Stencil(vertical_loops=[make_vertical_loop(horizontal_loops)])],
+    )
+
+
+def make_fused_loop(*loops):
+    return make_horizontal_loop(
+        make_block_stmt([stmt for loop in loops for stmt in loop.stmt.statements], [])
+    )
+
+
+def get_horizontal_loops(computation):
+    return computation.stencils[0].vertical_loops[0].horizontal_loops
+
+
+class TestNIRDemoteTemporaries:
+    # tmp = ...
+    # out = tmp
+    def test_demote_write_read_in_same_loop(self):
+        write_loop, _ = make_horizontal_loop_with_init("tmp")
+        read_loop, _, _ = make_horizontal_loop_with_copy("out", "tmp", False)
+        computation = make_computation([make_fused_loop(write_loop, read_loop)])
+
+        result = demote_temporaries(computation)
+
+        assert result.declarations == []
+        (loop,) = get_horizontal_loops(result)
+        (local_var,) = loop.stmt.declarations
+        assert (local_var.name, local_var.vtype) == ("tmp", default_vtype)
+        assert isinstance(loop.stmt.statements[0].left, nir.VarAccess)
+        assert isinstance(loop.stmt.statements[1].left, nir.FieldAccess)
+        assert isinstance(loop.stmt.statements[1].right, nir.VarAccess)
+
+    # tmp = ...
+    # ---
+    # out = tmp
+    def test_read_in_other_loop(self):
+        write_loop, _ = make_horizontal_loop_with_init("tmp")
+        read_loop, _, _ = make_horizontal_loop_with_copy("out", "tmp", False)
+        computation = make_computation([write_loop, read_loop])
+
+        result = demote_temporaries(computation)
+
+        assert result is computation
+
+    # tmp = ...
+    # out = tmp(extent)
+    def test_read_with_offset(self):
+        write_loop, _ = make_horizontal_loop_with_init("tmp")
+        read_loop, _, _ = make_horizontal_loop_with_copy("out", "tmp", True)
+        computation = make_computation([make_fused_loop(write_loop, read_loop)])
+
+        result = demote_temporaries(computation)
+
+        assert result is computation
+
+    # out = tmp
+    # tmp = ...
+    def test_read_before_write(self):
+        write_loop, _ = make_horizontal_loop_with_init("tmp")
+        read_loop, _, _ = make_horizontal_loop_with_copy("out", "tmp", False)
+        computation = make_computation([make_fused_loop(read_loop, write_loop)])
+
+        result = demote_temporaries(computation)
+
+        assert result is computation
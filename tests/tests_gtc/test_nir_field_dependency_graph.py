@@ -15,9 +15,14 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
-from gtc.unstructured.nir_passes.field_dependency_graph import generate_dependency_graph
+import pytest
 
-from .nir_utils import make_horizontal_loop_with_copy, make_horizontal_loop_with_init
+from gtc.unstructured.nir_passes.field_dependency_graph import (
+    _FieldWriteDependencyGraph,
+    generate_dependency_graph,
+)
+
+from .nir_utils import make_chain, make_horizontal_loop_with_copy, make_horizontal_loop_with_init
 
 
 class TestNIRFieldDependencyGraph:
@@ -45,8 +50,8 @@ class TestNIRFieldDependencyGraph:
         result = generate_dependency_graph(loops)
 
         assert len(result.nodes()) == 2
-        assert result.has_edge(write0.id_, write1.id_)
-        assert result[write0.id_][write1.id_]["extent"] is False
+        assert result.has_edge(result.index(write0), result.index(write1))
+        assert result.extent(result.index(write0), result.index(write1)) is False
 
     def test_dependent_assignment_with_extent(self):
         loop0, write0 = make_horizontal_loop_with_init("write0")
@@ -56,5 +61,74 @@ class TestNIRFieldDependencyGraph:
         result = generate_dependency_graph(loops)
 
         assert len(result.nodes()) == 2
-        assert result.has_edge(write0.id_, write1.id_)
-        assert result[write0.id_][write1.id_]["extent"] is True
+        assert result.has_edge(result.index(write0), result.index(write1))
+        assert result.extent(result.index(write0), result.index(write1)) is True
+
+    def test_incremental_extension(self):
+        loop0, write0 = make_horizontal_loop_with_init("write0")
+        loop1, write1, read1 = make_horizontal_loop_with_copy("write1", "write0", False)
+        loop2, write2, read2 = make_horizontal_loop_with_copy("write2", "write1", True)
+
+        dependencies = _FieldWriteDependencyGraph()
+        dependencies.add_loop(loop0)
+        dependencies.add_loop(loop1)
+        assert not dependencies.has_read_with_offset_after_write
+        dependencies.add_loop(loop2)
+        assert dependencies.has_read_with_offset_after_write
+
+        result = generate_dependency_graph([loop0, loop1, loop2])
+        assert dependencies.graph.writes == result.writes
+        assert dependencies.graph.edges() == result.edges()
+
+    def test_graph_queries(self):
+        loop0, write0 = make_horizontal_loop_with_init("write0")
+        loop1, write1, _ = make_horizontal_loop_with_copy("write1", "write0", False)
+        loop2, write2, _ = make_horizontal_loop_with_copy("write2", "write1", True)
+        loop3, write3, _ = make_horizontal_loop_with_copy("write3", "write0", False)
+
+        result = generate_dependency_graph([loop0, loop1, loop2, loop3])
+        indices = [result.index(write) for write in (write0, write1, write2, write3)]
+
+        assert list(result.edges()) == [
+            (indices[0], indices[1], False),
+            (indices[1], indices[2], True),
+            (indices[0], indices[3], False),
+        ]
+        assert result.successors(indices[0]) == [indices[1], indices[3]]
+        assert result.reachable(indices[0]) == set(indices[1:])
+        assert result.reachable(indices[2]) == set()
+        assert not result.has_edge(indices[0], indices[2])
+        assert result.extent(indices[0], indices[2]) is None
+
+        order = result.topological_order()
+        assert sorted(order) == indices
+        assert all(
+            order.index(source) < order.index(target) for source, target, _ in result.edges()
+        )
+
+    def test_long_chain(self):
+        loops = make_chain(1000, offset_every=10).horizontal_loops
+
+        result = generate_dependency_graph(loops)
+
+        assert result.num_edges == len(loops) - 1
+        assert result.has_read_with_offset_after_write
+        assert result.topological_order() == list(range(len(loops)))
+        assert result.reachable(0) == set(range(1, len(loops)))
+        assert [extent for _, _, extent in result.edges()] == [
+            i % 10 == 0 for i in range(1, len(loops))
+        ]
+
+    def test_to_networkx(self):
+        pytest.importorskip("networkx")
+        loop0, write0 = make_horizontal_loop_with_init("write0")
+        loop1, write1, _ = make_horizontal_loop_with_copy("write1", "write0", False)
+        loop2, write2, _ = make_horizontal_loop_with_copy("write2", "write1", True)
+
+        result = generate_dependency_graph([loop0, loop1, loop2])
+        nx_graph = result.to_networkx()
+        assert set(nx_graph.nodes()) == {write.id_ for write in result.writes}
+        assert set(nx_graph.edges(data="extent")) == {
+            (write0.id_, write1.id_, False),
+            (write1.id_, write2.id_, True),
+        }
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from gtc import common
+from gtc.unstructured import nir
+from gtc.unstructured.nir_passes.fuse_horizontal_loops import (
+    FusionCost,
+    _LoopAccesses,
+    fuse_horizontal_loops,
+    fusion_cost,
+)
+
+from .nir_utils import (
+    make_empty_horizontal_loop,
+    make_horizontal_loop_with_copy,
+    make_horizontal_loop_with_init,
+    make_vertical_loop,
+)
+
+
+# write = read(extent) on edges
+def make_edge_loop_with_copy(write, read):
+    write_access = nir.FieldAccess(
+        name=write,
+        primary=nir.NeighborChain(elements=[common.LocationType.Edge]),
+        location_type=common.LocationType.Edge,
+    )
+    read_access = nir.FieldAccess(
+        name=read,
+        primary=nir.NeighborChain(elements=[common.LocationType.Edge, common.LocationType.Vertex]),
+        location_type=common.LocationType.Edge,
+    )
+    return nir.HorizontalLoop(
+        stmt=nir.BlockStmt(
+            declarations=[], statements=[nir.AssignStmt(left=write_access, right=read_access)]
+        ),
+        location_type=common.LocationType.Edge,
+    )
+
+
+class TestNIRFuseHorizontalLoops:
+    # field = ...
+    # (independent edge loop)
+    # out = input
+    def test_fuse_across_independent_loop(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop = make_empty_horizontal_loop(common.LocationType.Edge)
+        third_loop, _, _ = make_horizontal_loop_with_copy("out", "input", False)
+        stencil = make_vertical_loop([first_loop, second_loop, third_loop])
+
+        result = fuse_horizontal_loops(stencil)
+
+        assert len(result.horizontal_loops) == 2
+        assert result.horizontal_loops[0].stmt.statements == (
+            first_loop.stmt.statements + third_loop.stmt.statements
+        )
+        assert result.horizontal_loops[1] == second_loop
+
+    # field = ...
+    # edge_field = field(extent)
+    # out = edge_field
+    def test_dependency_prevents_reordering(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop = make_edge_loop_with_copy("edge_field", "field")
+        third_loop, _, _ = make_horizontal_loop_with_copy("out", "edge_field", False)
+        stencil = make_vertical_loop([first_loop, second_loop, third_loop])
+
+        result = fuse_horizontal_loops(stencil)
+
+        assert result.horizontal_loops == [first_loop, second_loop, third_loop]
+
+    # field = ...
+    # (independent edge loop)
+    # out = field(extent)
+    def test_read_with_offset_after_write(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop = make_empty_horizontal_loop(common.LocationType.Edge)
+        third_loop, _, _ = make_horizontal_loop_with_copy("out", "field", True)
+        stencil = make_vertical_loop([first_loop, second_loop, third_loop])
+
+        result = fuse_horizontal_loops(stencil)
+
+        assert result.horizontal_loops == [first_loop, second_loop, third_loop]
+
+    # out = field(extent)
+    # (independent edge loop)
+    # field = ...
+    def test_write_after_read_with_offset(self):
+        first_loop, _, _ = make_horizontal_loop_with_copy("out", "field", True)
+        second_loop = make_empty_horizontal_loop(common.LocationType.Edge)
+        third_loop, _ = make_horizontal_loop_with_init("field")
+        stencil = make_vertical_loop([first_loop, second_loop, third_loop])
+
+        result = fuse_horizontal_loops(stencil)
+
+        assert result.horizontal_loops == [first_loop, second_loop, third_loop]
+
+    # field = ...
+    # out = field
+    def test_adjacent_loops(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop, _, _ = make_horizontal_loop_with_copy("out", "field", False)
+        stencil = make_vertical_loop([first_loop, second_loop])
+
+        result = fuse_horizontal_loops(stencil)
+
+        assert len(result.horizontal_loops) == 1
+
+    def test_fusion_cost(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop, _, _ = make_horizontal_loop_with_copy("out", "field", False)
+
+        assert fusion_cost([[first_loop], [second_loop]]) == FusionCost(
+            kernels=2, bytes_moved=3 * 8
+        )
+        assert fusion_cost([[first_loop, second_loop]], {"out": 4}) == FusionCost(
+            kernels=1, bytes_moved=8 + 4
+        )
+
+    def test_loop_accesses(self):
+        loop, _, _ = make_horizontal_loop_with_copy("out", "field", True)
+        accesses = _LoopAccesses.apply(loop)
+        assert (accesses.writes, accesses.reads, accesses.offset_reads) == (
+            {"out"},
+            {"field"},
+            {"field"},
+        )
+
+        loop, _, _ = make_horizontal_loop_with_copy("field", "field", False)
+        accesses = _LoopAccesses.apply(loop)
+        assert (accesses.writes, accesses.reads, accesses.offset_reads) == (
+            {"field"},
+            {"field"},
+            set(),
+        )
@@ -26,6 +26,7 @@ from gtc.unstructured.nir_passes.merge_horizontal_loops import (
 from .nir_utils import (
     default_location,
     make_block_stmt,
+    make_chain,
     make_empty_horizontal_loop,
     make_horizontal_loop,
     make_horizontal_loop_with_copy,
@@ -154,6 +155,37 @@ class TestNIRMergeHorizontalLoops_WithDependencies:
         assert result[0][0] == first_loop
         assert result[0][1] == second_loop
 
+    # field = ...
+    # out = field(extent)
+    # out2 = out
+    # out3 = field(extent)
+    def test_dependencies_restart_with_candidate(self):
+        first_loop, _ = make_horizontal_loop_with_init("field")
+        second_loop, _, _ = make_horizontal_loop_with_copy("out", "field", True)
+        third_loop, _, _ = make_horizontal_loop_with_copy("out2", "out", False)
+        fourth_loop, _, _ = make_horizontal_loop_with_copy("out3", "field", True)
+        stencil = make_vertical_loop([first_loop, second_loop, third_loop, fourth_loop])
+
+        result = _find_merge_candidates(stencil)
+
+        assert len(result) == 1
+        assert result[0] == [second_loop, third_loop, fourth_loop]
+
+    def test_long_chain(self):
+        stencil = make_chain(100)
+
+        result = _find_merge_candidates(stencil)
+
+        assert result == [stencil.horizontal_loops]
+
+    def test_long_chain_with_offsets(self):
+        stencil = make_chain(100, offset_every=10)
+
+        result = _find_merge_candidates(stencil)
+
+        # a new candidate starts at every read with offset
+        assert result == [stencil.horizontal_loops[i : i + 10] for i in range(0, 100, 10)]
+
 
 class TestNIRMergeHorizontalLoops:
     def test_merge_empty_loops(self):
@@ -226,3 +258,22 @@ class TestNIRMergeHorizontalLoops:
             assert len(vloop.horizontal_loops) == 1
             assert len(vloop.horizontal_loops[0].stmt.statements) == 2
             assert len(vloop.horizontal_loops[0].stmt.declarations) == 2
+
+    def test_find_and_merge_shares_unchanged_nodes(self):
+        first_loop = make_empty_horizontal_loop(common.LocationType.Vertex)
+        second_loop = make_empty_horizontal_loop(common.LocationType.Vertex)
+        mergeable_vertical_loop = make_vertical_loop([first_loop, second_loop])
+        other_vertical_loop = make_vertical_loop(
+            [make_empty_horizontal_loop(common.LocationType.Edge)]
+        )
+        stencil = nir.Stencil(vertical_loops=[mergeable_vertical_loop, other_vertical_loop])
+
+        result = find_and_merge_horizontal_loops(stencil)
+
+        # The input tree is not modified
+        assert len(stencil.vertical_loops[0].horizontal_loops) == 2
+        assert len(result.vertical_loops[0].horizontal_loops) == 1
+        assert (
+            result.vertical_loops[1].horizontal_loops[0]
+            is stencil.vertical_loops[1].horizontal_loops[0]
+        )
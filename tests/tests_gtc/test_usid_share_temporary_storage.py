@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from gt_frontend.frontend import GTScriptCompilationTask
+
+from gtc import common
+from gtc.unstructured.usid_passes.share_temporary_storage import (
+    Lifetime,
+    TemporaryMemory,
+    assign_storages,
+    share_temporary_storage,
+    temporary_lifetimes,
+    temporary_memory,
+)
+
+from .unit_tests import stencil_definitions
+
+
+def make_usid(stencil_name):
+    task = GTScriptCompilationTask(getattr(stencil_definitions, stencil_name))
+    task.pass_manager.skip("share_temporary_storage")
+    task.generate()
+    return task.usid
+
+
+class TestUSIDShareTemporaryStorage:
+    def test_lifetimes(self):
+        result = temporary_lifetimes(make_usid("temporary_chain"))
+
+        assert result == {
+            "edge_tmp_1": Lifetime(0, 1),
+            "vertex_tmp_1": Lifetime(1, 2),
+            "edge_tmp_2": Lifetime(2, 3),
+            "vertex_tmp_2": Lifetime(3, 4),
+            "edge_tmp_3": Lifetime(4, 5),
+        }
+
+    def test_assign_storages(self):
+        result = assign_storages(make_usid("temporary_chain"))
+
+        assert result == {
+            "edge_tmp_1": None,
+            "vertex_tmp_1": None,
+            "edge_tmp_2": "edge_tmp_1",
+            "vertex_tmp_2": "vertex_tmp_1",
+            "edge_tmp_3": "edge_tmp_1",
+        }
+
+    def test_overlapping_lifetimes(self):
+        # zavgS_MXX and zavgS_MYY are written and read by the same kernels
+        usid_comp = make_usid("fvm_nabla")
+
+        assert set(assign_storages(usid_comp).values()) == {None}
+        assert share_temporary_storage(usid_comp) is usid_comp
+
+    def test_temporary_memory(self):
+        sizes = {common.LocationType.Vertex: 10, common.LocationType.Edge: 30}
+
+        result = temporary_memory(make_usid("temporary_chain"), sizes)
+
+        assert result == TemporaryMemory(unshared=(3 * 30 + 2 * 10) * 8, shared=(30 + 10) * 8)
+
+    def test_share_temporary_storage(self):
+        result = share_temporary_storage(make_usid("temporary_chain"))
+
+        assert [(temporary.name, temporary.storage) for temporary in result.temporaries] == [
+            ("edge_tmp_1", None),
+            ("vertex_tmp_1", None),
+            ("edge_tmp_2", "edge_tmp_1"),
+            ("vertex_tmp_2", "vertex_tmp_1"),
+            ("edge_tmp_3", "edge_tmp_1"),
+        ]
+
+    def test_code_generation(self):
+        cpp_code = GTScriptCompilationTask(stencil_definitions.temporary_chain).generate()
+
+        assert cpp_code.count("make_simple_tmp_storage") == 2
+        assert "auto &edge_tmp_3 = edge_tmp_1;" in cpp_code
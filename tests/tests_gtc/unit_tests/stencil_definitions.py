@@ -16,12 +16,16 @@
 # ignore flake8 error: local variable '...' is assigned to but never used
 # flake8: noqa: F841
 from gt_frontend.gtscript import (
+    BACKWARD,
     FORWARD,
+    Cell,
     Edge,
     Field,
+    K,
     Local,
     Mesh,
     Vertex,
+    cells,
     computation,
     edges,
     interval,
@@ -34,7 +38,16 @@ from gtc import common
 
 dtype = common.DataType.FLOAT64
 
-valid_stencils = ["edge_reduction", "sparse_ex", "nested", "fvm_nabla", "temporary_field"]
+valid_stencils = [
+    "edge_reduction",
+    "sparse_ex",
+    "nested",
+    "fvm_nabla",
+    "temporary_field",
+    "nested_reduction",
+    "vertical",
+    "temporary_chain",
+]
 
 
 def copy(mesh: Mesh, field_in: Field[Vertex, dtype], field_out: Field[Vertex, dtype]):
@@ -92,3 +105,42 @@ def fvm_nabla(
             pnabla_MYY = sum(zavgS_MYY[e] * sign[v, e] for e in edges(v))
             pnabla_MXX = pnabla_MXX / vol
             pnabla_MYY = pnabla_MYY / vol
+
+
+def nested_reduction(
+    mesh: Mesh,
+    cell_field: Field[Cell, dtype],
+    edge_field: Field[Edge, dtype],
+    vertex_field: Field[Vertex, dtype],
+):
+    with computation(FORWARD), interval(0, None), location(Vertex) as v:
+        vertex_field = sum(edge_field[e] * sum(cell_field[c] for c in cells(e)) for e in edges(v))
+
+
+def vertical(
+    mesh: Mesh,
+    edge_field: Field[Edge, K, dtype],
+    vertex_field: Field[Vertex, K, dtype],
+    sparse_field: Field[Edge, Local[Vertex], K, dtype],
+):
+    with computation(BACKWARD), interval(0, None), location(Edge) as e:
+        tmp = sum(vertex_field[v] * sparse_field[e, v] for v in vertices(e))
+    with computation(FORWARD), interval(0, None), location(Edge) as e:
+        edge_field = 0.5 * tmp
+
+
+def temporary_chain(
+    mesh: Mesh, vertex_in: Field[Vertex, dtype], vertex_out: Field[Vertex, dtype],
+):
+    with computation(FORWARD), interval(0, None), location(Edge) as e:
+        edge_tmp_1 = sum(vertex_in[v] for v in vertices(e))
+    with computation(FORWARD), interval(0, None), location(Vertex) as v:
+        vertex_tmp_1 = sum(edge_tmp_1[e] for e in edges(v))
+    with computation(FORWARD), interval(0, None), location(Edge) as e:
+        edge_tmp_2 = sum(vertex_tmp_1[v] for v in vertices(e))
+    with computation(FORWARD), interval(0, None), location(Vertex) as v:
+        vertex_tmp_2 = sum(edge_tmp_2[e] for e in edges(v))
+    with computation(FORWARD), interval(0, None), location(Edge) as e:
+        edge_tmp_3 = sum(vertex_tmp_2[v] for v in vertices(e))
+    with computation(FORWARD), interval(0, None), location(Vertex) as v:
+        vertex_out = sum(edge_tmp_3[e] for e in edges(v))
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+
+import pytest
+from gt_frontend.compilation_cache import CompilationCache, compilation_key
+from gt_frontend.frontend import GTScriptCompilationTask, compile_many
+
+from gtc.unstructured.usid_codegen import UsidGpuCodeGenerator, UsidNaiveCodeGenerator
+
+from . import stencil_definitions
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompilationCache(str(tmp_path / "cache"))
+
+
+def test_cache_miss_and_hit(cache):
+    reference = GTScriptCompilationTask(stencil_definitions.fvm_nabla).generate(cache=cache)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (0, 1, 1)
+    assert len(cache) == 1
+
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    assert task.generate(cache=cache) == reference
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (1, 1, 1)
+    assert task.gtscript_ast is None  # nothing has been regenerated
+    assert cache.stats.hit_rate == 0.5
+
+    # Other processes share the cache through the directory
+    other_cache = CompilationCache(cache.path)
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    assert task.generate(cache=other_cache) == reference
+    assert other_cache.stats.hits == 1
+
+
+def test_cache_key():
+    constants = GTScriptCompilationTask(stencil_definitions.nested).symbol_table.constants
+    key = compilation_key(stencil_definitions.nested, constants, UsidGpuCodeGenerator)
+
+    assert key == compilation_key(stencil_definitions.nested, constants, UsidGpuCodeGenerator)
+    assert key != compilation_key(stencil_definitions.nested, constants, UsidNaiveCodeGenerator)
+    assert key != compilation_key(stencil_definitions.fvm_nabla, constants, UsidGpuCodeGenerator)
+    assert key != compilation_key(
+        stencil_definitions.nested, {**constants, "dtype": None}, UsidGpuCodeGenerator
+    )
+
+
+def test_cache_key_passes(cache):
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    reference = task.generate(cache=cache)
+    passes = [(pass_.name, pass_.enabled) for pass_ in task.pass_manager]
+    constants = task.symbol_table.constants
+    key = compilation_key(stencil_definitions.fvm_nabla, constants, UsidGpuCodeGenerator)
+
+    assert key != compilation_key(
+        stencil_definitions.fvm_nabla, constants, UsidGpuCodeGenerator, passes=passes
+    )
+    assert compilation_key(
+        stencil_definitions.fvm_nabla, constants, UsidGpuCodeGenerator, passes=passes[::-1]
+    ) != compilation_key(
+        stencil_definitions.fvm_nabla, constants, UsidGpuCodeGenerator, passes=passes
+    )
+
+    # Code generated with a different pipeline is not taken from the cache
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    task.pass_manager.skip("demote_temporaries")
+    assert task.generate(cache=cache) != reference
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (0, 2, 2)
+
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    assert task.generate(cache=cache) == reference
+    assert cache.stats.hits == 1
+
+
+def test_cache_key_annotations():
+    def stencil_a(
+        mesh: stencil_definitions.Mesh,
+        f: stencil_definitions.Field[stencil_definitions.Edge, stencil_definitions.dtype],
+    ):
+        pass
+
+    def stencil_b(
+        mesh: stencil_definitions.Mesh,
+        f: stencil_definitions.Field[stencil_definitions.Vertex, stencil_definitions.dtype],
+    ):
+        pass
+
+    stencil_b.__code__ = stencil_a.__code__
+    assert compilation_key(stencil_a, {}, UsidGpuCodeGenerator) != compilation_key(
+        stencil_b, {}, UsidGpuCodeGenerator
+    )
+
+
+def test_cache_irs(tmp_path):
+    cache = CompilationCache(str(tmp_path), store_irs=True)
+    reference_task = GTScriptCompilationTask(stencil_definitions.sparse_ex)
+    reference_task.generate(cache=cache)
+
+    task = GTScriptCompilationTask(stencil_definitions.sparse_ex)
+    task.generate(cache=cache)
+    assert cache.stats.hits == 1
+    assert task.gtir == reference_task.gtir
+    assert task.nir == reference_task.nir
+    assert task.usid == reference_task.usid
+
+
+def test_lru_eviction(cache):
+    for i in range(4):
+        cache.store(f"key_{i}", "x" * 100)
+        os.utime(os.path.join(cache.path, f"key_{i}.cpp"), (i, i))
+    assert len(cache) == 4 and cache.stats.evictions == 0
+
+    cache.load("key_0")  # key_1 is now the least recently used entry
+    cache.max_size = 300
+    cache.store("key_4", "x" * 100)
+
+    assert cache.stats.evictions == 2
+    assert "key_0" in cache and "key_3" in cache and "key_4" in cache
+    assert "key_1" not in cache and "key_2" not in cache
+    assert cache.size() == 300
+    assert sorted(os.listdir(cache.path)) == ["key_0.cpp", "key_3.cpp", "key_4.cpp"]
+
+
+def test_clear(cache):
+    cache.store("key", "code")
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.load("key") is None
+    assert cache.stats.misses == 1
+
+
+def test_compile_many_stats(cache):
+    definitions = [stencil_definitions.fvm_nabla, stencil_definitions.edge_reduction]
+
+    results = compile_many(definitions, max_workers=2, cache=cache)
+    assert all(r.cpp_code for r in results)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (0, 2, 2)
+
+    compile_many(definitions, max_workers=2, cache=cache)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (2, 2, 2)
@@ -1,11 +1,26 @@
 # -*- coding: utf-8 -*-
 import ast
 import inspect
+import os
+import subprocess
+import sys
 import textwrap
 
 import pytest
 from gt_frontend import ast_node_matcher as anm
-from gt_frontend.frontend import GTScriptCompilationTask
+from gt_frontend.frontend import GTScriptCompilationTask, compile_many
+from gt_frontend.gtscript import Mesh
+
+import eve
+from gtc import common
+from gtc.unstructured import nir, usid
+from gtc.unstructured.gtir_to_nir import GtirToNir
+from gtc.unstructured.nir_passes.field_dependency_graph import _FieldWriteDependencyGraph
+from gtc.unstructured.nir_passes.merge_horizontal_loops import (
+    _FindMergeCandidatesAnalysis,
+    find_and_merge_horizontal_loops,
+)
+from gtc.unstructured.nir_to_usid import NeighborLoopCollector, NirToUsid
 
 from . import stencil_definitions
 
@@ -124,3 +139,261 @@ def valid_stencil(request):
 
 def test_code_generation_for_valid_stencils(valid_stencil):
     GTScriptCompilationTask(valid_stencil).generate()
+
+
+def _without_ids(value):
+    if isinstance(value, eve.Node):
+        value = value.dict()
+    if isinstance(value, dict):
+        return {key: _without_ids(item) for key, item in value.items() if key != "id_"}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_without_ids(item) for item in value)
+    return value
+
+
+def test_trusted_translation_for_valid_stencils(valid_stencil):
+    task = GTScriptCompilationTask(valid_stencil)
+    task._generate_gtscript_ast()
+    gtir_comp = task._generate_gtir()
+
+    nir_comp = GtirToNir.apply(gtir_comp)
+    eve.validate_tree(nir_comp)
+    assert _without_ids(nir_comp) == _without_ids(GtirToNir().visit(gtir_comp))
+
+    nir_comp = find_and_merge_horizontal_loops(nir_comp)
+    usid_comp = NirToUsid.apply(nir_comp)
+    eve.validate_tree(usid_comp)
+    assert _without_ids(usid_comp) == _without_ids(NirToUsid().visit(nir_comp))
+
+
+def test_pruned_traversals_for_valid_stencils(valid_stencil, monkeypatch):
+    task = GTScriptCompilationTask(valid_stencil)
+    task.generate()
+    loops = task.nir.iter_tree().if_isinstance(nir.HorizontalLoop).to_list()
+
+    def analyses():
+        graphs = [_FieldWriteDependencyGraph.generate([loop]) for loop in loops]
+        return (
+            [tuple(eve.iter_tree_instances(loop.stmt, nir.FieldAccess)) for loop in loops],
+            [(graph.writes, graph.edges()) for graph in graphs],
+            _FindMergeCandidatesAnalysis.find(task.nir),
+            [
+                NeighborLoopCollector.apply(
+                    loop.stmt, chain=usid.NeighborChain(elements=(loop.location_type,))
+                )
+                for loop in loops
+            ],
+        )
+
+    pruned_results = analyses()
+    for visitor_class in (
+        _FieldWriteDependencyGraph,
+        _FindMergeCandidatesAnalysis,
+        NeighborLoopCollector,
+    ):
+        monkeypatch.setattr(visitor_class, "visited_node_types", None)
+
+    assert pruned_results[0] == [
+        tuple(eve.iter_tree(loop.stmt).if_isinstance(nir.FieldAccess)) for loop in loops
+    ]
+    assert analyses() == pruned_results
+
+
+def test_node_interning_for_valid_stencils(valid_stencil):
+    interned_classes = (
+        nir.NeighborChain,
+        usid.NeighborChain,
+        usid.Connectivity,
+        usid.SidCompositeEntry,
+        usid.SidCompositeNeighborTableEntry,
+    )
+    task = GTScriptCompilationTask(valid_stencil)
+    with eve.node_interning():
+        cpp_code = task.generate()
+
+    # Equal nodes of the interned classes are the same instance
+    nodes = [
+        node
+        for tree in (task.nir, task.usid)
+        for node in tree.iter_tree().if_isinstance(*interned_classes)
+    ]
+    assert len({id(node) for node in nodes}) == len({node.content_hash() for node in nodes})
+
+    assert GTScriptCompilationTask(valid_stencil).generate() == cpp_code
+
+
+def test_deterministic_lowering():
+    # The lowered trees (including the node ids) do not depend on the stencils
+    # compiled before in the same interpreter
+    script = (
+        "import sys, contextlib, stencil_definitions as defs;"
+        "from gt_frontend.frontend import GTScriptCompilationTask;"
+        "tasks = [GTScriptCompilationTask(getattr(defs, name)) for name in sys.argv[1:]];"
+        "contextlib.redirect_stdout(sys.stderr).__enter__();"
+        "[task.generate() for task in tasks];"
+        "sys.__stdout__.write(repr(tasks[-1].nir) + repr(tasks[-1].usid))"
+    )
+
+    def lowered_trees(*names):
+        return subprocess.run(
+            [sys.executable, "-c", script, *names],
+            cwd=os.path.dirname(__file__),
+            env={**os.environ, "PYTHONHASHSEED": "0"},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    assert lowered_trees("edge_reduction") == lowered_trees("fvm_nabla", "edge_reduction")
+
+
+def test_lowered_trees_are_validated_in_debug_mode(monkeypatch):
+    validated = []
+    validate_tree = eve.validate_tree
+    monkeypatch.setattr(
+        eve, "validate_tree", lambda root: validated.append(root) or validate_tree(root)
+    )
+
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    task.generate()
+    assert validated == []
+
+    task.generate(debug=True)
+    assert validated == [task.nir, task.usid]
+
+
+def invalid_stencil(mesh: Mesh):
+    return 1
+
+
+def test_compile_many():
+    definitions = [
+        getattr(stencil_definitions, name) for name in stencil_definitions.valid_stencils
+    ]
+    definitions.insert(1, invalid_stencil)
+    definitions.append(lambda mesh: None)  # not picklable
+
+    results = compile_many(definitions, max_workers=2)
+
+    assert [r.name for r in results] == [d.__name__ for d in definitions]
+    assert all(r.cpp_code and r.error is None for r in results[:1] + results[2:-1])
+    assert results[1].cpp_code is None and "ValueError" in results[1].error
+    assert list(results[1].timings.keys()) == []
+    assert results[-1].cpp_code is None and "pickle" in results[-1].error.lower()
+    assert (
+        list(results[0].timings.keys())
+        == GTScriptCompilationTask(invalid_stencil).pass_manager.names
+    )
+
+    # Generated code does not depend on the distribution of the work
+    assert [r.cpp_code for r in compile_many(definitions[:3], max_workers=1)] == [
+        r.cpp_code for r in results[:3]
+    ]
+
+    # Code formatted in batch is the same as formatted by every task
+    assert results[0].cpp_code == GTScriptCompilationTask(definitions[0]).generate()
+    unformatted = compile_many(definitions[:1], max_workers=1, format_code=False)[0].cpp_code
+    assert unformatted == GTScriptCompilationTask(definitions[0]).generate(format_code=False)
+    assert unformatted != results[0].cpp_code
+
+
+def test_deterministic_node_ids():
+    first_task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    first_code = first_task.generate()
+    second_task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    assert second_task.generate() == first_code
+    assert [k.id_ for k in second_task.nir.stencils[0].vertical_loops[0].horizontal_loops] == [
+        k.id_ for k in first_task.nir.stencils[0].vertical_loops[0].horizontal_loops
+    ]
+
+
+def test_pass_manager_customization(tmp_path):
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    task.generate()
+    n_merged_kernels = len(task.usid.kernels)
+
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    task.pass_manager.skip("fuse_horizontal_loops")
+    task.pass_manager.add_hook(eve.passes.make_dump_hook(str(tmp_path), passes=["nir_to_usid"]))
+    task.generate()
+
+    assert len(task.usid.kernels) > n_merged_kernels
+    assert "fuse_horizontal_loops" not in task.timings
+    assert os.listdir(tmp_path) == ["09_nir_to_usid.txt"]
+
+
+def test_timings_of_last_generation():
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    task.generate()
+    assert list(task.timings.keys()) == task.pass_manager.names
+
+    task.pass_manager.skip("demote_temporaries")
+    task.generate()
+    assert "demote_temporaries" not in task.timings
+    assert len(task.timings) == len(task.pass_manager.names) - 1
+
+
+def test_fuse_horizontal_loops_across_stencils():
+    task = GTScriptCompilationTask(stencil_definitions.nested)
+    task.generate()
+
+    # the independent edge loops of the first and last stencils are fused
+    assert [kernel.primary_sid for kernel in task.usid.kernels] == ["edge", "vertex"]
+
+
+def test_demote_temporaries():
+    task = GTScriptCompilationTask(stencil_definitions.temporary_field)
+    cpp_code = task.generate()
+
+    # after fusing both loops, the temporary is a local variable of the kernel
+    assert task.usid.temporaries == []
+    assert "make_simple_tmp_storage" not in cpp_code
+
+
+def test_nested_reduction():
+    task = GTScriptCompilationTask(stencil_definitions.nested_reduction)
+    cpp_code = task.generate()
+
+    # both reductions are fused into a single kernel with nested neighbor loops
+    (kernel,) = task.usid.kernels
+    (outer_loop,) = [stmt for stmt in kernel.ast if isinstance(stmt, usid.NeighborLoop)]
+    (inner_loop,) = [stmt for stmt in outer_loop.body if isinstance(stmt, usid.NeighborLoop)]
+    assert (outer_loop.outer_sid, outer_loop.sid) == ("vertex", "vertex_edge")
+    assert (inner_loop.outer_sid, inner_loop.sid) == ("vertex_edge", "vertex_edge_cell")
+
+    sids = {sid.name: sid for sid in kernel.sids}
+    assert set(sids["vertex_edge_cell"].symbol_tbl) == {"cell_field"}
+    assert set(sids["vertex_edge"].symbol_tbl) == {"edge_field"}
+    assert [
+        entry.connectivity
+        for entry in sids["vertex_edge"].entries
+        if isinstance(entry, usid.SidCompositeNeighborTableEntry)
+    ] == ["edge_cell_conn"]
+    assert {conn.name for conn in kernel.connectivities} == {
+        "vertex_conn",
+        "vertex_edge_conn",
+        "edge_cell_conn",
+    }
+
+    # loop variables of nested loops do not shadow the outer ones
+    assert "absolute_neigh_index_1" in cpp_code
+
+
+def test_vertical_loops():
+    task = GTScriptCompilationTask(stencil_definitions.vertical)
+    cpp_code = task.generate()
+
+    assert [kernel.loop_order for kernel in task.usid.kernels] == [
+        common.LoopOrder.BACKWARD,
+        common.LoopOrder.FORWARD,
+    ]
+    (tmp,) = task.usid.temporaries
+    assert any(isinstance(dim, usid.VerticalDimension) for dim in tmp.dimensions)
+    assert "int k_size" in cpp_code
+    assert "for (int k = k_size - 1; k >= 0; --k)" in cpp_code
+
+    # 2D computations have no k loops
+    task = GTScriptCompilationTask(stencil_definitions.temporary_field)
+    cpp_code = task.generate()
+    assert all(kernel.loop_order is None for kernel in task.usid.kernels)
+    assert "k_size" not in cpp_code
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+
+#: Dependencies which should only be loaded on first use
+HEAVY_MODULES = (
+    "black",
+    "boltons.strutils",
+    "clang_format",
+    "cytoolz",
+    "devtools",
+    "jinja2",
+    "mako.template",
+    "networkx",
+    "packaging",
+    "pkg_resources",
+    "toolz",
+)
+
+
+def import_times(module_name: str) -> Dict[str, int]:
+    """Return the cumulative import time (in us) of all the modules loaded by an import.
+
+    The import runs in a new interpreter with ``-X importtime``, which only
+    reports modules which have actually been executed (not lazy ones).
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    result = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                result[name.strip()] = int(cumulative)
+
+    return result
+
+
+@pytest.mark.parametrize(
+    "module_name", ["eve", "eve.codegen", "gtc.unstructured.nir", "gtc.unstructured.usid_codegen"],
+)
+def test_no_heavy_imports(module_name):
+    times = import_times(module_name)
+    assert module_name in times
+
+    loaded = {name: times[name] for name in HEAVY_MODULES if name in times}
+    assert not loaded, f"Heavy dependencies loaded by 'import {module_name}' (us): {loaded}"